@@ -1,7 +1,13 @@
 from flask import Flask
 from app.routes.routes import register_routes
 
-def create_app():
+def create_app(config=None):
+    """
+    Builds the Flask app. Nothing is opened here: the database, analytics and
+    Notion clients are created on first use, so worker boot and test
+    collection stay cheap.
+    """
     app = Flask(__name__)
+    app.config.from_mapping(config or {})
     register_routes(app)
     return app
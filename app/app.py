@@ -1,9 +1,6 @@
-from flask import Flask, request, jsonify
-from app.db.manager import DatabaseManager  # your custom database wrapper
-from .models.sets import CompletedSet
+from app import create_app
 
-app = Flask(__name__)
-db = DatabaseManager()
+app = create_app()
 
 if __name__ == "__main__":
     app.run(debug=True)
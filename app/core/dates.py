@@ -0,0 +1,12 @@
+from datetime import date
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def to_epoch_day(value: str) -> int:
+    """Days since 1970-01-01 for an ISO date or timestamp string."""
+    return date.fromisoformat(value[:10]).toordinal() - EPOCH_ORDINAL
+
+
+def from_epoch_day(day: int) -> date:
+    return date.fromordinal(int(day) + EPOCH_ORDINAL)
@@ -8,6 +8,11 @@ class SyncError(Exception):
         self.original_exception = original_exception
         super().__init__(message)
 
+    def __reduce__(self):
+        # Keeps the context when an error is sent back from a worker process.
+        # The original exception may not pickle, so it is left behind.
+        return type(self), (str(self), self.context)
+
 class APIError(SyncError): pass
 class ModelError(SyncError): pass
 class ParsingError(SyncError): pass
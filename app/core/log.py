@@ -1,13 +1,28 @@
 import logging
+import threading
 from logging.handlers import RotatingFileHandler
-import structlog
+
+_logger = None
+_lock = threading.Lock()
 
 def initialize_logger():
     """
-    Initializes and configures the logger for the Notion client.
+    Initializes and configures the logger for the Notion client, once per
+    process; later calls return the same logger, so creating a client per
+    sync run does not stack up file handlers.
+    structlog is imported here so that importing this module stays cheap.
     Returns:
         structlog.BoundLogger: A bound logger instance.
     """
+    global _logger
+    with _lock:
+        if _logger is None:
+            _logger = _build_logger()
+    return _logger
+
+def _build_logger():
+    import structlog
+
     # Configure the logger
 
     logger = structlog.wrap_logger(
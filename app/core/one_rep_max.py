@@ -0,0 +1,24 @@
+from typing import Callable, Dict
+
+# Brzycki's formula diverges at 37 reps; higher rep counts are treated as 36.
+BRZYCKI_MAX_REPS = 36
+
+
+def epley(weight, reps):
+    return weight * (1 + reps / 30.0)
+
+
+def brzycki(weight, reps):
+    reps = reps.clip(max=BRZYCKI_MAX_REPS) if hasattr(reps, "clip") else min(reps, BRZYCKI_MAX_REPS)
+    return weight * 36.0 / (37.0 - reps)
+
+
+# Each formula works on plain numbers and on NumPy arrays alike.
+FORMULAS: Dict[str, Callable] = {"epley": epley, "brzycki": brzycki}
+
+
+def get_formula(name: str) -> Callable:
+    try:
+        return FORMULAS[name]
+    except KeyError:
+        raise ValueError(f"Unknown 1RM formula '{name}'; expected one of {sorted(FORMULAS)}")
@@ -0,0 +1,202 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.dates import to_epoch_day, from_epoch_day
+from app.core.one_rep_max import get_formula
+
+# 1970-01-01 was a Thursday; shifting by 3 days makes weeks start on Monday.
+WEEK_OFFSET = 3
+
+
+class ColumnarSetStore:
+    """
+    Columnar in-memory mirror of a completed-set table for analytics.
+
+    Numeric fields live in NumPy arrays (weight, reps, set_number and the date
+    as an epoch day); exercise and workout names are dictionary-encoded into
+    integer codes. The mirror is built from the table on first use and kept up
+    to date through the database manager's change notifications, so
+    aggregations are vectorized passes over arrays instead of loops over
+    dicts.
+    """
+
+    _INITIAL_CAPACITY = 1024
+
+    def __init__(self, database, table_name: str = "workout_log"):
+        self.database = database
+        self.table_name = table_name
+        self._lock = threading.RLock()
+        self._built = False
+        self._key_fields = None
+        database.subscribe(table_name, self._on_change)
+
+    def _reset(self, capacity: int = _INITIAL_CAPACITY):
+        self._size = 0
+        self.weight = np.empty(capacity, dtype=np.float64)
+        self.reps = np.empty(capacity, dtype=np.int32)
+        self.set_number = np.empty(capacity, dtype=np.int32)
+        self.day = np.empty(capacity, dtype=np.int32)
+        self.exercise = np.empty(capacity, dtype=np.int32)
+        self.workout = np.empty(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.exercise_ids: List[str] = []
+        self.workout_names: List[str] = []
+        self._exercise_codes: Dict[str, int] = {}
+        self._workout_codes: Dict[str, int] = {}
+        self._rows: Dict[Tuple, int] = {}
+        self.keys: List[Optional[Tuple]] = []
+
+    def _ensure_built(self):
+        # Another worker's write resets the mirror through a "reset" event.
+        self.database.refresh()
+        if self._built:
+            return
+        with self._lock:
+            if self._built:
+                return
+            entries = self.database.all(self.table_name) if self.database.has_table(self.table_name) else []
+            self._reset(max(self._INITIAL_CAPACITY, len(entries)))
+            self._key_fields = (
+                self.database.get_composite_key_fields(self.table_name) if entries else None
+            )
+            self._append(entries)
+            self._built = True
+
+    def _on_change(self, event: str, entries: List[dict]):
+        with self._lock:
+            if not self._built:
+                return
+            if event == "add":
+                self._append(entries)
+            elif event == "update":
+                for entry in entries:
+                    row = self._rows.get(self._key(entry))
+                    if row is None:
+                        self._append([entry])
+                    else:
+                        self._write_row(row, entry)
+            elif event == "delete":
+                for entry in entries:
+                    row = self._rows.pop(self._key(entry), None)
+                    if row is not None:
+                        self.alive[row] = False
+                        self.keys[row] = None
+            else:
+                self._built = False
+
+    def _key(self, entry: dict) -> Tuple:
+        if self._key_fields is None:
+            self._key_fields = self.database.get_composite_key_fields(self.table_name)
+        return tuple(entry[k] for k in self._key_fields)
+
+    @staticmethod
+    def _encode(value: str, codes: Dict[str, int], values: List[str]) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    def _grow(self, needed: int):
+        capacity = len(self.weight)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("weight", "reps", "set_number", "day", "exercise", "workout", "alive"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _append(self, entries: List[dict]):
+        self._grow(self._size + len(entries))
+        for entry in entries:
+            row = self._size
+            self._size += 1
+            key = self._key(entry)
+            self._rows[key] = row
+            self.keys.append(key)
+            self._write_row(row, entry)
+
+    def _write_row(self, row: int, entry: dict):
+        weight = entry.get("weight")
+        self.weight[row] = np.nan if weight is None else weight
+        self.reps[row] = entry["reps"]
+        self.set_number[row] = entry["set_number"]
+        self.day[row] = to_epoch_day(entry["date"])
+        self.exercise[row] = self._encode(entry["exercise_id"], self._exercise_codes, self.exercise_ids)
+        self.workout[row] = self._encode(entry["workout_name"], self._workout_codes, self.workout_names)
+        self.alive[row] = True
+
+    def _columns(self):
+        """Returns views of the live rows of every column."""
+        self._ensure_built()
+        with self._lock:
+            n = self._size
+            mask = self.alive[:n]
+            return {
+                "weight": np.nan_to_num(self.weight[:n][mask]),
+                "reps": self.reps[:n][mask],
+                "set_number": self.set_number[:n][mask],
+                "day": self.day[:n][mask],
+                "exercise": self.exercise[:n][mask],
+                "workout": self.workout[:n][mask],
+                "row": np.flatnonzero(mask),
+            }
+
+    def __len__(self) -> int:
+        self._ensure_built()
+        return int(self.alive[:self._size].sum())
+
+    def tonnage_by_exercise(self) -> Dict[str, float]:
+        cols = self._columns()
+        totals = np.bincount(cols["exercise"], weights=cols["weight"] * cols["reps"],
+                             minlength=len(self.exercise_ids))
+        present = np.bincount(cols["exercise"], minlength=len(self.exercise_ids)) > 0
+        return {self.exercise_ids[i]: float(totals[i]) for i in np.flatnonzero(present)}
+
+    def weekly_volume(self, exercise_id: Optional[str] = None) -> Dict[str, float]:
+        """Total weight × reps per Monday-based week, keyed by the week's start date."""
+        cols = self._columns()
+        tonnage = cols["weight"] * cols["reps"]
+        weeks = (cols["day"] + WEEK_OFFSET) // 7
+        if exercise_id is not None:
+            code = self._exercise_codes.get(exercise_id)
+            if code is None:
+                return {}
+            selected = cols["exercise"] == code
+            tonnage, weeks = tonnage[selected], weeks[selected]
+        unique_weeks, inverse = np.unique(weeks, return_inverse=True)
+        totals = np.bincount(inverse, weights=tonnage, minlength=len(unique_weeks))
+        return {
+            from_epoch_day(week * 7 - WEEK_OFFSET).isoformat(): float(total)
+            for week, total in zip(unique_weeks, totals)
+        }
+
+    def best_estimated_1rm(self, formula: str = "epley") -> Dict[str, dict]:
+        """
+        Best estimated 1RM per exercise under `formula` ("epley" or
+        "brzycki"), with the composite key of the set that produced it.
+        """
+        estimate = get_formula(formula)
+        cols = self._columns()
+        if not len(cols["row"]):
+            return {}
+        estimates = estimate(cols["weight"], cols["reps"].astype(np.float64))
+        # Sort by exercise, then estimate descending: the first row of each
+        # exercise group is its best set.
+        order = np.lexsort((-estimates, cols["exercise"]))
+        exercises = cols["exercise"][order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = exercises[1:] != exercises[:-1]
+        best = order[first]
+        return {
+            self.exercise_ids[cols["exercise"][i]]: {
+                "estimated_1rm": float(estimates[i]),
+                "key": self.keys[cols["row"][i]],
+            }
+            for i in best
+        }
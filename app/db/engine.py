@@ -0,0 +1,52 @@
+import os
+from typing import Optional, Union
+
+from app.db.manager import DatabaseManager
+from app.db.sqlite_manager import SQLiteManager
+from app.db.storage import JournalStorage
+
+
+def _journal_manager(db_path: str = 'data/database/tinydb.json') -> DatabaseManager:
+    return DatabaseManager(
+        db_path,
+        storage_cls=JournalStorage,
+        compact_after=int(os.environ.get("DB_COMPACT_AFTER", 1000)),
+    )
+
+
+BACKENDS = {
+    "tinydb": DatabaseManager,
+    "journal": _journal_manager,
+    "sqlite": SQLiteManager,
+}
+
+DEFAULT_PATHS = {
+    "tinydb": 'data/database/tinydb.json',
+    "journal": 'data/database/tinydb.json',
+    "sqlite": 'data/database/sqlite.db',
+}
+
+
+def get_database(backend: Optional[str] = None, db_path: Optional[str] = None) -> Union[DatabaseManager, SQLiteManager]:
+    """
+    Builds the database manager for the configured backend. Defaults come from
+    the DB_BACKEND and DB_PATH environment variables, falling back to TinyDB.
+    The "journal" backend is TinyDB on JournalStorage; DB_COMPACT_AFTER sets
+    how many journal records trigger a compaction.
+    """
+    backend = backend or os.environ.get("DB_BACKEND", "tinydb")
+    try:
+        factory = BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unsupported database backend: {backend}. Expected one of {list(BACKENDS)}")
+
+    db_path = db_path or os.environ.get("DB_PATH")
+    return factory(db_path) if db_path else factory()
+
+
+def database_path(backend: Optional[str] = None, db_path: Optional[str] = None) -> str:
+    """The file `get_database` opens for the same arguments, without opening it."""
+    backend = backend or os.environ.get("DB_BACKEND", "tinydb")
+    if backend not in DEFAULT_PATHS:
+        raise ValueError(f"Unsupported database backend: {backend}. Expected one of {list(DEFAULT_PATHS)}")
+    return db_path or os.environ.get("DB_PATH") or DEFAULT_PATHS[backend]
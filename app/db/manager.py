@@ -1,9 +1,20 @@
 import os
+import shutil
 import logging
-from datetime import datetime
-from typing import Optional, List, Union
+import threading
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from datetime import datetime, date
+from itertools import islice
+from typing import Optional, List, Union, Dict, Tuple, Callable, Iterable
 from tinydb import TinyDB, Query
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+from app.db.storage import AtomicJSONStorage, BufferedMiddleware, JournalStorage
 from app.models.sets import KeyedModel
 from app.core.errors import (
     TableNotFoundError,
@@ -19,65 +30,299 @@ class DatabaseManager:
     """
     Manages TinyDB operations including table creation, insertion, updating,
     and metadata tracking for sync and composite keys.
+
+    Several processes (e.g. gunicorn workers) can share one database file.
+    Every mutation runs in a write session that owns the database: an
+    in-process lock serializes threads, and an exclusive `flock` on
+    `<db_path>.lock` queues writers from other workers. Readers never lock;
+    the storage reloads the file only when its signature changes, and
+    in-memory indexes are dropped whenever another worker's write is seen.
     """
 
-    def __init__(self, db_path: str = 'data/database/tinydb.json'):
+    def __init__(self, db_path: str = 'data/database/tinydb.json', storage_cls=AtomicJSONStorage, **storage_kwargs):
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        self.db = TinyDB(db_path)
+        self.db_path = db_path
+        self.db = TinyDB(db_path, storage=BufferedMiddleware(storage_cls), **storage_kwargs)
+        # Per-table hash index: composite key tuple -> doc_id. Built lazily on
+        # first access and maintained by add/update/delete.
+        self._key_indexes: Dict[str, Dict[tuple, int]] = {}
+        self._init_doc_ids: Dict[str, Optional[int]] = {}
+        # page_id -> doc_id per table, for upserts of pages whose key changed.
+        # Built lazily; add and upsert maintain it, other writes drop it.
+        self._page_indexes: Dict[str, Dict[str, int]] = {}
+        # Sorted (value, doc_id) lists per (table, field) for range queries.
+        self._range_indexes: Dict[Tuple[str, str], List[Tuple[str, int]]] = {}
+        # Metadata records by table name, loaded once; see _get_metadata.
+        self._metadata: Optional[Dict[str, dict]] = None
+
+        self._listeners: Dict[str, List[Callable[[str, List[dict]], None]]] = {}
+        self._generation = None
+        self._write_lock = threading.RLock()
+        self._write_depth = 0
+        self._lock_file = open(db_path + ".lock", "a") if fcntl else None
+
+    @contextmanager
+    def batch(self):
+        """
+        Opens a write session. All mutations made inside the block are kept
+        in memory and written to disk once, atomically, when the outermost
+        session exits. Nested sessions join the enclosing one. If the
+        outermost session raises, its changes are discarded instead.
+
+        The outermost session holds the writer lock for its whole duration
+        and starts from the latest state on disk.
+        """
+        with self._write_lock:
+            outermost = self._write_depth == 0
+            if outermost and self._lock_file:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            self._write_depth += 1
+            try:
+                if outermost:
+                    self._check_generation()
+                storage = self.db.storage
+                storage.begin()
+                try:
+                    yield self
+                except BaseException:
+                    # Like a SQLite rollback: nothing of the failed session is
+                    # written, and indexes built from it are dropped.
+                    storage.end(discard=True)
+                    if outermost:
+                        self._check_generation()
+                    raise
+                else:
+                    storage.end()
+            finally:
+                self._write_depth -= 1
+                if outermost and self._lock_file:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _check_generation(self):
+        """
+        Drops every in-memory structure derived from the file if another
+        writer has changed it since we last looked.
+        """
+        storage = self.db.storage
+        if storage.in_session:
+            return
+        generation = storage.refresh()
+        if generation != self._generation:
+            if self._generation is not None:
+                logger.debug(f"Database file changed on disk; reloading '{self.db_path}'.")
+            reloaded = self._generation is not None
+            self._generation = generation
+            self._key_indexes.clear()
+            self._init_doc_ids.clear()
+            self._page_indexes.clear()
+            self._range_indexes.clear()
+            self._metadata = None
+            # Table objects cache query results and the next document id.
+            self.db._tables.clear()
+            if reloaded:
+                for table_name in self._listeners:
+                    self._notify(table_name, "reset", [])
+
+    def refresh(self):
+        """
+        Picks up writes made by other processes: if the file changed, derived
+        state is dropped and listeners get a "reset" event. For consumers that
+        serve cached data without reading a table first.
+        """
+        self._check_generation()
+
+    def subscribe(self, table_name: str, callback: Callable[[str, List[dict]], None]):
+        """
+        Registers `callback(event, entries)` for changes to a table. Events are
+        "add" (inserted entries), "update" (updated entries), "delete"
+        (composite keys of removed entries) and "reset" (the table may have
+        changed arbitrarily and derived state should be rebuilt).
+        """
+        self._listeners.setdefault(table_name, []).append(callback)
+
+    def _notify(self, table_name: str, event: str, entries: List[dict]):
+        for callback in self._listeners.get(table_name, ()):
+            callback(event, entries)
 
     @property
     def metadata_table(self):
         return self.db.table('metadata')
 
+    def has_table(self, table_name: str) -> bool:
+        return table_name in self.db.tables()
+
+    def all(self, table_name: str) -> List[dict]:
+        return [doc for doc in self.get_table(table_name).all() if not doc.get("_init")]
+
+    def backup(self, backup_path: str):
+        storage = self.db.storage.storage
+        if isinstance(storage, JournalStorage):
+            storage.compact(wait=True)
+        shutil.copy(self.db_path, backup_path)
+
     def get_table(self, table_name: str):
+        self._check_generation()
         if table_name not in self.db.tables():
             raise TableNotFoundError(table_name, context={"available_tables": list(self.db.tables())})
         return self.db.table(table_name)
 
+    def get_range(self, table_name: str, start: Union[str, date], end: Union[str, date],
+                  field: str = "date") -> List[dict]:
+        """
+        Returns the entries whose `field` lies between `start` and `end`,
+        inclusive, in ascending order. Values are compared as ISO strings, so
+        a date-only `end` also matches timestamps on that day.
+        """
+        table = self.get_table(table_name)
+        index = self._get_range_index(table_name, field)
+        start = start.isoformat() if isinstance(start, date) else start
+        end = end.isoformat() if isinstance(end, date) else end
+
+        lo = bisect_left(index, (start,))
+        hi = bisect_right(index, (end + "\uffff",))
+        docs = (table.get(doc_id=doc_id) for _, doc_id in index[lo:hi])
+        return [doc for doc in docs if doc is not None]
+
     def get(self, table_name: str, filters: dict) -> List[dict]:
         table = self.get_table(table_name)
+        key_fields = self.get_composite_key_fields(table_name)
+        if set(filters) == set(key_fields):
+            doc_id = self._lookup(table_name, filters)
+            doc = table.get(doc_id=doc_id) if doc_id is not None else None
+            return [doc] if doc else []
+
         query = self._composite_query(filters)
         return table.search(query)
 
     def delete(self, table_name: str, key_dict: dict) -> bool:
-        table = self.get_table(table_name)
-        query = self._composite_query(key_dict)
-        return bool(table.remove(query))
-
-    def update(self, table_name: str, entry: dict):
+        with self.batch():
+            table = self.get_table(table_name)
+            key_fields = self.get_composite_key_fields(table_name)
+            if set(key_dict) == set(key_fields):
+                doc_id = self._lookup(table_name, key_dict)
+                if doc_id is None:
+                    return False
+                self._unindex_range(table_name, doc_id, table.get(doc_id=doc_id))
+                table.remove(doc_ids=[doc_id])
+                self._key_indexes[table_name].pop(self._key_tuple(key_fields, key_dict), None)
+                self._page_indexes.pop(table_name, None)
+                self._notify(table_name, "delete", [key_dict])
+                return True
+
+            query = self._composite_query(key_dict)
+            removed = bool(table.remove(query))
+            self._drop_index(table_name)
+            self._notify(table_name, "reset", [])
+            return removed
+
+    def update(self, table_name: str, entry: dict, dirty: Optional[bool] = None):
+        """
+        Merges `entry` into the row with the same composite key. `dirty` sets
+        the row's `_dirty` sync flag: True for local edits that still have to
+        be pushed to Notion, False once they have been.
+        """
         if not entry:
             raise DatabaseError("Entry cannot be empty.")
-
-        table = self.get_table(table_name)
-        key_fields = self.get_composite_key_fields(table_name)
-        key_values = {field: entry[field] for field in key_fields}
-        query = self._composite_query(key_values)
-
-        if not query:
-            raise DatabaseError("Missing composite key fields.")
-
-        updated = table.update(entry, query)
-        if updated:
-            logger.info(f"Updated entry in '{table_name}'.")
-            return entry
-        return None
+        if dirty is not None:
+            entry = {**entry, "_dirty": dirty}
+
+        with self.batch():
+            table = self.get_table(table_name)
+            key_fields = self.get_composite_key_fields(table_name)
+            if not key_fields:
+                raise DatabaseError("Missing composite key fields.")
+            key_values = {field: entry[field] for field in key_fields}
+
+            doc_id = self._lookup(table_name, key_values)
+            if doc_id is None:
+                return None
+            self._unindex_range(table_name, doc_id, table.get(doc_id=doc_id))
+            table.update(entry, doc_ids=[doc_id])
+            self._page_indexes.pop(table_name, None)
+            merged = table.get(doc_id=doc_id)
+            self._index_range(table_name, doc_id, merged)
+            self._notify(table_name, "update", [merged])
+        logger.info(f"Updated entry in '{table_name}'.")
+        return entry
+
+    def update_many(self, table_name: str, entries: List[dict], dirty: Optional[bool] = None) -> List[dict]:
+        """
+        Applies several `update`s in one pass over the table and one write,
+        with a single change notification. Entries whose key has no row are
+        skipped; the applied entries are returned.
+        """
+        if dirty is not None:
+            entries = [{**entry, "_dirty": dirty} for entry in entries]
+
+        with self.batch():
+            table = self.get_table(table_name)
+            key_fields = self.get_composite_key_fields(table_name)
+            if not key_fields:
+                raise DatabaseError("Missing composite key fields.")
+
+            by_doc_id = {}
+            for entry in entries:
+                doc_id = self._lookup(table_name, {field: entry[field] for field in key_fields})
+                if doc_id is not None:
+                    by_doc_id[doc_id] = entry
+            if not by_doc_id:
+                return []
+
+            # TinyDB hands the update callback the bare document, so the entry
+            # to merge is found again by its key.
+            by_key = {self._key_tuple(key_fields, entry): entry for entry in by_doc_id.values()}
+            for doc_id in by_doc_id:
+                self._unindex_range(table_name, doc_id, table.get(doc_id=doc_id))
+            table.update(lambda doc: doc.update(by_key[self._key_tuple(key_fields, doc)]), doc_ids=list(by_doc_id))
+            self._page_indexes.pop(table_name, None)
+            for doc_id in by_doc_id:
+                self._index_range(table_name, doc_id, table.get(doc_id=doc_id))
+
+            applied = list(by_doc_id.values())
+            # Listeners get whole rows, not the partial entries merged into them.
+            self._notify(table_name, "update", [table.get(doc_id=doc_id) for doc_id in by_doc_id])
+        logger.info(f"Updated {len(applied)} entries in '{table_name}'.")
+        return applied
 
     def create_table(self, table_name: str, model: KeyedModel, remote_id: Optional[str] = None):
-        if table_name not in self.db.tables():
+        with self.batch():
+            if table_name in self.db.tables():
+                logger.warning(f"Table '{table_name}' already exists.")
+                return
             self.db.table(table_name).insert({"_init": True})
             self._init_metadata(table_name, model, remote_id)
-            logger.info(f"Table '{table_name}' created.")
-        else:
-            logger.warning(f"Table '{table_name}' already exists.")
+        logger.info(f"Table '{table_name}' created.")
+
+    def _get_metadata(self, table_name: str) -> Optional[dict]:
+        """
+        Returns the metadata record for a table from the in-process cache. The
+        cache is loaded with one read of the metadata table and only reloaded
+        after _init_metadata or when another worker changes the file.
+        """
+        self._check_generation()
+        if self._metadata is None:
+            self._metadata = {doc["table_name"]: doc for doc in self.metadata_table.all()}
+        return self._metadata.get(table_name)
+
+    def _set_metadata_fields(self, table_name: str, fields: dict) -> bool:
+        record = self._get_metadata(table_name)
+        if record is None:
+            return False
+        self.metadata_table.update(fields, doc_ids=[record.doc_id])
+        record.update(fields)
+        return True
 
     def _init_metadata(self, table_name: str, model: KeyedModel, remote_id: Optional[str]):
-        if not self.metadata_table.contains(Query().table_name == table_name):
+        if self._get_metadata(table_name) is None:
+            self._metadata = None
             self.metadata_table.insert({
                 "table_name": table_name,
                 "table_model": model.model_json_schema(),
                 "composite_key": model.get_key(),
                 "remote_id": remote_id,
                 "synced_at": None,
+                "watermark": None,
+                "checkpoint": None,
                 "created_at": datetime.now().isoformat(),
                 "updated_at": datetime.now().isoformat()
             })
@@ -87,7 +332,7 @@ class DatabaseManager:
     def get_composite_key_fields(self, table_name: str) -> List[str]:
         if table_name not in self.db.tables():
             raise TableNotFoundError(table_name)
-        metadata = self.metadata_table.get(Query().table_name == table_name)
+        metadata = self._get_metadata(table_name)
         if not metadata:
             raise MetadataNotFoundError(table_name)
         return metadata["composite_key"]
@@ -98,6 +343,85 @@ class DatabaseManager:
             raise CompositeKeyError(f"Missing keys: {missing}", context={"entry_keys": list(entry.keys())})
         return "_".join(str(entry[k]) for k in keys)
 
+    def _key_tuple(self, keys: List[str], entry: dict) -> Tuple:
+        missing = [k for k in keys if k not in entry]
+        if missing:
+            raise CompositeKeyError(f"Missing keys: {missing}", context={"entry_keys": list(entry.keys())})
+        return tuple(entry[k] for k in keys)
+
+    def _get_key_index(self, table_name: str) -> Dict[tuple, int]:
+        """
+        Returns the composite key index for a table, building it with a single
+        pass over the table the first time it is requested.
+        """
+        index = self._key_indexes.get(table_name)
+        if index is not None:
+            return index
+
+        keys = self.get_composite_key_fields(table_name)
+        index, init_doc_id = {}, None
+        for doc in self.get_table(table_name).all():
+            if doc.get("_init"):
+                init_doc_id = doc.doc_id
+                continue
+            try:
+                index[self._key_tuple(keys, doc)] = doc.doc_id
+            except CompositeKeyError:
+                logger.warning(f"Skipping unkeyed document {doc.doc_id} in '{table_name}' index.")
+
+        self._key_indexes[table_name] = index
+        self._init_doc_ids[table_name] = init_doc_id
+        return index
+
+    def _drop_index(self, table_name: str):
+        self._key_indexes.pop(table_name, None)
+        self._init_doc_ids.pop(table_name, None)
+        self._page_indexes.pop(table_name, None)
+        for index_key in [k for k in self._range_indexes if k[0] == table_name]:
+            del self._range_indexes[index_key]
+
+    def _get_page_index(self, table_name: str) -> Dict[str, int]:
+        index = self._page_indexes.get(table_name)
+        if index is None:
+            index = {
+                doc["page_id"]: doc.doc_id
+                for doc in self.get_table(table_name).all()
+                if doc.get("page_id")
+            }
+            self._page_indexes[table_name] = index
+        return index
+
+    def _get_range_index(self, table_name: str, field: str) -> List[Tuple[str, int]]:
+        index = self._range_indexes.get((table_name, field))
+        if index is None:
+            index = sorted(
+                (str(doc[field]), doc.doc_id)
+                for doc in self.get_table(table_name).all()
+                if doc.get(field) is not None
+            )
+            self._range_indexes[(table_name, field)] = index
+        return index
+
+    def _index_range(self, table_name: str, doc_id: int, doc: Optional[dict]):
+        for (table, field), index in self._range_indexes.items():
+            if table == table_name and doc and doc.get(field) is not None:
+                insort(index, (str(doc[field]), doc_id))
+
+    def _unindex_range(self, table_name: str, doc_id: int, doc: Optional[dict]):
+        for (table, field), index in self._range_indexes.items():
+            if table == table_name and doc and doc.get(field) is not None:
+                item = (str(doc[field]), doc_id)
+                i = bisect_left(index, item)
+                if i < len(index) and index[i] == item:
+                    del index[i]
+
+    def _lookup(self, table_name: str, key_values: dict) -> Optional[int]:
+        for key, val in key_values.items():
+            if val is None:
+                raise CompositeKeyError(f"Missing value for key field '{key}'")
+        keys = self.get_composite_key_fields(table_name)
+        return self._get_key_index(table_name).get(self._key_tuple(keys, key_values))
+
     def _composite_query(self, key_values: dict):
         query = None
         for key, val in key_values.items():
@@ -108,19 +432,17 @@ class DatabaseManager:
         return query
 
     def filter_duplicates(self, table_name: str, entries: List[dict]):
-        table = self.get_table(table_name)
-        existing = table.all()
+        existing_keys = self._get_key_index(table_name)
         keys = self.get_composite_key_fields(table_name)
 
-        existing_keys = {self.build_composite_key(keys, e) for e in existing}
-
+        seen = set()
         to_insert, failed, dupes = [], [], []
         for entry in entries:
             try:
-                key = self.build_composite_key(keys, entry)
-                if key not in existing_keys:
+                key = self._key_tuple(keys, entry)
+                if key not in existing_keys and key not in seen:
                     to_insert.append(entry)
-                    existing_keys.add(key)
+                    seen.add(key)
                 else:
                     dupes.append(entry)
             except CompositeKeyError:
@@ -136,48 +458,173 @@ class DatabaseManager:
             logger.warning(f"No entries provided for '{table_name}'.")
             return
 
-        if not self.metadata_table.get(Query().table_name == table_name):
-            raise MetadataNotFoundError(table_name)
-
-        table = self.get_table(table_name)
-        table.remove(Query()._init == True)
+        with self.batch():
+            if not self._get_metadata(table_name):
+                raise MetadataNotFoundError(table_name)
+
+            table = self.get_table(table_name)
+            to_insert, failed, dupes = self.filter_duplicates(table_name, entries)
+
+            init_doc_id = self._init_doc_ids.get(table_name)
+            if init_doc_id is not None:
+                table.remove(doc_ids=[init_doc_id])
+                self._init_doc_ids[table_name] = None
+
+            if to_insert:
+                doc_ids = table.insert_multiple(to_insert)
+                keys = self.get_composite_key_fields(table_name)
+                index = self._get_key_index(table_name)
+                page_index = self._page_indexes.get(table_name)
+                for doc_id, entry in zip(doc_ids, to_insert):
+                    index[self._key_tuple(keys, entry)] = doc_id
+                    self._index_range(table_name, doc_id, entry)
+                    if page_index is not None and entry.get("page_id"):
+                        page_index[entry["page_id"]] = doc_id
+                self._update_timestamp(table_name)
+                self._notify(table_name, "add", to_insert)
+                logger.info(f"Inserted {len(to_insert)} entries into '{table_name}'.")
 
-        to_insert, failed, dupes = self.filter_duplicates(table_name, entries)
+        return {"inserted": to_insert, "duplicates": dupes, "failed": failed}
 
-        if to_insert:
-            table.insert_multiple(to_insert)
-            self._update_timestamp(table_name)
-            logger.info(f"Inserted {len(to_insert)} entries into '{table_name}'.")
+    def upsert(self, table_name: str, entries: Union[dict, List[dict]], dirty: Optional[bool] = None) -> dict:
+        """
+        Inserts entries, or merges them into the rows they already have. Rows
+        are matched by composite key, then by `page_id`: a page whose key
+        fields were edited in Notion replaces its old row rather than leaving
+        it behind. All writes of the call share one pass per operation.
+        Returns the inserted, updated and failed entries.
+        """
+        if isinstance(entries, dict):
+            entries = [entries]
+        if dirty is not None:
+            entries = [{**entry, "_dirty": dirty} for entry in entries]
+        if not entries:
+            return {"inserted": [], "updated": [], "failed": []}
+
+        with self.batch():
+            if not self._get_metadata(table_name):
+                raise MetadataNotFoundError(table_name)
+            table = self.get_table(table_name)
+            keys = self.get_composite_key_fields(table_name)
+            index = self._get_key_index(table_name)
+            page_index = self._get_page_index(table_name)
+
+            to_insert, to_update, moved, failed = {}, {}, [], []
+            for entry in entries:
+                try:
+                    key = self._key_tuple(keys, entry)
+                except CompositeKeyError:
+                    failed.append(entry)
+                    continue
+                doc_id = index.get(key)
+                if doc_id is None and entry.get("page_id") in page_index:
+                    old_id = page_index.pop(entry["page_id"])
+                    old = table.get(doc_id=old_id)
+                    index.pop(self._key_tuple(keys, old), None)
+                    moved.append(old)
+                if doc_id is None:
+                    to_insert[key] = entry
+                else:
+                    to_update[key] = (doc_id, entry)
+
+            if moved:
+                for old in moved:
+                    self._unindex_range(table_name, old.doc_id, old)
+                table.remove(doc_ids=[old.doc_id for old in moved])
+                self._notify(table_name, "delete", moved)
+
+            if to_update:
+                by_key = {key: entry for key, (_, entry) in to_update.items()}
+                for doc_id, entry in to_update.values():
+                    old = table.get(doc_id=doc_id)
+                    self._unindex_range(table_name, doc_id, old)
+                    if old.get("page_id") and old["page_id"] != entry.get("page_id", old["page_id"]):
+                        page_index.pop(old["page_id"], None)
+                table.update(lambda doc: doc.update(by_key[self._key_tuple(keys, doc)]),
+                             doc_ids=[doc_id for doc_id, _ in to_update.values()])
+                for doc_id, entry in to_update.values():
+                    self._index_range(table_name, doc_id, table.get(doc_id=doc_id))
+                    if entry.get("page_id"):
+                        page_index[entry["page_id"]] = doc_id
+                self._notify(table_name, "update", [table.get(doc_id=doc_id) for doc_id, _ in to_update.values()])
+
+            if to_insert:
+                init_doc_id = self._init_doc_ids.get(table_name)
+                if init_doc_id is not None:
+                    table.remove(doc_ids=[init_doc_id])
+                    self._init_doc_ids[table_name] = None
+                inserted = list(to_insert.values())
+                for doc_id, entry in zip(table.insert_multiple(inserted), inserted):
+                    index[self._key_tuple(keys, entry)] = doc_id
+                    self._index_range(table_name, doc_id, entry)
+                    if entry.get("page_id"):
+                        page_index[entry["page_id"]] = doc_id
+                self._notify(table_name, "add", inserted)
+
+            if to_insert or to_update or moved:
+                self._update_timestamp(table_name)
+        logger.info(f"Upserted into '{table_name}': {len(to_insert)} inserted, {len(to_update)} updated.")
+        return {"inserted": list(to_insert.values()), "updated": [e for _, e in to_update.values()], "failed": failed}
+
+    def add_chunked(self, table_name: str, entries: Iterable[dict], chunk_size: int = 500) -> Dict[str, int]:
+        """
+        Adds entries from any iterable in chunks of `chunk_size`, each in its
+        own batch, so a long stream is written as it arrives and never held in
+        memory at once. Returns counts rather than the entries themselves.
+        """
+        return self._in_chunks(self.add, table_name, entries, chunk_size, ("inserted", "duplicates", "failed"))
+
+    def upsert_chunked(self, table_name: str, entries: Iterable[dict], chunk_size: int = 500,
+                       dirty: Optional[bool] = None) -> Dict[str, int]:
+        """Streaming counterpart of `upsert`; see `add_chunked`."""
+        return self._in_chunks(
+            lambda table, chunk: self.upsert(table, chunk, dirty=dirty),
+            table_name, entries, chunk_size, ("inserted", "updated", "failed")
+        )
 
-        return {"inserted": to_insert, "duplicates": dupes, "failed": failed}
+    @staticmethod
+    def _in_chunks(write, table_name: str, entries: Iterable[dict], chunk_size: int, fields) -> Dict[str, int]:
+        counts = dict.fromkeys(fields, 0)
+        iterator = iter(entries)
+        while chunk := list(islice(iterator, chunk_size)):
+            result = write(table_name, chunk)
+            for field in counts:
+                counts[field] += len(result[field])
+        return counts
+
+    def get_dirty(self, table_name: str) -> List[dict]:
+        """
+        Rows that still have to be pushed to Notion: rows that were never
+        uploaded (no `page_id`) and rows flagged `_dirty` by a local update.
+        """
+        return [
+            doc for doc in self.all(table_name)
+            if doc.get("_dirty") or ("page_id" in doc and doc["page_id"] is None)
+        ]
 
     def get_new_entries(self, incoming: List[dict], table_name: str):
-        table = self.get_table(table_name)
-        db_entries = table.all()
+        existing_keys = self._get_key_index(table_name)
         keys = self.get_composite_key_fields(table_name)
-
-        incoming_keys = {self.build_composite_key(keys, e) for e in incoming}
-        existing_keys = {self.build_composite_key(keys, e) for e in db_entries}
-
-        new_keys = incoming_keys - existing_keys
-        return [e for e in incoming if self.build_composite_key(keys, e) in new_keys]
+        return [e for e in incoming if self._key_tuple(keys, e) not in existing_keys]
 
     def _update_timestamp(self, table_name: str):
         if table_name not in self.db.tables():
             raise TableNotFoundError(table_name)
-        self.metadata_table.update(
-            {"updated_at": datetime.now().isoformat()},
-            Query().table_name == table_name
-        )
-
-    def update_last_sync_time(self, table_name: str):
-        if table_name not in self.db.tables():
-            raise TableNotFoundError(table_name)
-
-        updated = self.metadata_table.update(
-            {"synced_at": datetime.now().isoformat()},
-            Query().table_name == table_name
-        )
+        self._set_metadata_fields(table_name, {"updated_at": datetime.now().isoformat()})
+
+    def update_last_sync_time(self, table_name: str, watermark: Optional[str] = None):
+        """
+        Records a completed sync. `watermark` is the newest `last_edited_time`
+        seen in Notion; the next sync fetches from there.
+        """
+        fields = {"synced_at": datetime.now().isoformat()}
+        if watermark is not None:
+            fields["watermark"] = watermark
+        with self.batch():
+            if table_name not in self.db.tables():
+                raise TableNotFoundError(table_name)
+
+            updated = self._set_metadata_fields(table_name, fields)
 
         if not updated:
             logger.warning(f"No metadata entry to update sync time for '{table_name}'.")
@@ -188,8 +635,27 @@ class DatabaseManager:
         if table_name not in self.db.tables():
             raise TableNotFoundError(table_name)
 
-        record = self.metadata_table.get(Query().table_name == table_name)
+        record = self._get_metadata(table_name)
         if not record:
             raise MetadataNotFoundError(table_name)
 
         return record["synced_at"]
+
+    def get_watermark(self, table_name: str) -> Optional[str]:
+        record = self._get_metadata(table_name)
+        if not record:
+            raise MetadataNotFoundError(table_name)
+        return record.get("watermark")
+
+    def get_checkpoint(self, table_name: str) -> Optional[dict]:
+        """Progress of an unfinished Notion → Local sync, or None."""
+        record = self._get_metadata(table_name)
+        if not record:
+            raise MetadataNotFoundError(table_name)
+        return record.get("checkpoint")
+
+    def set_checkpoint(self, table_name: str, checkpoint: Optional[dict]):
+        """Saves (or clears, with None) sync progress in the table's metadata."""
+        with self.batch():
+            if not self._set_metadata_fields(table_name, {"checkpoint": checkpoint}):
+                raise MetadataNotFoundError(table_name)
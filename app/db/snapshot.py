@@ -0,0 +1,221 @@
+import os
+import mmap
+import math
+import struct
+import hashlib
+import tempfile
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Iterable, Iterator, List, Optional, Union
+
+from app.core.errors import DatabaseError
+from app.core.dates import to_epoch_day
+
+MAGIC = b"WTSS"
+VERSION = 2
+NO_STRING = 0xFFFFFFFF
+
+# magic, version, reserved, record count, string count, records offset,
+# strings offset, signature of the database files the snapshot was taken from
+HEADER = struct.Struct("<4sHHIIQQ8s")
+# weight, reps, set_number, epoch day, then string ids for date, exercise_id,
+# workout_name, page_id and exercise_notes.
+RECORD = struct.Struct("<diiiIIIII")
+OFFSET = struct.Struct("<Q")
+
+STRING_FIELDS = ("date", "exercise_id", "workout_name", "page_id", "exercise_notes")
+
+
+def _sort_key(entry: dict):
+    return entry["date"], entry["set_number"], entry["exercise_id"]
+
+
+def write_snapshot(path: str, entries: Iterable[dict], source: bytes = b""):
+    """
+    Writes completed sets to a binary snapshot, sorted by date. `source` is
+    the `source_signature` of the database the entries were read from.
+
+    Layout: a fixed header, then one fixed-width record per set, then a table
+    of (string count + 1) offsets and the UTF-8 bytes of every distinct string.
+    Repeated ids, names and dates are stored once.
+    """
+    entries = sorted(entries, key=_sort_key)
+    string_ids, strings = {}, []
+
+    def intern(value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        sid = string_ids.get(value)
+        if sid is None:
+            sid = string_ids[value] = len(strings)
+            strings.append(value.encode("utf-8"))
+        return sid
+
+    records = bytearray(RECORD.size * len(entries))
+    for i, entry in enumerate(entries):
+        weight = entry.get("weight")
+        RECORD.pack_into(
+            records, i * RECORD.size,
+            math.nan if weight is None else float(weight),
+            entry["reps"],
+            entry["set_number"],
+            to_epoch_day(entry["date"]),
+            *(intern(entry.get(field)) for field in STRING_FIELDS)
+        )
+
+    offsets, position = bytearray(), 0
+    for value in strings:
+        offsets += OFFSET.pack(position)
+        position += len(value)
+    offsets += OFFSET.pack(position)
+
+    records_offset = HEADER.size
+    strings_offset = records_offset + len(records)
+    header = HEADER.pack(MAGIC, VERSION, 0, len(entries), len(strings), records_offset, strings_offset, source)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(records)
+            f.write(offsets)
+            for value in strings:
+                f.write(value)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def snapshot_path(db_path: str, table_name: str) -> str:
+    """Where the snapshot of a table is kept: `<db dir>/<table>.snapshot`."""
+    return os.path.join(os.path.dirname(db_path), f"{table_name}.snapshot")
+
+
+# Files whose change makes a snapshot stale: the database itself, the journal
+# backend's segments and SQLite's write-ahead log.
+_DATABASE_SUFFIXES = ("", ".journal", ".journal.frozen", "-wal")
+
+
+def source_signature(db_path: str) -> bytes:
+    """
+    Identity of the current state of the database files at `db_path`: their
+    inode, size and mtime. Any write or replacement changes it, however close
+    in time to the snapshot it happens.
+    """
+    stats = []
+    for suffix in _DATABASE_SUFFIXES:
+        try:
+            st = os.stat(db_path + suffix)
+        except FileNotFoundError:
+            continue
+        stats.append((suffix, st.st_ino, st.st_size, st.st_mtime_ns))
+    return hashlib.blake2b(repr(stats).encode("utf-8"), digest_size=8).digest()
+
+
+def open_fresh_snapshot(db_path: str, table_name: str) -> Optional["SetSnapshot"]:
+    """
+    The snapshot of `table_name` next to the database at `db_path`, if the
+    database has not changed since it was taken; None otherwise. Lets a cold
+    worker answer reads without loading the database.
+    """
+    try:
+        snapshot = SetSnapshot(snapshot_path(db_path, table_name))
+    except (FileNotFoundError, DatabaseError):
+        return None
+    if snapshot.source != source_signature(db_path):
+        snapshot.close()
+        return None
+    return snapshot
+
+
+class SetSnapshot:
+    """
+    Read-only, memory-mapped view of a snapshot written by `write_snapshot`.
+
+    Opening only parses the header; records and strings are decoded on
+    access, and lookups binary-search the date-sorted records in place.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self._count, self._string_count, self._records_offset, strings_offset, self.source = \
+            HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise DatabaseError(f"Not a set snapshot: {path}", context={"magic": magic, "version": version})
+        self._offsets_offset = strings_offset
+        self._bytes_offset = strings_offset + OFFSET.size * (self._string_count + 1)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> dict:
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        weight, reps, set_number, _, *sids = RECORD.unpack_from(self._mm, self._records_offset + i * RECORD.size)
+        entry = {
+            "weight": None if math.isnan(weight) else weight,
+            "reps": reps,
+            "set_number": set_number,
+        }
+        for field, sid in zip(STRING_FIELDS, sids):
+            entry[field] = self._string(sid)
+        return entry
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(self._count):
+            yield self[i]
+
+    def _string(self, sid: int) -> Optional[str]:
+        if sid == NO_STRING:
+            return None
+        start, end = struct.unpack_from("<QQ", self._mm, self._offsets_offset + sid * OFFSET.size)
+        return self._mm[self._bytes_offset + start:self._bytes_offset + end].decode("utf-8")
+
+    def _day(self, i: int) -> int:
+        return RECORD.unpack_from(self._mm, self._records_offset + i * RECORD.size)[3]
+
+    def get_range(self, start: Union[str, date], end: Union[str, date]) -> List[dict]:
+        """Sets dated between `start` and `end` (inclusive days), in order."""
+        start = start.isoformat() if isinstance(start, date) else start
+        end = end.isoformat() if isinstance(end, date) else end
+        lo = bisect_left(range(self._count), to_epoch_day(start), key=self._day)
+        hi = bisect_right(range(self._count), to_epoch_day(end), key=self._day)
+        return [self[i] for i in range(lo, hi)]
+
+    def get(self, key: dict) -> Optional[dict]:
+        """Point lookup by the CompletedSet composite key."""
+        for entry in self.get_range(key["date"], key["date"]):
+            if (entry["date"], entry["set_number"], entry["exercise_id"]) == \
+                    (key["date"], key["set_number"], key["exercise_id"]):
+                return entry
+        return None
+
+    def columns(self):
+        """
+        Zero-copy NumPy view of the numeric record fields, for building
+        analytics without decoding any strings.
+        """
+        import numpy as np
+
+        dtype = np.dtype([
+            ("weight", "<f8"), ("reps", "<i4"), ("set_number", "<i4"), ("day", "<i4"),
+            *((f"{field}_sid", "<u4") for field in STRING_FIELDS),
+        ])
+        return np.frombuffer(self._mm, dtype=dtype, count=self._count, offset=self._records_offset)
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,523 @@
+import os
+import json
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, date
+from itertools import islice
+from typing import Optional, List, Union, Dict, Callable, Iterable
+
+from app.models.sets import KeyedModel
+from app.core.errors import (
+    TableNotFoundError,
+    MetadataNotFoundError,
+    CompositeKeyError,
+    DatabaseError
+)
+
+logger = logging.getLogger(__name__)
+
+EXTRA_COLUMN = "_extra"
+
+_SQL_TYPES = {
+    "integer": "INTEGER",
+    "number": "REAL",
+    "boolean": "INTEGER",
+    "string": "TEXT",
+}
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _column_type(prop: dict) -> str:
+    """
+    Maps a JSON schema property to a SQLite column type. Optional fields are
+    `anyOf: [<type>, null]`; arrays, objects and references are stored as
+    JSON text.
+    """
+    candidates = prop.get("anyOf", [prop])
+    types = [c.get("type") for c in candidates if c.get("type") != "null"]
+    if len(types) == 1 and types[0] in _SQL_TYPES:
+        return _SQL_TYPES[types[0]]
+    return "JSON"
+
+
+class SQLiteManager:
+    """
+    SQLite implementation of the DatabaseManager API. Each table is created
+    from the pydantic schema of its model with a unique index on the model's
+    composite key. Fields that are not part of the schema are kept in a JSON
+    column so entries round-trip unchanged.
+    """
+
+    def __init__(self, db_path: str = 'data/database/sqlite.db'):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+        self.db = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._columns: Dict[str, Dict[str, str]] = {}
+        self._range_indexed: set = set()
+        self._listeners: Dict[str, List[Callable[[str, List[dict]], None]]] = {}
+        self._data_version = None
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS metadata ("
+            "table_name TEXT PRIMARY KEY, table_model JSON, composite_key JSON, "
+            "remote_id TEXT, synced_at TEXT, created_at TEXT, updated_at TEXT, "
+            "watermark TEXT, checkpoint JSON)"
+        )
+        # Metadata tables created by older versions lack the newer columns.
+        metadata_columns = {row["name"] for row in self.db.execute("PRAGMA table_info(metadata)")}
+        for name, col_type in (("watermark", "TEXT"), ("checkpoint", "JSON")):
+            if name not in metadata_columns:
+                self.db.execute(f"ALTER TABLE metadata ADD COLUMN {name} {col_type}")
+
+    @contextmanager
+    def batch(self):
+        """
+        Runs the block in a single transaction. Nested sessions join the
+        enclosing one; the outermost commits, or rolls back on error.
+        """
+        with self._lock:
+            if self._depth == 0:
+                self.db.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.db.execute("ROLLBACK")
+                raise
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.db.execute("COMMIT")
+
+    def subscribe(self, table_name: str, callback: Callable[[str, List[dict]], None]):
+        """
+        Registers `callback(event, entries)` for "add", "update" and "delete"
+        events on a table; see DatabaseManager.subscribe.
+        """
+        self._listeners.setdefault(table_name, []).append(callback)
+
+    def _notify(self, table_name: str, event: str, entries: List[dict]):
+        for callback in self._listeners.get(table_name, ()):
+            callback(event, entries)
+
+    def refresh(self):
+        """
+        Sends a "reset" event to every listener if another connection has
+        committed since the last call; see DatabaseManager.refresh.
+        """
+        with self._lock:
+            version = self.db.execute("PRAGMA data_version").fetchone()[0]
+            changed = self._data_version is not None and version != self._data_version
+            self._data_version = version
+        if changed:
+            for table_name in self._listeners:
+                self._notify(table_name, "reset", [])
+
+    def tables(self) -> set:
+        with self._lock:
+            rows = self.db.execute("SELECT table_name FROM metadata").fetchall()
+        return {row["table_name"] for row in rows}
+
+    def has_table(self, table_name: str) -> bool:
+        return table_name in self.tables()
+
+    def _get_columns(self, table_name: str) -> Dict[str, str]:
+        columns = self._columns.get(table_name)
+        if columns is None:
+            if not self.has_table(table_name):
+                raise TableNotFoundError(table_name, context={"available_tables": list(self.tables())})
+            with self._lock:
+                rows = self.db.execute(f"PRAGMA table_info({_quote(table_name)})").fetchall()
+            columns = {row["name"]: row["type"] for row in rows if row["name"] != EXTRA_COLUMN}
+            self._columns[table_name] = columns
+        return columns
+
+    def _get_metadata(self, table_name: str) -> dict:
+        if not self.has_table(table_name):
+            raise TableNotFoundError(table_name)
+        with self._lock:
+            row = self.db.execute(
+                "SELECT * FROM metadata WHERE table_name = ?", (table_name,)
+            ).fetchone()
+        if row is None:
+            raise MetadataNotFoundError(table_name)
+        record = dict(row)
+        record["table_model"] = json.loads(record["table_model"])
+        record["composite_key"] = json.loads(record["composite_key"])
+        record["checkpoint"] = json.loads(record["checkpoint"]) if record["checkpoint"] else None
+        return record
+
+    def _to_row(self, table_name: str, entry: dict) -> list:
+        columns = self._get_columns(table_name)
+        row = []
+        for name, col_type in columns.items():
+            value = entry.get(name)
+            row.append(json.dumps(value) if col_type == "JSON" and value is not None else value)
+        extra = {k: v for k, v in entry.items() if k not in columns}
+        row.append(json.dumps(extra) if extra else None)
+        return row
+
+    def _from_row(self, table_name: str, row: sqlite3.Row) -> dict:
+        columns = self._get_columns(table_name)
+        entry = {}
+        for name, col_type in columns.items():
+            value = row[name]
+            entry[name] = json.loads(value) if col_type == "JSON" and value is not None else value
+        if row[EXTRA_COLUMN]:
+            entry.update(json.loads(row[EXTRA_COLUMN]))
+        return entry
+
+    def _where(self, table_name: str, key_values: dict):
+        columns = self._get_columns(table_name)
+        clauses, params = [], []
+        for key, val in key_values.items():
+            if val is None:
+                raise CompositeKeyError(f"Missing value for key field '{key}'")
+            if key not in columns:
+                raise DatabaseError(f"Unknown field '{key}' for table '{table_name}'.")
+            clauses.append(f"{_quote(key)} = ?")
+            params.append(val)
+        return " AND ".join(clauses), params
+
+    def all(self, table_name: str) -> List[dict]:
+        self._get_columns(table_name)
+        with self._lock:
+            rows = self.db.execute(f"SELECT * FROM {_quote(table_name)}").fetchall()
+        return [self._from_row(table_name, row) for row in rows]
+
+    def get_range(self, table_name: str, start: Union[str, date], end: Union[str, date],
+                  field: str = "date") -> List[dict]:
+        """
+        Returns the entries whose `field` lies between `start` and `end`,
+        inclusive, in ascending order. A secondary index on `field` is created
+        the first time a table is queried by it.
+        """
+        if field not in self._get_columns(table_name):
+            raise DatabaseError(f"Unknown field '{field}' for table '{table_name}'.")
+        start = start.isoformat() if isinstance(start, date) else start
+        end = end.isoformat() if isinstance(end, date) else end
+
+        with self._lock:
+            if (table_name, field) not in self._range_indexed:
+                self.db.execute(
+                    f"CREATE INDEX IF NOT EXISTS {_quote('ix_' + table_name + '_' + field)} "
+                    f"ON {_quote(table_name)} ({_quote(field)})"
+                )
+                self._range_indexed.add((table_name, field))
+            rows = self.db.execute(
+                f"SELECT * FROM {_quote(table_name)} WHERE {_quote(field)} >= ? AND {_quote(field)} <= ? "
+                f"ORDER BY {_quote(field)}",
+                (start, end + "\uffff")
+            ).fetchall()
+        return [self._from_row(table_name, row) for row in rows]
+
+    def get(self, table_name: str, filters: dict) -> List[dict]:
+        where, params = self._where(table_name, filters)
+        with self._lock:
+            rows = self.db.execute(f"SELECT * FROM {_quote(table_name)} WHERE {where}", params).fetchall()
+        return [self._from_row(table_name, row) for row in rows]
+
+    def delete(self, table_name: str, key_dict: dict) -> bool:
+        where, params = self._where(table_name, key_dict)
+        with self._lock:
+            cursor = self.db.execute(f"DELETE FROM {_quote(table_name)} WHERE {where}", params)
+        if cursor.rowcount == 0:
+            return False
+        key_fields = self.get_composite_key_fields(table_name)
+        self._notify(table_name, "delete" if set(key_dict) == set(key_fields) else "reset", [key_dict])
+        return True
+
+    def update(self, table_name: str, entry: dict, dirty: Optional[bool] = None):
+        if not entry:
+            raise DatabaseError("Entry cannot be empty.")
+        if dirty is not None:
+            entry = {**entry, "_dirty": dirty}
+
+        key_fields = self.get_composite_key_fields(table_name)
+        if not key_fields:
+            raise DatabaseError("Missing composite key fields.")
+
+        with self.batch():
+            merged = self._update_row(table_name, key_fields, entry)
+            if merged is None:
+                return None
+            self._notify(table_name, "update", [merged])
+        logger.info(f"Updated entry in '{table_name}'.")
+        return entry
+
+    def update_many(self, table_name: str, entries: List[dict], dirty: Optional[bool] = None) -> List[dict]:
+        if dirty is not None:
+            entries = [{**entry, "_dirty": dirty} for entry in entries]
+
+        key_fields = self.get_composite_key_fields(table_name)
+        if not key_fields:
+            raise DatabaseError("Missing composite key fields.")
+
+        with self.batch():
+            applied, merged = [], []
+            for entry in entries:
+                row = self._update_row(table_name, key_fields, entry)
+                if row is not None:
+                    applied.append(entry)
+                    merged.append(row)
+            if merged:
+                self._notify(table_name, "update", merged)
+        logger.info(f"Updated {len(applied)} entries in '{table_name}'.")
+        return applied
+
+    def _update_row(self, table_name: str, key_fields: List[str], entry: dict) -> Optional[dict]:
+        """Merges `entry` into its row; returns the merged row, or None if there is none."""
+        key_values = {field: entry[field] for field in key_fields}
+        existing = self.get(table_name, key_values)
+        if not existing:
+            return None
+        merged = {**existing[0], **entry}
+        columns = list(self._get_columns(table_name)) + [EXTRA_COLUMN]
+        assignments = ", ".join(f"{_quote(c)} = ?" for c in columns)
+        where, params = self._where(table_name, key_values)
+        self.db.execute(
+            f"UPDATE {_quote(table_name)} SET {assignments} WHERE {where}",
+            self._to_row(table_name, merged) + params
+        )
+        return merged
+
+    def create_table(self, table_name: str, model: KeyedModel, remote_id: Optional[str] = None):
+        if self.has_table(table_name):
+            logger.warning(f"Table '{table_name}' already exists.")
+            return
+        self._create_from_schema(table_name, model.model_json_schema(), model.get_key(), remote_id)
+        logger.info(f"Table '{table_name}' created.")
+
+    def _create_from_schema(self, table_name: str, schema: dict, composite_key: List[str],
+                            remote_id: Optional[str], synced_at: Optional[str] = None,
+                            watermark: Optional[str] = None):
+        properties = schema.get("properties", {})
+        missing = [k for k in composite_key if k not in properties]
+        if missing:
+            raise CompositeKeyError(f"Key fields not in schema: {missing}", context={"table": table_name})
+
+        column_defs = [f"{_quote(name)} {_column_type(prop)}" for name, prop in properties.items()]
+        column_defs.append(f"{_quote(EXTRA_COLUMN)} JSON")
+        key_columns = ", ".join(_quote(k) for k in composite_key)
+        now = datetime.now().isoformat()
+
+        with self.batch():
+            self.db.execute(f"CREATE TABLE {_quote(table_name)} ({', '.join(column_defs)})")
+            self.db.execute(
+                f"CREATE UNIQUE INDEX {_quote('ux_' + table_name + '_key')} "
+                f"ON {_quote(table_name)} ({key_columns})"
+            )
+            self.db.execute(
+                "INSERT INTO metadata (table_name, table_model, composite_key, remote_id, synced_at, "
+                "created_at, updated_at, watermark) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (table_name, json.dumps(schema), json.dumps(composite_key), remote_id, synced_at, now, now, watermark)
+            )
+        self._columns.pop(table_name, None)
+
+    def get_composite_key_fields(self, table_name: str) -> List[str]:
+        return self._get_metadata(table_name)["composite_key"]
+
+    def build_composite_key(self, keys: List[str], entry: dict) -> str:
+        missing = [k for k in keys if k not in entry]
+        if missing:
+            raise CompositeKeyError(f"Missing keys: {missing}", context={"entry_keys": list(entry.keys())})
+        return "_".join(str(entry[k]) for k in keys)
+
+    def _exists(self, table_name: str, keys: List[str], entry: dict) -> bool:
+        where, params = self._where(table_name, {k: entry[k] for k in keys})
+        row = self.db.execute(f"SELECT 1 FROM {_quote(table_name)} WHERE {where}", params).fetchone()
+        return row is not None
+
+    def filter_duplicates(self, table_name: str, entries: List[dict]):
+        keys = self.get_composite_key_fields(table_name)
+
+        seen = set()
+        to_insert, failed, dupes = [], [], []
+        with self._lock:
+            for entry in entries:
+                try:
+                    key = tuple(entry[k] for k in keys)
+                    if key in seen or self._exists(table_name, keys, entry):
+                        dupes.append(entry)
+                    else:
+                        to_insert.append(entry)
+                        seen.add(key)
+                except (KeyError, CompositeKeyError):
+                    failed.append(entry)
+
+        return to_insert, failed, dupes
+
+    def add(self, table_name: str, entries: Union[dict, List[dict]]):
+        if isinstance(entries, dict):
+            entries = [entries]
+
+        if not entries:
+            logger.warning(f"No entries provided for '{table_name}'.")
+            return
+
+        self._get_metadata(table_name)
+
+        with self.batch():
+            to_insert, failed, dupes = self.filter_duplicates(table_name, entries)
+            if to_insert:
+                columns = list(self._get_columns(table_name)) + [EXTRA_COLUMN]
+                placeholders = ", ".join("?" for _ in columns)
+                self.db.executemany(
+                    f"INSERT INTO {_quote(table_name)} ({', '.join(_quote(c) for c in columns)}) "
+                    f"VALUES ({placeholders})",
+                    [self._to_row(table_name, entry) for entry in to_insert]
+                )
+                self._update_timestamp(table_name)
+                self._notify(table_name, "add", to_insert)
+                logger.info(f"Inserted {len(to_insert)} entries into '{table_name}'.")
+
+        return {"inserted": to_insert, "duplicates": dupes, "failed": failed}
+
+    def upsert(self, table_name: str, entries: Union[dict, List[dict]], dirty: Optional[bool] = None) -> dict:
+        """
+        Inserts entries or merges them into their existing rows, matched by
+        composite key and then by `page_id`; see DatabaseManager.upsert.
+        """
+        if isinstance(entries, dict):
+            entries = [entries]
+        if dirty is not None:
+            entries = [{**entry, "_dirty": dirty} for entry in entries]
+
+        keys = self.get_composite_key_fields(table_name)
+        columns = self._get_columns(table_name)
+        # Entries to insert by key: the last one wins, as in DatabaseManager.
+        to_insert, updated, merged, moved, failed = {}, [], [], [], []
+        with self.batch():
+            if "page_id" in columns:
+                self.db.execute(
+                    f"CREATE INDEX IF NOT EXISTS {_quote('ix_' + table_name + '_page_id')} "
+                    f"ON {_quote(table_name)} (page_id)"
+                )
+            for entry in entries:
+                if any(entry.get(k) is None for k in keys):
+                    failed.append(entry)
+                elif (row := self._update_row(table_name, keys, entry)) is not None:
+                    updated.append(entry)
+                    merged.append(row)
+                else:
+                    if entry.get("page_id") and "page_id" in columns:
+                        old = self.db.execute(
+                            f"SELECT * FROM {_quote(table_name)} WHERE page_id = ?", (entry["page_id"],)
+                        ).fetchone()
+                        if old is not None:
+                            moved.append(self._from_row(table_name, old))
+                            self.db.execute(f"DELETE FROM {_quote(table_name)} WHERE page_id = ?", (entry["page_id"],))
+                    to_insert[tuple(entry[k] for k in keys)] = entry
+
+            inserted = list(to_insert.values())
+            if inserted:
+                all_columns = list(columns) + [EXTRA_COLUMN]
+                self.db.executemany(
+                    f"INSERT INTO {_quote(table_name)} ({', '.join(_quote(c) for c in all_columns)}) "
+                    f"VALUES ({', '.join('?' for _ in all_columns)})",
+                    [self._to_row(table_name, entry) for entry in inserted]
+                )
+            if inserted or updated:
+                self._update_timestamp(table_name)
+        for event, changed in (("delete", moved), ("update", merged), ("add", inserted)):
+            if changed:
+                self._notify(table_name, event, changed)
+        logger.info(f"Upserted into '{table_name}': {len(inserted)} inserted, {len(updated)} updated.")
+        return {"inserted": inserted, "updated": updated, "failed": failed}
+
+    def add_chunked(self, table_name: str, entries: Iterable[dict], chunk_size: int = 500) -> Dict[str, int]:
+        """
+        Adds entries from any iterable in chunks of `chunk_size`, each in its
+        own batch, so a long stream is written as it arrives and never held in
+        memory at once. Returns counts rather than the entries themselves.
+        """
+        return self._in_chunks(self.add, table_name, entries, chunk_size, ("inserted", "duplicates", "failed"))
+
+    def upsert_chunked(self, table_name: str, entries: Iterable[dict], chunk_size: int = 500,
+                       dirty: Optional[bool] = None) -> Dict[str, int]:
+        return self._in_chunks(
+            lambda table, chunk: self.upsert(table, chunk, dirty=dirty),
+            table_name, entries, chunk_size, ("inserted", "updated", "failed")
+        )
+
+    @staticmethod
+    def _in_chunks(write, table_name: str, entries: Iterable[dict], chunk_size: int, fields) -> Dict[str, int]:
+        counts = dict.fromkeys(fields, 0)
+        iterator = iter(entries)
+        while chunk := list(islice(iterator, chunk_size)):
+            result = write(table_name, chunk)
+            for field in counts:
+                counts[field] += len(result[field])
+        return counts
+
+    def get_dirty(self, table_name: str) -> List[dict]:
+        """
+        Rows that still have to be pushed to Notion: rows that were never
+        uploaded (no `page_id`) and rows flagged `_dirty` by a local update.
+        """
+        columns = self._get_columns(table_name)
+        where = f"json_extract({EXTRA_COLUMN}, '$._dirty') = 1"
+        if "page_id" in columns:
+            where += " OR page_id IS NULL"
+        with self._lock:
+            rows = self.db.execute(f"SELECT * FROM {_quote(table_name)} WHERE {where}").fetchall()
+        return [self._from_row(table_name, row) for row in rows]
+
+    def get_new_entries(self, incoming: List[dict], table_name: str):
+        keys = self.get_composite_key_fields(table_name)
+        with self._lock:
+            return [e for e in incoming if not self._exists(table_name, keys, e)]
+
+    def _update_timestamp(self, table_name: str):
+        if not self.has_table(table_name):
+            raise TableNotFoundError(table_name)
+        with self._lock:
+            self.db.execute(
+                "UPDATE metadata SET updated_at = ? WHERE table_name = ?",
+                (datetime.now().isoformat(), table_name)
+            )
+
+    def update_last_sync_time(self, table_name: str, watermark: Optional[str] = None):
+        if not self.has_table(table_name):
+            raise TableNotFoundError(table_name)
+        with self._lock:
+            self.db.execute(
+                "UPDATE metadata SET synced_at = ?, watermark = COALESCE(?, watermark) WHERE table_name = ?",
+                (datetime.now().isoformat(), watermark, table_name)
+            )
+        logger.info(f"Updated sync time for '{table_name}'.")
+
+    def get_last_sync_time(self, table_name: str) -> Optional[datetime]:
+        return self._get_metadata(table_name)["synced_at"]
+
+    def get_watermark(self, table_name: str) -> Optional[str]:
+        return self._get_metadata(table_name)["watermark"]
+
+    def get_checkpoint(self, table_name: str) -> Optional[dict]:
+        return self._get_metadata(table_name)["checkpoint"]
+
+    def set_checkpoint(self, table_name: str, checkpoint: Optional[dict]):
+        self._get_metadata(table_name)
+        with self._lock:
+            self.db.execute(
+                "UPDATE metadata SET checkpoint = ? WHERE table_name = ?",
+                (json.dumps(checkpoint) if checkpoint is not None else None, table_name)
+            )
+
+    def backup(self, backup_path: str):
+        with self._lock:
+            target = sqlite3.connect(backup_path)
+            try:
+                self.db.backup(target)
+            finally:
+                target.close()
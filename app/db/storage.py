@@ -0,0 +1,335 @@
+import os
+import json
+import shutil
+import tempfile
+import threading
+from typing import Optional, Dict, Any
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+from tinydb.storages import Storage
+from tinydb.middlewares import Middleware
+
+from app.core.errors import DatabaseError
+from app.models.records import intern_strings
+
+
+class AtomicJSONStorage(Storage):
+    """
+    JSON file storage that replaces the file atomically on every write, so a
+    crash mid-write never leaves a truncated database behind.
+
+    The parsed document is cached and only reloaded when the file's
+    (inode, mtime, size) signature changes, which is a single `stat` per
+    read. `generation` counts reloads caused by other writers, so callers
+    holding derived state (indexes, caches) know when to drop it.
+    """
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__()
+        self.path = path
+        self.kwargs = kwargs
+        self.generation = 0
+        self._data = None
+        self._signature = None
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def refresh(self) -> int:
+        signature = self._stat()
+        if signature != self._signature:
+            self._data = self._load()
+            self._signature = signature
+            self.generation += 1
+        return self.generation
+
+    def _load(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+        if not content:
+            return None
+        data = json.loads(content)
+        # json.loads builds a new string for every repeated value; share them.
+        for docs in data.values():
+            for doc in docs.values():
+                intern_strings(doc)
+        return data
+
+    def read(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        self.refresh()
+        return self._data
+
+    def write(self, data: Dict[str, Dict[str, Any]]):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tinydb-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, **self.kwargs)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            # The cached document may hold the failed mutation; reload it.
+            self._signature = None
+            raise
+        self._data = data
+        self._signature = self._stat()
+
+    def rollback(self):
+        """Drops unwritten in-memory changes by reloading the file."""
+        self._data = self._load()
+        self._signature = self._stat()
+        self.generation += 1
+
+    def close(self) -> None:
+        pass
+
+
+class BufferedMiddleware(Middleware):
+    """
+    Passes reads and writes straight through to the wrapped storage, except
+    while a write session is open: then the document is kept in memory and
+    every mutation is applied to it, and the outermost `end()` flushes the
+    result with a single write.
+    """
+
+    def __init__(self, storage_cls):
+        super().__init__(storage_cls)
+        self._depth = 0
+        self._cache = None
+        self._dirty = False
+
+    @property
+    def in_session(self) -> bool:
+        return self._depth > 0
+
+    def refresh(self) -> int:
+        return self.storage.refresh()
+
+    def begin(self):
+        self._depth += 1
+
+    def end(self, discard: bool = False):
+        """
+        Closes a session. The outermost `end()` flushes the session's
+        changes, or with `discard` drops them and rolls the wrapped storage
+        back to what was last written.
+        """
+        self._depth -= 1
+        if self._depth == 0:
+            if discard:
+                self._cache = None
+                self._dirty = False
+                self.storage.rollback()
+                return
+            try:
+                self.flush()
+            finally:
+                self._cache = None
+
+    def read(self):
+        if not self._depth:
+            return self.storage.read()
+        if self._cache is None:
+            self._cache = self.storage.read()
+        return self._cache
+
+    def write(self, data):
+        if not self._depth:
+            self.storage.write(data)
+            return
+        self._cache = data
+        self._dirty = True
+
+    def flush(self):
+        if self._dirty:
+            self.storage.write(self._cache)
+            self._dirty = False
+
+    def close(self):
+        self.flush()
+        self.storage.close()
+
+
+class JournalStorage(Storage):
+    """
+    Log-structured storage. The database lives in memory; every write appends
+    only the documents that changed to a JSON-lines journal next to the
+    snapshot file. Once the journal holds `compact_after` records it is
+    frozen and folded into a new snapshot on a background thread. Readers
+    are served from memory and are never blocked by compaction.
+
+    On open, the last snapshot is loaded and any frozen or active journal
+    segments are replayed on top of it. Replaying is idempotent, so a crash
+    at any point of a compaction loses nothing. The journal is owned by one
+    process, which holds an exclusive `flock` on `<path>.journal.lock` until
+    `close()`; opening it from a second process raises DatabaseError. Use
+    the JSON storage when several workers share a database.
+    """
+
+    def __init__(self, path: str, compact_after: int = 1000, background: bool = True, **kwargs):
+        super().__init__()
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.frozen_path = path + ".journal.frozen"
+        self.compact_after = compact_after
+        self.background = background
+        self.kwargs = kwargs
+        self._owner = self._acquire_ownership(path + ".journal.lock")
+
+        self._lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        self._data = self._load()
+        self._shadow = {t: {i: dict(d) for i, d in docs.items()} for t, docs in self._data.items()}
+        self._table_refs = dict(self._data)
+        self._records = 0
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self.generation = 0
+
+    @staticmethod
+    def _acquire_ownership(lock_path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(lock_path)), exist_ok=True)
+        lock_file = open(lock_path, "a")
+        if fcntl is None:
+            return lock_file
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise DatabaseError(
+                f"Journal database is open in another process: {lock_path}",
+                context={"hint": "run a single worker, or use the tinydb or sqlite backend"},
+            )
+        return lock_file
+
+    def refresh(self) -> int:
+        # The journal is owned by a single process; there is nothing to reload.
+        return self.generation
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        data = AtomicJSONStorage(self.path).read() or {}
+        for segment in (self.frozen_path, self.journal_path):
+            if os.path.exists(segment):
+                self._replay(data, segment)
+        return data
+
+    @staticmethod
+    def _replay(data: dict, segment: str):
+        with open(segment, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-append.
+                    break
+                table = record["t"]
+                if record.get("drop"):
+                    data.pop(table, None)
+                elif "d" in record:
+                    data.setdefault(table, {})[record["id"]] = intern_strings(record["d"])
+                else:
+                    data.get(table, {}).pop(record["id"], None)
+
+    def read(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        return self._data
+
+    def write(self, data: Dict[str, Dict[str, Any]]):
+        with self._lock:
+            records = self._diff(data)
+            self._data = data
+            if records:
+                self._journal.write("".join(json.dumps(r, **self.kwargs) + "\n" for r in records))
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+                self._records += len(records)
+
+        if self._records >= self.compact_after:
+            self.compact(wait=not self.background)
+
+    def rollback(self):
+        """Restores the documents last written to the journal."""
+        with self._lock:
+            self._data = {t: {i: dict(d) for i, d in docs.items()} for t, docs in self._shadow.items()}
+            self._table_refs = dict(self._data)
+            self.generation += 1
+
+    def _diff(self, data: dict) -> list:
+        records = []
+        for table in list(self._shadow):
+            if table not in data:
+                records.append({"t": table, "drop": True})
+                del self._shadow[table]
+                self._table_refs.pop(table, None)
+
+        for table, docs in data.items():
+            if self._table_refs.get(table) is docs and table in self._shadow:
+                continue
+            shadow = self._shadow.setdefault(table, {})
+            for doc_id, doc in docs.items():
+                if shadow.get(doc_id) != doc:
+                    records.append({"t": table, "id": doc_id, "d": doc})
+                    shadow[doc_id] = dict(doc)
+            for doc_id in [i for i in shadow if i not in docs]:
+                records.append({"t": table, "id": doc_id})
+                del shadow[doc_id]
+            self._table_refs[table] = docs
+        return records
+
+    def compact(self, wait: bool = False):
+        """
+        Freezes the current journal and folds it into a new snapshot. Only the
+        journal rotation happens under the write lock; serializing the
+        snapshot runs outside it, on a background thread unless `wait`.
+        """
+        running = self._compactor
+        if running is not None and running.is_alive():
+            if not wait:
+                return
+            running.join()
+
+        with self._lock:
+            if self._compactor is not running and self._compactor.is_alive():
+                return
+            if os.path.exists(self.frozen_path):
+                # A previous compaction did not finish; fold it in first.
+                self._journal.close()
+                with open(self.frozen_path, "a", encoding="utf-8") as frozen, \
+                        open(self.journal_path, encoding="utf-8") as active:
+                    shutil.copyfileobj(active, frozen)
+                os.remove(self.journal_path)
+            else:
+                self._journal.close()
+                os.replace(self.journal_path, self.frozen_path)
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+            self._records = 0
+            # Shadow documents are replaced, never mutated, so copying the
+            # table dicts gives a consistent point-in-time view.
+            view = {t: dict(docs) for t, docs in self._shadow.items()}
+            self._compactor = threading.Thread(target=self._write_snapshot, args=(view,), daemon=True)
+            self._compactor.start()
+
+        if wait:
+            self._compactor.join()
+
+    def _write_snapshot(self, view: dict):
+        AtomicJSONStorage(self.path, **self.kwargs).write(view)
+        os.remove(self.frozen_path)
+
+    def close(self) -> None:
+        if self._compactor is not None:
+            self._compactor.join()
+        self._journal.close()
+        self._owner.close()
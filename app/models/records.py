@@ -0,0 +1,23 @@
+import sys
+
+# Low-cardinality string fields: a log with a million sets references a few
+# hundred exercises, workouts and days, so each value is kept once.
+INTERNED_FIELDS = ("exercise_id", "workout_name", "date", "formula")
+
+
+def intern_strings(doc: dict) -> dict:
+    """
+    Interns the low-cardinality string values of a stored document in place,
+    including the sets nested in a planned workout. Returns the document.
+    """
+    for field in INTERNED_FIELDS:
+        value = doc.get(field)
+        if type(value) is str:
+            doc[field] = sys.intern(value)
+    sets = doc.get("sets")
+    if type(sets) is list:
+        for item in sets:
+            if type(item) is dict:
+                intern_strings(item)
+    return doc
+
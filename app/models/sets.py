@@ -67,6 +67,20 @@ class CompletedSet(BaseSetModel, KeyedModel):
         }
 
 
+class BestSet(KeyedModel):
+    exercise_id: str
+    estimated_1rm: float
+    formula: str
+    date: str
+    set_number: int
+    weight: Optional[float] = None
+    reps: int
+    set_page_id: Optional[str] = None
+
+    def get_key() -> List[str]:
+        return ['exercise_id']
+
+
 class PlannedSet(BaseSetModel):
     expected_weight: float
     expected_reps: Union[int, str]
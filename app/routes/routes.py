@@ -1,33 +1,131 @@
-from flask import request, jsonify
-from app.db.manager import DatabaseManager
+import threading
+from flask import current_app, request, jsonify
 from app.models.sets import CompletedSet
 
-db = DatabaseManager()
-db.create_table("completed_sets", CompletedSet)
+_init_lock = threading.Lock()
+
+
+def get_db():
+    """
+    Returns the app's database manager, opening it and creating the tables the
+    routes need on first use. Importing this module has no side effects.
+    """
+    extensions = current_app.extensions
+    if "db" not in extensions:
+        with _init_lock:
+            if "db" not in extensions:
+                from app.db.engine import get_database
+
+                db = get_database(db_path=current_app.config.get("DB_PATH"))
+                db.create_table("completed_sets", CompletedSet)
+                extensions["db"] = db
+    return extensions["db"]
+
+
+def public(entry: dict) -> dict:
+    """An entry as the API returns it, without internal fields like `_dirty` or `_hash`."""
+    return {field: value for field, value in entry.items() if not field.startswith("_")}
+
+
+def set_order(entry: dict):
+    """Completed sets are listed by date, then set number and exercise, on every read path."""
+    return entry["date"], entry["set_number"], entry["exercise_id"]
+
+
+def read_snapshot(table_name: str, read):
+    """
+    Calls `read(snapshot)` on a fresh snapshot of `table_name` while this
+    worker has not opened the database yet, so cold workers answer reads
+    without loading it. Returns None when there is no fresh snapshot.
+    """
+    if "db" in current_app.extensions:
+        return None
+    from app.db.engine import database_path
+    from app.db.snapshot import open_fresh_snapshot
+
+    snapshot = open_fresh_snapshot(database_path(db_path=current_app.config.get("DB_PATH")), table_name)
+    if snapshot is None:
+        return None
+    with snapshot:
+        return read(snapshot)
+
+
+def get_analytics():
+    extensions = current_app.extensions
+    if "analytics" not in extensions:
+        db = get_db()
+        with _init_lock:
+            if "analytics" not in extensions:
+                # NumPy is only imported once analytics are actually requested.
+                from app.db.columnar import ColumnarSetStore
+
+                extensions["analytics"] = ColumnarSetStore(db, "workout_log")
+    return extensions["analytics"]
+
+
+def get_scheduler():
+    """
+    Returns the app's sync scheduler, starting its background thread on first
+    use. Runs are periodic when SYNC_INTERVAL (seconds) is configured and
+    otherwise only happen on /sync/trigger.
+    """
+    extensions = current_app.extensions
+    if "sync_scheduler" not in extensions:
+        db = get_db()
+        with _init_lock:
+            if "sync_scheduler" not in extensions:
+                from app.services.scheduler import SyncScheduler
+                from app.services.sync_service import SyncService
+
+                scheduler = SyncScheduler(SyncService(db), interval=current_app.config.get("SYNC_INTERVAL"))
+                scheduler.start()
+                extensions["sync_scheduler"] = scheduler
+    return extensions["sync_scheduler"]
+
 
 def register_routes(app):
+    @app.before_request
+    def start_sync_scheduler():
+        if current_app.config.get("SYNC_INTERVAL"):
+            get_scheduler()
+
     @app.route("/sets", methods=["POST"])
     def create_set():
+        db = get_db()
         data = request.get_json()
         result = db.add("completed_sets", data)
         return jsonify(result), 201
 
     @app.route("/sets", methods=["GET"])
     def get_set():
+        db = get_db()
         key = {
             "date": request.args.get("date"),
             "set_number": int(request.args.get("set_number")),
             "exercise_id": request.args.get("exercise_id")
         }
         results = db.get("completed_sets", key)
-        return jsonify(results), 200
+        return jsonify([public(entry) for entry in results]), 200
     
     @app.route("/workouts", methods=["GET"])
     def get_workouts():
-        return jsonify(db.db.all())
+        db = get_db()
+        return jsonify([public(entry) for entry in db.all("workout_log")] if db.has_table("workout_log") else [])
+
+    @app.route("/workouts/range", methods=["GET"])
+    def get_workouts_in_range():
+        start, end = request.args.get("start"), request.args.get("end")
+        if not start or not end:
+            return jsonify({"error": "Both 'start' and 'end' are required."}), 400
+        entries = read_snapshot("workout_log", lambda snapshot: snapshot.get_range(start, end))
+        if entries is None:
+            db = get_db()
+            entries = db.get_range("workout_log", start, end) if db.has_table("workout_log") else []
+        return jsonify([public(entry) for entry in sorted(entries, key=set_order)])
 
     @app.route("/workouts", methods=["POST"])
     def create_workout():
+        db = get_db()
         data = request.get_json()
         data = CompletedSet(**data).model_dump()
         workout = db.add("workout_log",data)
@@ -35,13 +133,42 @@ def register_routes(app):
 
     @app.route("/workouts/<string:workout_id>", methods=["PUT"])
     def update_workout(workout_id):
+        db = get_db()
         data = request.get_json()
-        data = CompletedSet(**data).model_dump()
-        updated = db.update(workout_id, data)
-        return jsonify(updated)
+        # The set is found by the composite key in the body; fields left out,
+        # like the Notion page id, keep their stored values.
+        data = CompletedSet(**data).model_dump(exclude_unset=True)
+        updated = db.update("workout_log", data, dirty=True) if db.has_table("workout_log") else None
+        if updated is None:
+            return jsonify({"error": f"Workout set '{workout_id}' not found."}), 404
+        return jsonify(public(updated))
 
     @app.route("/workouts/<string:workout_id>", methods=["DELETE"])
     def delete_workout(workout_id):
+        db = get_db()
         data = CompletedSet(**data).model_dump()
         db.db.remove(workout_id)
         return '', 204
+
+    @app.route("/stats/tonnage", methods=["GET"])
+    def get_tonnage():
+        return jsonify(get_analytics().tonnage_by_exercise())
+
+    @app.route("/stats/weekly-volume", methods=["GET"])
+    def get_weekly_volume():
+        return jsonify(get_analytics().weekly_volume(request.args.get("exercise_id")))
+
+    @app.route("/stats/1rm", methods=["GET"])
+    def get_best_1rm():
+        try:
+            return jsonify(get_analytics().best_estimated_1rm(request.args.get("formula", "epley")))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+    @app.route("/sync/status", methods=["GET"])
+    def get_sync_status():
+        return jsonify(get_scheduler().status())
+
+    @app.route("/sync/trigger", methods=["POST"])
+    def trigger_sync():
+        return jsonify(get_scheduler().trigger()), 202
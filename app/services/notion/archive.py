@@ -0,0 +1,187 @@
+import os
+import gzip
+import json
+import hashlib
+import lzma
+import sqlite3
+import logging
+import threading
+from typing import Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+OPENERS = {"gzip": (gzip.open, ".jsonl.gz"), "lzma": (lzma.open, ".jsonl.xz")}
+
+
+def page_hash(page: dict) -> str:
+    """Hash of a page's content, to tell apart versions with the same `last_edited_time`."""
+    encoded = json.dumps(page, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class PageArchive:
+    """
+    Append-only archive of the raw pages received from Notion, so local data
+    can be rebuilt after a parser fix or a model change without downloading
+    everything again.
+
+    Pages are written as compressed JSON lines into numbered segments; every
+    `append` adds one compressed member to the current segment, and a new
+    segment is started once it reaches `max_bytes`. A SQLite index maps each
+    archived version of a page (`page_id`, `last_edited_time`) to its
+    segment and member offset, and the hash of its content. Notion's
+    `last_edited_time` only has minute precision, so a page fetched again
+    with the same timestamp but different content replaces that version.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 2 ** 20, compression: str = "gzip"):
+        if compression not in OPENERS:
+            raise ValueError(f"Unknown compression '{compression}'. Available: {sorted(OPENERS)}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._open, self._suffix = OPENERS[compression]
+        self._lock = threading.Lock()
+        self._index = sqlite3.connect(os.path.join(directory, "index.db"), check_same_thread=False)
+        with self._index:
+            self._index.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "page_id TEXT NOT NULL, last_edited_time TEXT NOT NULL, database_id TEXT NOT NULL, "
+                "segment TEXT NOT NULL, offset INTEGER NOT NULL, "
+                "PRIMARY KEY (page_id, last_edited_time))"
+            )
+            self._index.execute("CREATE INDEX IF NOT EXISTS pages_by_database ON pages (database_id, last_edited_time)")
+            # Indexes written before content hashes were stored lack the column.
+            if "hash" not in {row[1] for row in self._index.execute("PRAGMA table_info(pages)")}:
+                self._index.execute("ALTER TABLE pages ADD COLUMN hash TEXT")
+
+    def _segments(self) -> List[str]:
+        return sorted(name for name in os.listdir(self.directory) if name.endswith(self._suffix))
+
+    def _current_segment(self) -> str:
+        segments = self._segments()
+        if segments and os.path.getsize(os.path.join(self.directory, segments[-1])) < self.max_bytes:
+            return segments[-1]
+        number = int(segments[-1].split(".")[0].rsplit("-", 1)[1]) + 1 if segments else 1
+        return f"pages-{number:06d}{self._suffix}"
+
+    def append(self, database_id: str, pages: List[dict]) -> int:
+        """
+        Archives the pages of one query response. Versions already in the
+        archive are skipped; returns how many pages were written.
+        """
+        with self._lock:
+            known = {
+                (row[0], row[1]): row[2] for row in self._index.execute(
+                    f"SELECT page_id, last_edited_time, hash FROM pages WHERE page_id IN ({','.join('?' * len(pages))})",
+                    [page.get("id") for page in pages]
+                )
+            } if pages else {}
+            hashes = [page_hash(page) for page in pages]
+            new = [
+                (page, digest) for page, digest in zip(pages, hashes)
+                if known.get((page.get("id"), page.get("last_edited_time")), "") != digest
+            ]
+            if not new:
+                return 0
+
+            segment = self._current_segment()
+            path = os.path.join(self.directory, segment)
+            offset = os.path.getsize(path) if os.path.exists(path) else 0
+            with self._open(path, "at", encoding="utf-8") as f:
+                f.write("".join(json.dumps({"database_id": database_id, "page": page}) + "\n" for page, _ in new))
+            with self._index:
+                self._index.executemany(
+                    "INSERT OR REPLACE INTO pages (page_id, last_edited_time, database_id, segment, offset, hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(page["id"], page["last_edited_time"], database_id, segment, offset, digest) for page, digest in new]
+                )
+            return len(new)
+
+    def versions(self, page_id: str) -> List[str]:
+        """The archived `last_edited_time`s of a page, oldest first."""
+        rows = self._index.execute(
+            "SELECT last_edited_time FROM pages WHERE page_id = ? ORDER BY last_edited_time", (page_id,)
+        )
+        return [row[0] for row in rows]
+
+    def get(self, page_id: str, last_edited_time: Optional[str] = None) -> Optional[dict]:
+        """A page as archived, at its latest version unless one is given."""
+        query = "SELECT last_edited_time, segment, offset, hash FROM pages WHERE page_id = ?"
+        params = [page_id]
+        if last_edited_time is not None:
+            query += " AND last_edited_time = ?"
+            params.append(last_edited_time)
+        row = self._index.execute(query + " ORDER BY last_edited_time DESC LIMIT 1", params).fetchone()
+        if row is None:
+            return None
+        edited, segment, offset, digest = row
+        with open(os.path.join(self.directory, segment), "rb") as raw:
+            raw.seek(offset)
+            with self._open(raw, "rt", encoding="utf-8") as f:
+                for line in f:
+                    page = json.loads(line)["page"]
+                    if self._is_version(page, page_id, edited, digest):
+                        return page
+        return None
+
+    @staticmethod
+    def _is_version(page: dict, page_id: str, edited: str, digest: Optional[str]) -> bool:
+        if page.get("id") != page_id or page.get("last_edited_time") != edited:
+            return False
+        return digest is None or page_hash(page) == digest
+
+    def latest(self, database_id: str) -> Iterator[dict]:
+        """
+        Streams the latest archived version of every page of a database, in
+        archive order. Reads the segments sequentially and never holds more
+        than the index of latest versions in memory.
+        """
+        latest = {
+            page_id: (edited, digest) for page_id, edited, digest in self._index.execute(
+                "SELECT page_id, last_edited_time, hash FROM pages WHERE database_id = ? ORDER BY last_edited_time",
+                (database_id,)
+            )
+        }
+        for segment in self._segments():
+            try:
+                yield from self._latest_in_segment(segment, database_id, latest)
+            except EOFError:
+                # A member cut short by a crash mid-append; earlier lines were read.
+                logger.warning(f"Archive segment {segment} ends in a truncated member")
+
+    def _latest_in_segment(self, segment: str, database_id: str, latest: dict) -> Iterator[dict]:
+        with self._open(os.path.join(self.directory, segment), "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping a damaged line in archive segment {segment}")
+                    continue
+                page = record["page"]
+                version = latest.get(page["id"]) if record["database_id"] == database_id else None
+                if version is not None and self._is_version(page, page["id"], *version):
+                    del latest[page["id"]]
+                    yield page
+
+    def close(self):
+        self._index.close()
+
+
+_default_archive: Optional[PageArchive] = None
+_default_lock = threading.Lock()
+
+
+def get_default_archive() -> Optional[PageArchive]:
+    """
+    The process-wide archive configured by NOTION_ARCHIVE_DIR (and
+    optionally NOTION_ARCHIVE_COMPRESSION), or None when archiving is off.
+    """
+    global _default_archive
+    directory = os.environ.get("NOTION_ARCHIVE_DIR")
+    if not directory:
+        return None
+    with _default_lock:
+        if _default_archive is None or _default_archive.directory != directory:
+            _default_archive = PageArchive(directory, compression=os.environ.get("NOTION_ARCHIVE_COMPRESSION", "gzip"))
+        return _default_archive
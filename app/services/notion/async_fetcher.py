@@ -0,0 +1,124 @@
+import asyncio
+import datetime
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from app.models.sets import KeyedModel
+from app.services.notion.client import create_async_notion_client
+from app.services.notion.retry import Retrier, notion_retrier
+from app.services.notion.archive import PageArchive, get_default_archive
+from app.core.errors import APIError
+from app.services.notion.parser import get_property_ids, parse_database_info
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncFetcher:
+    """
+    Async counterpart of Fetcher built on notion_client.AsyncClient.
+
+    Use as an async context manager; every request made through it shares one
+    concurrency limit. While a batch of results is being parsed, the request
+    for the next cursor is already in flight.
+    """
+
+    def __init__(self, notion_client=None, max_concurrency: int = 3, retrier: Optional[Retrier] = None,
+                 archive: Optional[PageArchive] = None):
+        self._notion_client = notion_client
+        self.retrier = retrier or notion_retrier
+        self.archive = archive or get_default_archive()
+        self._owns_client = notion_client is None
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._database_info: Dict[str, dict] = {}
+
+    async def __aenter__(self):
+        if self._notion_client is None:
+            self._notion_client = create_async_notion_client()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, *args):
+        if self._owns_client and self._notion_client is not None:
+            await self._notion_client.aclose()
+            self._notion_client = None
+
+    async def _query(self, **kwargs) -> dict:
+        async with self._semaphore:
+            return await self.retrier.call_async(
+                self._notion_client.databases.query, description="databases.query", **kwargs
+            )
+
+    async def database_info(self, db_id, refresh: bool = False) -> Optional[dict]:
+        """Async counterpart of `Fetcher.database_info`."""
+        if refresh or db_id not in self._database_info:
+            try:
+                async with self._semaphore:
+                    info = await self.retrier.call_async(
+                        self._notion_client.databases.retrieve, description="databases.retrieve", database_id=db_id
+                    )
+            except APIError as e:
+                logger.warning(f"Could not fetch the schema of {db_id}: {e}")
+                return self._database_info.get(db_id)
+            self._database_info[db_id] = parse_database_info(info)
+        return self._database_info[db_id]
+
+    async def iter_batches_by_last_edited_time(self, db_id, last_edited_time: Union[str, datetime.date],
+                                               start_cursor: Optional[str] = None,
+                                               model: Optional[KeyedModel] = None) -> AsyncIterator[Tuple[list, Optional[str]]]:
+        """
+        Async counterpart of `Fetcher.iter_batches_by_last_edited_time`:
+        yields each cursor page of results with the cursor that follows it,
+        as soon as it arrives, optionally resuming from `start_cursor`.
+        """
+        logger.info(f"🔍 Querying pages edited since {last_edited_time}...")
+        query = {
+            "database_id": db_id,
+            "filter": {
+                "timestamp": "last_edited_time",
+                "last_edited_time": {
+                    "on_or_after": (
+                        last_edited_time.isoformat() if isinstance(last_edited_time, datetime.date) else last_edited_time
+                    )
+                }
+            },
+            **await self._projection(db_id, model),
+        }
+        try:
+            cursor = {"start_cursor": start_cursor} if start_cursor else {}
+            pending = asyncio.ensure_future(self._query(**query, **cursor))
+            while pending is not None:
+                response = await pending
+                next_cursor = response.get("next_cursor")
+                pending = (
+                    asyncio.ensure_future(self._query(**query, start_cursor=next_cursor))
+                    if next_cursor else None
+                )
+                await self._archive(db_id, response["results"])
+                yield response["results"], next_cursor
+        except APIError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to query pages by last edited time: {e}")
+
+    async def iter_pages_by_last_edited_time(self, db_id, last_edited_time: Union[str, datetime.date],
+                                             model: Optional[KeyedModel] = None) -> AsyncIterator[list]:
+        """Yields each cursor page of results as soon as it arrives."""
+        async for results, _ in self.iter_batches_by_last_edited_time(db_id, last_edited_time, model=model):
+            yield results
+
+    async def _projection(self, db_id, model: Optional[KeyedModel]) -> dict:
+        # Archived pages keep every property; see Fetcher._projection.
+        if self.archive is not None or model is None:
+            return {}
+        info = await self.database_info(db_id)
+        ids = get_property_ids(info, model) if info else None
+        return {"filter_properties": ids} if ids else {}
+
+    async def _archive(self, db_id, pages: List[dict]):
+        if self.archive is None:
+            return
+        try:
+            await asyncio.to_thread(self.archive.append, db_id, pages)
+        except Exception as e:
+            logger.warning(f"Failed to archive {len(pages)} pages of {db_id}: {e}")
@@ -1,21 +1,45 @@
 import os
 import logging
-from notion_client import Client
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
 import app.core.log as log
 
-logger = logging.getLogger(__name__)
+if TYPE_CHECKING:
+    from notion_client import AsyncClient, Client
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 _notion = None
 
-def initialize_notion_client(api_key: str) -> Client:
+def initialize_notion_client(api_key: str) -> "Client":
+    from notion_client import Client
+
     return Client(auth=api_key, logger=log.initialize_logger(), log_level=logging.DEBUG)
 
-def get_notion_client() -> Client:
+def create_async_notion_client() -> "AsyncClient":
+    """
+    Creates a new async Notion client. Unlike the sync client it is not
+    shared: an httpx async client is bound to the event loop it runs on, so
+    each sync run opens and closes its own.
+    """
+    from notion_client import AsyncClient
+
+    load_dotenv()
+    try:
+        api_key = os.environ["NOTION_API_KEY"]
+    except KeyError:
+        logger.error("Missing NOTION_API_KEY in environment.")
+        raise
+    return AsyncClient(auth=api_key, logger=log.initialize_logger(), log_level=logging.DEBUG)
+
+def get_notion_client() -> "Client":
+    """
+    Returns the shared Notion client, creating it on first call. The .env file,
+    notion_client and the log file handler are only touched at that point.
+    """
     global _notion
     if _notion is None:
+        load_dotenv()
         try:
             _notion = initialize_notion_client(os.environ["NOTION_API_KEY"])
         except KeyError:
@@ -23,7 +47,7 @@ def get_notion_client() -> Client:
             raise
     return _notion
 
-def test_connection(client: Client):
+def test_connection(client: "Client"):
     try:
         client.users.list()
         print("✅ Connection to Notion API successful.")
@@ -1,95 +1,182 @@
 import os
 import logging
 import datetime
-from typing import Union
-from notion_client import Client
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from app.models.sets import KeyedModel
 from app.services.notion.client import get_notion_client
+from app.services.notion.parser import get_property_ids, parse_database_info
+from app.services.notion.retry import Retrier, notion_retrier
+from app.services.notion.archive import PageArchive, get_default_archive
+from app.core.errors import APIError
 
 logger = logging.getLogger(__name__)
 
 
 class Fetcher:
-    def __init__(self, notion_client= get_notion_client()):
-        self.notion_client = notion_client
+    def __init__(self, notion_client=None, retrier: Optional[Retrier] = None, archive: Optional[PageArchive] = None):
+        self._notion_client = notion_client
+        self.retrier = retrier or notion_retrier
+        self.archive = archive or get_default_archive()
+        self._database_info: Dict[str, dict] = {}
 
-    def query_pages_by_last_edited_time(self, db_id, last_edited_time: Union[str, datetime.date]):
-        logger.info(f"🔍 Querying pages edited since {last_edited_time}...")
+    @property
+    def notion_client(self):
+        if self._notion_client is None:
+            self._notion_client = get_notion_client()
+        return self._notion_client
+
+    def _iter_query_batches(self, error_message: str, start_cursor: Optional[str] = None,
+                            **query) -> Iterator[Tuple[List[dict], Optional[str]]]:
+        """
+        Yields (results, next_cursor) for each cursor page of a database
+        query, starting at `start_cursor`. A failed page request is retried
+        with the same cursor, so pages already yielded are never fetched again.
+        """
         try:
-            results, next_cursor = [], None
+            next_cursor = start_cursor
             while True:
-                response = self.notion_client.databases.query(
-                    database_id=db_id,
-                    start_cursor=next_cursor,
-                    filter={
-                        "timestamp": "last_edited_time",
-                        "last_edited_time": {
-                            "on_or_after": (
-                                last_edited_time.isoformat() if isinstance(last_edited_time, datetime.date) else last_edited_time
-                            )
-                        }
-                    }
+                response = self.retrier.call(
+                    self.notion_client.databases.query, description="databases.query",
+                    start_cursor=next_cursor, **query
                 )
-                results.extend(response["results"])
                 next_cursor = response.get("next_cursor")
+                self._archive(query["database_id"], response["results"])
+                yield response["results"], next_cursor
                 if not next_cursor:
                     break
-            return results
+        except APIError:
+            raise
         except Exception as e:
-            raise RuntimeError(f"Failed to query pages by last edited time: {e}")
+            raise RuntimeError(f"{error_message}: {e}")
 
-    def query_pages_in_date_range(self, db_id, start_date: Union[str, datetime.date], end_date: Union[str, datetime.date] = datetime.date.today()):
+    def _archive(self, db_id, pages: List[dict]):
+        if self.archive is None:
+            return
         try:
-            results, next_cursor = [], None
-            while True:
-                response = self.notion_client.databases.query(
-                    database_id=db_id,
-                    start_cursor=next_cursor,
-                    filter={
-                        "and": [
-                            {
-                                "property": "Date",
-                                "date": {"on_or_after": start_date.isoformat() if isinstance(start_date, datetime.date) else start_date}
-                            },
-                            {
-                                "property": "Date",
-                                "date": {"on_or_before": end_date.isoformat() if isinstance(end_date, datetime.date) else end_date}
-                            }
-                        ]
-                    }
-                )
-                results.extend(response["results"])
-                next_cursor = response.get("next_cursor")
-                if not next_cursor:
-                    break
-            return results
+            self.archive.append(db_id, pages)
         except Exception as e:
-            raise RuntimeError(f"Failed to query pages in date range: {e}")
+            logger.warning(f"Failed to archive {len(pages)} pages of {db_id}: {e}")
+
+    def database_info(self, db_id, refresh: bool = False) -> Optional[dict]:
+        """
+        The parsed schema of a database (see `parse_database_info`), fetched
+        once per Fetcher, or again with `refresh`; each sync run refreshes it
+        so schema edits are picked up. When the fetch fails, returns the
+        schema fetched last, or None.
+        """
+        if refresh or db_id not in self._database_info:
+            try:
+                self._database_info[db_id] = parse_database_info(self.fetch_database_info(db_id))
+            except (APIError, RuntimeError) as e:
+                logger.warning(f"Could not fetch the schema of {db_id}: {e}")
+                return self._database_info.get(db_id)
+        return self._database_info[db_id]
+
+    def property_ids(self, db_id, model: Optional[KeyedModel]) -> Optional[List[str]]:
+        """
+        Ids of the properties `model`'s parser reads. Property ids survive
+        renames, so ids from the cached schema stay valid. Returns None,
+        meaning "all properties", without a model or a schema.
+        """
+        info = self.database_info(db_id) if model is not None else None
+        return get_property_ids(info, model) if info else None
+
+    def _projection(self, db_id, model: Optional[KeyedModel]) -> dict:
+        # Archived pages keep every property, so a replay can fill fields the
+        # parser does not read yet.
+        if self.archive is not None:
+            return {}
+        ids = self.property_ids(db_id, model)
+        return {"filter_properties": ids} if ids else {}
+
+    def _iter_query(self, error_message: str, **query) -> Iterator[dict]:
+        """Yields the pages of a database query one by one."""
+        for results, _ in self._iter_query_batches(error_message, **query):
+            yield from results
+
+    def iter_batches_by_last_edited_time(self, db_id, last_edited_time: Union[str, datetime.date],
+                                         start_cursor: Optional[str] = None,
+                                         model: Optional[KeyedModel] = None) -> Iterator[Tuple[List[dict], Optional[str]]]:
+        """
+        Cursor-page variant of `iter_pages_by_last_edited_time`: yields each
+        page of results with the cursor that continues after it, and can
+        start from a saved cursor. With a model, pages only carry the
+        properties its parser reads.
+        """
+        logger.info(f"🔍 Querying pages edited since {last_edited_time}...")
+        return self._iter_query_batches(
+            "Failed to query pages by last edited time",
+            start_cursor=start_cursor,
+            **self._last_edited_query(db_id, last_edited_time),
+            **self._projection(db_id, model)
+        )
+
+    def iter_pages_by_last_edited_time(self, db_id, last_edited_time: Union[str, datetime.date],
+                                       model: Optional[KeyedModel] = None) -> Iterator[dict]:
+        for results, _ in self.iter_batches_by_last_edited_time(db_id, last_edited_time, model=model):
+            yield from results
+
+    @staticmethod
+    def _last_edited_query(db_id, last_edited_time: Union[str, datetime.date]) -> dict:
+        return dict(
+            database_id=db_id,
+            filter={
+                "timestamp": "last_edited_time",
+                "last_edited_time": {
+                    "on_or_after": (
+                        last_edited_time.isoformat() if isinstance(last_edited_time, datetime.date) else last_edited_time
+                    )
+                }
+            }
+        )
+
+    def query_pages_by_last_edited_time(self, db_id, last_edited_time: Union[str, datetime.date],
+                                        model: Optional[KeyedModel] = None):
+        return list(self.iter_pages_by_last_edited_time(db_id, last_edited_time, model=model))
+
+    def iter_pages_in_date_range(self, db_id, start_date: Union[str, datetime.date], end_date: Union[str, datetime.date] = datetime.date.today()) -> Iterator[dict]:
+        return self._iter_query(
+            "Failed to query pages in date range",
+            database_id=db_id,
+            filter={
+                "and": [
+                    {
+                        "property": "Date",
+                        "date": {"on_or_after": start_date.isoformat() if isinstance(start_date, datetime.date) else start_date}
+                    },
+                    {
+                        "property": "Date",
+                        "date": {"on_or_before": end_date.isoformat() if isinstance(end_date, datetime.date) else end_date}
+                    }
+                ]
+            }
+        )
+
+    def query_pages_in_date_range(self, db_id, start_date: Union[str, datetime.date], end_date: Union[str, datetime.date] = datetime.date.today()):
+        return list(self.iter_pages_in_date_range(db_id, start_date, end_date))
 
     def fetch_database_info(self, database_id):
         try:
-            return self.notion_client.databases.retrieve(database_id=database_id)
+            return self.retrier.call(
+                self.notion_client.databases.retrieve, description="databases.retrieve", database_id=database_id
+            )
+        except APIError:
+            raise
         except Exception as e:
             raise RuntimeError(f"Failed to fetch database info: {e}")
 
-    def fetch_all_pages(self, database_id):
-        try:
-            results, next_cursor = [], None
-            while True:
-                response = self.notion_client.databases.query(
-                    database_id=database_id,
-                    start_cursor=next_cursor
-                )
-                results.extend(response["results"])
-                next_cursor = response.get("next_cursor")
-                if not next_cursor:
-                    break
-            return results
-        except Exception as e:
-            raise RuntimeError(f"Failed to fetch all pages: {e}")
+    def iter_all_pages(self, database_id, model: Optional[KeyedModel] = None) -> Iterator[dict]:
+        return self._iter_query(
+            "Failed to fetch all pages", database_id=database_id, **self._projection(database_id, model)
+        )
+
+    def fetch_all_pages(self, database_id, model: Optional[KeyedModel] = None):
+        return list(self.iter_all_pages(database_id, model=model))
 
     def get1RMEntry(self, exercise_id):
         try:
-            response = self.notion_client.databases.query(
+            response = self.retrier.call(
+                self.notion_client.databases.query, description="databases.query",
                 database_id=os.environ["DBID_WORKOUTLOG"],
                 filter={
                     "and": [
@@ -107,5 +194,7 @@ class Fetcher:
                 page_size=1
             )
             return response["results"][0] if response["results"] else None
+        except APIError:
+            raise
         except Exception as e:
             raise RuntimeError(f"Failed to query 1RM entry: {e}")
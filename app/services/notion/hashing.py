@@ -0,0 +1,51 @@
+import json
+import hashlib
+from typing import Dict, Optional
+
+# Row fields holding the hashes of the Notion properties last pushed or pulled.
+HASH_FIELD = "_hash"
+PROPERTY_HASHES_FIELD = "_property_hashes"
+
+
+def _canonical(value):
+    # Validated and trusted parses disagree on 60 vs 60.0; both mean the same number.
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return {k: _canonical(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def _digest(value) -> str:
+    encoded = json.dumps(_canonical(value), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def property_hashes(properties: dict) -> Dict[str, str]:
+    """Hash of each property of a `to_notion_format` payload, by property name."""
+    return {name: _digest(value) for name, value in properties.items()}
+
+
+def content_hash(hashes: Dict[str, str]) -> str:
+    """Hash of a whole record, from its property hashes."""
+    return _digest(hashes)
+
+
+def hash_fields(properties: dict) -> dict:
+    """The hash fields to store on a row whose Notion page has `properties`."""
+    hashes = property_hashes(properties)
+    return {HASH_FIELD: content_hash(hashes), PROPERTY_HASHES_FIELD: hashes}
+
+
+def changed_properties(properties: dict, entry: dict) -> Optional[dict]:
+    """
+    The properties that differ from the version last stored on `entry`: all
+    of them when the row has no hashes yet, None when nothing changed.
+    """
+    hashes = property_hashes(properties)
+    if entry.get(HASH_FIELD) == content_hash(hashes):
+        return None
+    stored = entry.get(PROPERTY_HASHES_FIELD) or {}
+    return {name: value for name, value in properties.items() if stored.get(name) != hashes[name]}
@@ -1,35 +1,347 @@
-from typing import Any, Iterable, Union
+from typing import Any, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import multiprocessing
+import threading
 import logging
 import datetime
+import os
 
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
+from typing_extensions import TypedDict
 
 from app.models.sets import KeyedModel, CompletedSet, Exercise
-from app.core.errors import ModelError, ParsingError
+from app.models.records import intern_strings
+from app.core.errors import ModelError, ParsingError, SyncError
 
 logger = logging.getLogger(__name__)
 
 
-def parse_data(data: Union[Any, Iterable], model: KeyedModel) -> Union[dict, list[dict]]:
-    parser = _get_parser_for_model(model)
+# Lists of at least this many pages are parsed on the worker pool unless
+# `parallel` says otherwise; PARALLEL_PARSE_THRESHOLD overrides it.
+DEFAULT_PARALLEL_THRESHOLD = 20_000
+PARSE_CHUNK_SIZE = 2_000
+
+
+class RecordError(NamedTuple):
+    """A page that failed to parse: its position in the input, and the error."""
+    index: int
+    error: SyncError
+
+
+def parse_data(data: Union[Any, Iterable], model: KeyedModel, database_info: Optional[dict] = None,
+               trusted: bool = False, errors: Optional[list] = None,
+               parallel: Optional[bool] = None) -> Union[dict, list[dict], Iterator[dict]]:
+    """
+    Parses a single page, a list of pages, or a stream of pages with the
+    parser compiled for `model` and the database schema (see
+    `compile_parser`). Lists are validated as one batch; iterators are parsed
+    lazily and come back as an iterator, so a generator of pages is never
+    materialized.
+
+    With an `errors` list, pages that fail are left out of the result and
+    recorded there as RecordErrors instead of raising. Large lists are parsed
+    across processes (see `parse_parallel`), with results in input order.
+    """
+    parser = compile_parser(model, database_info, trusted)
 
     if isinstance(data, dict):
-        return parser(data)
+        return parser.parse(data)
+    elif isinstance(data, Iterator):
+        return _parse_stream(parser, data, errors)
     elif isinstance(data, Iterable):
-        return [parser(item) for item in data]
+        pages = data if isinstance(data, list) else list(data)
+        if parallel is None:
+            parallel = len(pages) >= parallel_threshold()
+        if parallel:
+            return parse_parallel(pages, model, database_info, trusted, errors)
+        return parser.parse_many(pages, errors)
 
     logger.info("No data to parse.")
     return []
 
 
-def _get_parser_for_model(model: KeyedModel):
+def parallel_threshold() -> int:
+    """Number of pages from which `parse_data` parses a list in parallel."""
+    return int(os.environ.get("PARALLEL_PARSE_THRESHOLD", DEFAULT_PARALLEL_THRESHOLD))
+
+
+def _parse_stream(parser: "CompiledParser", pages: Iterator[dict], errors: Optional[list]) -> Iterator[dict]:
+    for index, page in enumerate(pages):
+        if errors is None:
+            yield parser.parse(page)
+            continue
+        record_errors = []
+        records = parser.parse_many([page], record_errors)
+        errors.extend(RecordError(index, e.error) for e in record_errors)
+        yield from records
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """
+    The worker pool shared by every parallel parse, started on first use and
+    kept for later syncs. Workers are spawned rather than forked, since the
+    app forks from a process that may be running threads.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = int(os.environ.get("PARSE_WORKERS", 0)) or None
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_parse_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+def _parse_chunk(model: KeyedModel, database_info: Optional[dict], trusted: bool,
+                 pages: list[dict]) -> Tuple[list[dict], list[RecordError]]:
+    errors = []
+    return compile_parser(model, database_info, trusted).parse_many(pages, errors), errors
+
+
+def parse_parallel(pages: list[dict], model: KeyedModel, database_info: Optional[dict] = None,
+                   trusted: bool = False, errors: Optional[list] = None,
+                   chunk_size: int = PARSE_CHUNK_SIZE) -> list[dict]:
+    """
+    Parses chunks of `pages` on the worker pool. Each worker reports failed
+    pages per record, so a bad page never costs the rest of its chunk.
+    Without an `errors` list, the first failure is raised once all chunks
+    are done.
+    """
+    starts = range(0, len(pages), chunk_size)
+    chunks = (pages[start:start + chunk_size] for start in starts)
+    results = _get_pool().map(partial(_parse_chunk, model, database_info, trusted), chunks)
+
+    parsed = []
+    for start, (records, chunk_errors) in zip(starts, results):
+        parsed.extend(records)
+        for record_error in chunk_errors:
+            if errors is None:
+                raise record_error.error
+            errors.append(RecordError(start + record_error.index, record_error.error))
+    return parsed
+
+
+class EditWatermark:
+    """
+    Tracks the newest `last_edited_time` among the raw pages passed through
+    `track`, so a sync can resume from the latest edit it has actually seen.
+    Notion timestamps share one ISO format and compare correctly as strings.
+    """
+
+    def __init__(self):
+        self.value = None
+
+    def observe(self, page: dict):
+        edited = page.get("last_edited_time")
+        if edited and (self.value is None or edited > self.value):
+            self.value = edited
+
+    def track(self, pages: Iterable[dict]) -> Iterator[dict]:
+        for page in pages:
+            self.observe(page)
+            yield page
+
+
+# How each model field is read from a page: (property name, Notion type,
+# value used when the property is empty). A None property name reads the
+# page id. The type is only a fallback; compiled parsers use the type found
+# in the database schema.
+SET_FIELDS = {
+    "workout_name": ("Workout Title", "select", None),
+    "weight": ("Weight", "number", None),
+    "reps": ("Reps", "number", None),
+    "exercise_id": ("Exercise Reference", "relation", None),
+    "set_number": ("Set #", "number", None),
+    "date": ("Date", "date", None),
+    "page_id": (None, None, None),
+    "exercise_notes": ("Notes", "rich_text", ""),
+}
+EXERCISE_FIELDS = {
+    "id": (None, None, None),
+    "name": ("Name", "title", "Unnamed Exercise"),
+    "category": ("Category", "select", ""),
+    "equipment": ("Equipment", "select", ""),
+    "force": ("Force", "select", ""),
+    "level": ("Level", "select", ""),
+    "mechanic": ("Mechanic", "select", ""),
+    "primary_muscles": ("Primary Muscles", "multi_select", []),
+    "secondary_muscles": ("Secondary Muscles", "multi_select", []),
+}
+
+# The Notion properties each parser reads. Queries request only these, so
+# formulas, rollups and other unused properties never leave Notion.
+SET_PROPERTIES = tuple(name for name, _, _ in SET_FIELDS.values() if name)
+EXERCISE_PROPERTIES = tuple(name for name, _, _ in EXERCISE_FIELDS.values() if name)
+
+
+def get_property_ids(database_info: dict, model: KeyedModel) -> Optional[list[str]]:
+    """
+    Maps the properties read by the model's parser to their ids in a parsed
+    database schema (see `parse_database_info`), for a query's
+    `filter_properties`. Returns None, meaning "all properties", when none of
+    them can be resolved.
+    """
+    schema = database_info.get("properties") or {}
+    names = _get_properties_for_model(model)
+    missing = [name for name in names if not (schema.get(name) or {}).get("id")]
+    if missing:
+        logger.warning(f"Properties missing from database '{database_info.get('title')}': {missing}")
+    ids = [schema[name]["id"] for name in names if name not in missing]
+    return ids or None
+
+
+def _get_properties_for_model(model: KeyedModel) -> tuple[str, ...]:
     if model == CompletedSet:
-        return parse_set_data
+        return SET_PROPERTIES
     if model == Exercise:
-        return parse_exercise_data
+        return EXERCISE_PROPERTIES
     raise ValueError(f"Unsupported model type: {model}")
 
 
+def _get_fields_for_model(model: KeyedModel) -> dict:
+    if model == CompletedSet:
+        return SET_FIELDS
+    if model == Exercise:
+        return EXERCISE_FIELDS
+    raise ValueError(f"Unsupported model type: {model}")
+
+
+def _formula_value(prop: dict):
+    formula = prop.get("formula") or {}
+    return formula.get(formula.get("type"))
+
+
+# Reads the value of one property, by Notion property type.
+EXTRACTORS = {
+    "number": lambda prop: prop.get("number"),
+    "select": lambda prop: (prop.get("select") or {}).get("name"),
+    "status": lambda prop: (prop.get("status") or {}).get("name"),
+    "multi_select": lambda prop: [option.get("name") for option in prop.get("multi_select") or []],
+    "relation": lambda prop: (prop.get("relation") or [{}])[0].get("id"),
+    "date": lambda prop: (prop.get("date") or {}).get("start"),
+    "title": lambda prop: extract_title(prop.get("title") or []),
+    "rich_text": lambda prop: extract_text(prop.get("rich_text") or []),
+    "formula": _formula_value,
+}
+
+
+class CompiledParser:
+    """
+    Page parser for one model and database, built once from the database
+    schema instead of resolving every field per page.
+
+    Each field becomes a flat extractor chosen by the property's type in the
+    schema, so a number that was turned into a formula keeps parsing. Batches
+    are validated in one call through a `TypeAdapter` over a TypedDict with
+    the model's fields, which checks and coerces the same types as the model
+    without building and dumping a model instance per page. A `trusted`
+    parser skips pydantic altogether and returns the extracted values as
+    Notion sent them; use it only for databases whose schema is known to
+    match the model.
+    """
+
+    def __init__(self, model: KeyedModel, database_info: Optional[dict] = None, trusted: bool = False):
+        self.model = model
+        self.trusted = trusted
+        self._adapter = None if trusted else TypeAdapter(list[_row_type(model)])
+        schema = (database_info or {}).get("properties") or {}
+        self._fields = []
+        for field, (name, default_type, default) in _get_fields_for_model(model).items():
+            prop_type = (schema.get(name) or {}).get("type", default_type) if name else None
+            if name and prop_type not in EXTRACTORS:
+                logger.warning(f"Unsupported type '{prop_type}' for property '{name}'; reading it as {default_type}.")
+                prop_type = default_type
+            self._fields.append((field, name, EXTRACTORS.get(prop_type), default))
+
+    def extract(self, page: dict) -> dict:
+        """Reads the model fields of a page without validating them."""
+        try:
+            props = page.get("properties") or {}
+            record = {}
+            for field, name, extractor, default in self._fields:
+                if name is None:
+                    value = page.get("id")
+                else:
+                    prop = props.get(name)
+                    value = extractor(prop) if prop else None
+                record[field] = default if value is None else value
+            return intern_strings(record)
+        except Exception as e:
+            raise ParsingError(
+                f"Failed to parse {self.model.__name__} data",
+                context={"data": page, "error": str(e)}, original_exception=e
+            )
+
+    def parse(self, page: dict) -> dict:
+        return self.parse_many([page])[0]
+
+    def parse_many(self, pages: list[dict], errors: Optional[list] = None) -> list[dict]:
+        """
+        Parses a batch of pages. With an `errors` list, failed pages are
+        dropped from the result and recorded as RecordErrors; otherwise the
+        first failure raises.
+        """
+        records, positions, failed = [], [], []
+        for index, page in enumerate(pages):
+            try:
+                records.append(self.extract(page))
+                positions.append(index)
+            except ParsingError as e:
+                if errors is None:
+                    raise
+                failed.append(RecordError(index, e))
+        parsed = records if self.trusted else self._validate(records, positions, failed, errors is not None)
+        if errors is not None:
+            errors.extend(sorted(failed, key=lambda failure: failure.index))
+        return parsed
+
+    def _validate(self, records: list[dict], positions: list[int], failed: list, per_record: bool) -> list[dict]:
+        try:
+            return self._adapter.validate_python(records)
+        except ValidationError as e:
+            message = f"Parsed {self.model.__name__} did not match model schema"
+            if not per_record:
+                raise ModelError(message, context=e.errors())
+            by_record = {}
+            for error in e.errors(include_url=False):
+                by_record.setdefault(error["loc"][0], []).append({**error, "loc": error["loc"][1:]})
+            failed.extend(RecordError(positions[i], ModelError(message, context=by_record[i])) for i in by_record)
+            return self._adapter.validate_python([r for i, r in enumerate(records) if i not in by_record])
+
+
+def _row_type(model: KeyedModel) -> type:
+    """A TypedDict with the fields and types of `model`, for batch validation."""
+    return TypedDict(f"{model.__name__}Row", {name: field.annotation for name, field in model.model_fields.items()})
+
+
+_compiled_parsers: dict = {}
+
+
+def compile_parser(model: KeyedModel, database_info: Optional[dict] = None, trusted: bool = False) -> CompiledParser:
+    """
+    The parser for `model` and a parsed database schema (see
+    `parse_database_info`), compiled on first use. A schema edit changes the
+    database's `last_edited_time`, which compiles a new parser.
+    """
+    info = database_info or {}
+    key = (model, info.get("id"), info.get("last_edited_time"), trusted)
+    parser = _compiled_parsers.get(key)
+    if parser is None:
+        parser = _compiled_parsers[key] = CompiledParser(model, database_info, trusted)
+    return parser
+
+
 def parse_set_data(data: dict) -> dict:
     try:
         props = data.get("properties", {})
@@ -0,0 +1,235 @@
+import time
+import random
+import asyncio
+import logging
+import threading
+from typing import Callable, Optional
+
+from app.core.errors import APIError
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = {409, 429, 500, 502, 503, 504}
+# Statuses Notion answers before applying a request, so even a request that
+# must not run twice can be repeated.
+REJECTED_STATUSES = {409, 429}
+
+
+class RetryMetrics:
+    """Thread-safe counters for Notion calls made through a Retrier."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.wait_seconds = 0.0
+        self.rejected = 0
+        self.circuit_opens = 0
+
+    def record(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "retries": self.retries,
+                "failures": self.failures,
+                "wait_seconds": round(self.wait_seconds, 3),
+                "rejected": self.rejected,
+                "circuit_opens": self.circuit_opens,
+            }
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failed calls and rejects calls
+    for `reset_timeout` seconds, so an outage fails fast instead of tying up
+    every worker in backoff. After the timeout one trial call is let through;
+    its success closes the circuit again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if self._clock() - self._opened_at >= self.reset_timeout else "open"
+
+    def admit(self) -> Optional[bool]:
+        """
+        None if the call is rejected, otherwise whether it is the half-open
+        trial. A trial must end in `record_success`, `record_failure` or
+        `end_trial`, or no other call is let through.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if self._clock() - self._opened_at < self.reset_timeout or self._trial_running:
+                return None
+            self._trial_running = True
+            return True
+
+    def allow(self) -> bool:
+        return self.admit() is not None
+
+    def end_trial(self):
+        """Ends a trial that told nothing about Notion; the next call is a new trial."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> bool:
+        """Records a failed call; returns True if this opened the circuit."""
+        with self._lock:
+            self._failures += 1
+            reopened = self._trial_running
+            self._trial_running = False
+            if reopened or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self._opened_at = self._clock()
+                return True
+            return False
+
+
+def _is_transient(e: Exception) -> bool:
+    from httpx import TransportError
+    from notion_client.errors import RequestTimeoutError
+
+    if isinstance(e, (RequestTimeoutError, TransportError)):
+        return True
+    return getattr(e, "status", None) in RETRYABLE_STATUSES
+
+
+def _is_notion_error(e: Exception) -> bool:
+    from httpx import TransportError
+    from notion_client.errors import HTTPResponseError, RequestTimeoutError
+
+    return isinstance(e, (HTTPResponseError, RequestTimeoutError, TransportError))
+
+
+def _retry_after(e: Exception) -> Optional[float]:
+    headers = getattr(e, "headers", None)
+    value = headers.get("Retry-After") if headers is not None else None
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class Retrier:
+    """
+    Runs Notion calls with retries. Rate limits, conflicts, 5xx responses and
+    timeouts are retried with full-jitter exponential backoff, waiting at
+    least as long as a `Retry-After` header asks. Once a call gives up, or on
+    any other Notion error, it raises APIError; calls rejected by the circuit
+    breaker raise APIError without touching the network.
+
+    Each retried call repeats one request, so a paginated query resumes from
+    the cursor of the page that failed. Calls made with `idempotent=False`,
+    such as page creation, are only retried on rate limits and conflicts:
+    after a 5xx or a timeout the request may have been applied.
+    """
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 30.0,
+                 breaker: Optional[CircuitBreaker] = None, sleep: Callable[[float], None] = time.sleep):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = RetryMetrics()
+        self._sleep = sleep
+
+    def backoff(self, attempt: int, e: Exception) -> float:
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        retry_after = _retry_after(e)
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    def _before_call(self, description: str) -> bool:
+        """Returns whether the call is the circuit breaker's half-open trial."""
+        trial = self.breaker.admit()
+        if trial is None:
+            self.metrics.record(rejected=1)
+            raise APIError(f"Notion circuit is open; skipped {description}", context={"state": self.breaker.state})
+        self.metrics.record(calls=1)
+        return trial
+
+    def _after_failure(self, attempt: int, e: Exception, description: str, idempotent: bool) -> float:
+        """Returns how long to wait before the next attempt, or raises APIError."""
+        transient = _is_transient(e)
+        retryable = transient and (idempotent or getattr(e, "status", None) in REJECTED_STATUSES)
+        if not transient:
+            # Notion answered, so it is up; the request itself was wrong.
+            self.breaker.record_success()
+        elif self.breaker.record_failure():
+            self.metrics.record(circuit_opens=1)
+            logger.warning("Notion circuit opened after repeated failures.")
+        if not retryable or attempt + 1 >= self.max_attempts or self.breaker.state == "open":
+            self.metrics.record(failures=1)
+            raise APIError(
+                f"Notion call failed: {description}",
+                context={"status": getattr(e, "status", None), "attempts": attempt + 1},
+                original_exception=e,
+            )
+        wait = self.backoff(attempt, e)
+        self.metrics.record(retries=1, wait_seconds=wait)
+        logger.warning(f"Retrying {description} in {wait:.2f}s after: {e}")
+        return wait
+
+    def call(self, fn: Callable, *args, description: str = "request", idempotent: bool = True, **kwargs):
+        trial = self._before_call(description)
+        try:
+            for attempt in range(self.max_attempts):
+                try:
+                    result = fn(*args, **kwargs)
+                except Exception as e:
+                    if not _is_notion_error(e):
+                        raise
+                    self._sleep(self._after_failure(attempt, e, description, idempotent))
+                    continue
+                self.breaker.record_success()
+                return result
+        finally:
+            if trial:
+                # Already ended unless the trial raised something other than a Notion error.
+                self.breaker.end_trial()
+
+    async def call_async(self, fn: Callable, *args, description: str = "request", idempotent: bool = True, **kwargs):
+        trial = self._before_call(description)
+        try:
+            for attempt in range(self.max_attempts):
+                try:
+                    result = await fn(*args, **kwargs)
+                except Exception as e:
+                    if not _is_notion_error(e):
+                        raise
+                    await asyncio.sleep(self._after_failure(attempt, e, description, idempotent))
+                    continue
+                self.breaker.record_success()
+                return result
+        finally:
+            if trial:
+                # Already ended unless the trial raised something other than a Notion error.
+                self.breaker.end_trial()
+
+
+# One breaker and one set of metrics for the whole process: Fetcher, Setter
+# and AsyncFetcher all talk to the same Notion integration.
+notion_retrier = Retrier()
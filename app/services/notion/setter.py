@@ -1,42 +1,131 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple, Optional, Tuple
 from app.services.notion.client import get_notion_client
-from notion_client.errors import APIResponseError
+from app.services.notion.rate_limit import TokenBucket
+from app.services.notion.retry import Retrier, notion_retrier
+from app.core.errors import APIError
 
 logger = logging.getLogger(__name__)
 
 
+class PageResult(NamedTuple):
+    """Outcome of one page in a bulk call: the page id, or the error raised."""
+    page_id: Optional[str]
+    error: Optional[Exception] = None
+
+
 class Setter:
-    def __init__(self, notion_client=get_notion_client()):
-        self.notion_client = notion_client
+    def __init__(self, notion_client=None, rate_limiter: Optional[TokenBucket] = None, max_workers: int = 3,
+                 retrier: Optional[Retrier] = None):
+        self._notion_client = notion_client
+        self.rate_limiter = rate_limiter or TokenBucket()
+        self.max_workers = max_workers
+        self.retrier = retrier or notion_retrier
+
+    @property
+    def notion_client(self):
+        if self._notion_client is None:
+            self._notion_client = get_notion_client()
+        return self._notion_client
+
+    def _request(self, fn, description: str, idempotent: bool = True, **kwargs):
+        """Calls the Notion API with retries, taking a rate-limit token per attempt."""
+        def paced(**kw):
+            self.rate_limiter.acquire()
+            return fn(**kw)
+        return self.retrier.call(paced, description=description, idempotent=idempotent, **kwargs)
 
     def add_page(self, page_data: dict, database_id: str) -> str:
         try:
-            response = self.notion_client.pages.create(
+            response = self._request(
+                self.notion_client.pages.create, "pages.create", idempotent=False,
                 parent={"database_id": database_id},
                 properties=page_data
             )
             return response["id"]
-        except APIResponseError as e:
+        except APIError as e:
             logger.error(f"Failed to add page: {page_data}. Error: {e}")
             raise
         except Exception as e:
             logger.error(f"Unexpected error while adding page: {e}")
             raise RuntimeError("Unexpected error while adding page.")
 
+    def update_page(self, page_id: str, page_data: dict):
+        try:
+            self._request(self.notion_client.pages.update, "pages.update", page_id=page_id, properties=page_data)
+        except APIError as e:
+            logger.error(f"Failed to update page {page_id}: {page_data}. Error: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error while updating page: {e}")
+            raise RuntimeError("Unexpected error while updating page.")
+
+    def add_pages(self, pages: List[dict], database_id: str) -> List[PageResult]:
+        """
+        Creates pages on a bounded worker pool, paced by the rate limiter.
+        Failures are collected per page instead of aborting the batch; results
+        are in input order.
+        """
+        def create(page_data):
+            try:
+                return PageResult(self.add_page(page_data, database_id))
+            except Exception as e:
+                return PageResult(None, e)
+
+        return self._run_bulk(create, pages)
+
+    def update_pages(self, updates: List[Tuple[str, dict]]) -> List[PageResult]:
+        """Bulk counterpart of `update_page` for (page_id, page_data) pairs."""
+        def update(item):
+            page_id, page_data = item
+            try:
+                self.update_page(page_id, page_data)
+                return PageResult(page_id)
+            except Exception as e:
+                return PageResult(None, e)
+
+        return self._run_bulk(update, updates)
+
+    def _run_bulk(self, fn, items: list) -> List[PageResult]:
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(fn, items))
+
+    def set_max_1rm(self, exercise_id: str, set_page_id: str):
+        """Points an exercise's "Max 1RM Instance" relation at a set page."""
+        self._request(
+            self.notion_client.pages.update, "pages.update",
+            page_id=exercise_id,
+            properties={
+                "Max 1RM Instance": {
+                    "relation": [{"id": set_page_id}]
+                }
+            }
+        )
+
+    def set_max_1rms(self, references: List[Tuple[str, str]]) -> List[PageResult]:
+        """Bulk `set_max_1rm` for (exercise_id, set_page_id) pairs."""
+        def update(item):
+            exercise_id, set_page_id = item
+            try:
+                self.set_max_1rm(exercise_id, set_page_id)
+                return PageResult(exercise_id)
+            except Exception as e:
+                return PageResult(None, e)
+
+        return self._run_bulk(update, references)
+
     def set_1RM_reference(self, one_rm_entry: dict):
         try:
             page_id = one_rm_entry["properties"]["Exercise Reference"]["relation"][0]["id"]
-            self.notion_client.pages.update(
-                page_id=page_id,
-                properties={
-                    "Max 1RM Instance": {
-                        "relation": [{"id": one_rm_entry["id"]}]
-                    }
-                }
-            )
+            self.set_max_1rm(page_id, one_rm_entry["id"])
         except KeyError as e:
             logger.error(f"Missing expected key when setting 1RM: {e}")
             raise KeyError(f"Key error: {e}")
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Failed to set 1RM reference: {e}")
             raise RuntimeError(f"Failed to set 1RM reference: {e}")
@@ -0,0 +1,173 @@
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from app.models.sets import BestSet
+from app.core.one_rep_max import get_formula
+
+logger = logging.getLogger(__name__)
+
+
+class OneRepMaxEngine:
+    """
+    Keeps a per-exercise best-set table (`best_set`) for the estimated 1RM of
+    a completed-set table.
+
+    The table is rebuilt with one vectorized pass over the columnar mirror,
+    then kept current from change notifications: added sets are compared
+    against the stored best of their exercise, and any other change triggers
+    another pass. A best row is flagged `_dirty` when it starts pointing at a
+    different set page, so `push` only updates the "Max 1RM Instance"
+    relation of exercises whose best set actually changed.
+    """
+
+    def __init__(self, database, analytics=None, formula: str = "epley",
+                 table_name: str = "workout_log", best_table: str = "best_set"):
+        self.database = database
+        self.formula = formula
+        self._estimate = get_formula(formula)
+        self.table_name = table_name
+        self.best_table = best_table
+        if analytics is None:
+            # NumPy is only imported once 1RMs are actually needed.
+            from app.db.columnar import ColumnarSetStore
+
+            analytics = ColumnarSetStore(database, table_name)
+        self.analytics = analytics
+        self._lock = threading.RLock()
+        self._best: Optional[Dict[str, dict]] = None
+        database.subscribe(table_name, self._on_change)
+
+    def best(self) -> Dict[str, dict]:
+        """Current best set per exercise id."""
+        with self._lock:
+            if self._best is None:
+                self.rebuild()
+            return {exercise_id: dict(row) for exercise_id, row in self._best.items()}
+
+    def rebuild(self) -> List[str]:
+        """
+        Recomputes every exercise's best set and stores the ones that differ
+        from the table. Returns the exercise ids whose row was written.
+        """
+        with self._lock:
+            stored = self._load()
+            best = self.analytics.best_estimated_1rm(self.formula) if self.database.has_table(self.table_name) else {}
+            key_fields = self.database.get_composite_key_fields(self.table_name) if best else []
+
+            rows = []
+            for exercise_id, result in best.items():
+                matches = self.database.get(self.table_name, dict(zip(key_fields, result["key"])))
+                if matches:
+                    rows.append(self._best_row(matches[0], result["estimated_1rm"]))
+            changed = self._store(rows)
+
+            with self.database.batch():
+                for exercise_id in set(stored) - set(best):
+                    self.database.delete(self.best_table, {"exercise_id": exercise_id})
+                    del stored[exercise_id]
+            return changed
+
+    def push(self, setter) -> int:
+        """
+        Points "Max 1RM Instance" at the new best set of every exercise whose
+        best changed since the last push. Bests whose set has not been
+        uploaded yet wait for a later push. Returns how many were updated.
+        """
+        with self._lock:
+            if self._best is None:
+                self.rebuild()
+            pending = [row for row in self.database.get_dirty(self.best_table) if row.get("set_page_id")]
+        if not pending:
+            return 0
+
+        results = setter.set_max_1rms([(row["exercise_id"], row["set_page_id"]) for row in pending])
+        pushed = []
+        for row, result in zip(pending, results):
+            if result.error is not None:
+                logger.error(f"Failed to set 1RM for '{row['exercise_id']}': {result.error}")
+            else:
+                pushed.append(row)
+
+        # A better set may have been recorded during the calls; only rows
+        # still pointing at the pushed set page are marked clean.
+        with self.database.batch(), self._lock:
+            clean = []
+            for row in pushed:
+                current = self.database.get(self.best_table, {"exercise_id": row["exercise_id"]})
+                if current and current[0].get("set_page_id") == row["set_page_id"]:
+                    clean.append({"exercise_id": row["exercise_id"], "_dirty": False})
+            if clean:
+                self.database.update_many(self.best_table, clean)
+            if self._best is not None:
+                for row in clean:
+                    if row["exercise_id"] in self._best:
+                        self._best[row["exercise_id"]]["_dirty"] = False
+        logger.info(f"✅ Updated 1RM reference for {len(pushed)} of {len(pending)} exercises")
+        return len(pushed)
+
+    def _on_change(self, event: str, entries: List[dict]):
+        with self._lock:
+            if self._best is None:
+                return
+            if event == "reset":
+                self._best = None
+                return
+            if event != "add":
+                self.rebuild()
+                return
+
+            candidates = {}
+            for entry in entries:
+                estimate = self._estimate(entry.get("weight") or 0.0, entry["reps"])
+                exercise_id = entry["exercise_id"]
+                current = candidates.get(exercise_id) or self._best.get(exercise_id)
+                if current is None or estimate > current["estimated_1rm"]:
+                    candidates[exercise_id] = self._best_row(entry, estimate)
+            self._store(list(candidates.values()))
+
+    def _load(self) -> Dict[str, dict]:
+        if self._best is None:
+            if not self.database.has_table(self.best_table):
+                self.database.create_table(self.best_table, BestSet)
+            self._best = {row["exercise_id"]: row for row in self.database.all(self.best_table)}
+        return self._best
+
+    def _best_row(self, entry: dict, estimate: float) -> dict:
+        return BestSet(
+            exercise_id=entry["exercise_id"],
+            estimated_1rm=float(estimate),
+            formula=self.formula,
+            date=entry["date"],
+            set_number=entry["set_number"],
+            weight=entry.get("weight"),
+            reps=entry["reps"],
+            set_page_id=entry.get("page_id"),
+        ).model_dump()
+
+    def _store(self, rows: List[dict]) -> List[str]:
+        """
+        Writes best rows that differ from the stored ones in one batch. A row
+        becomes dirty when its set page changes; otherwise its flag is kept.
+        """
+        stored = self._load()
+        new, changed = [], []
+        for row in rows:
+            current = stored.get(row["exercise_id"])
+            if current is None:
+                new.append({**row, "_dirty": True})
+            elif any(current.get(field) != value for field, value in row.items()):
+                if current.get("set_page_id") != row["set_page_id"]:
+                    row = {**row, "_dirty": True}
+                changed.append(row)
+        if not new and not changed:
+            return []
+
+        with self.database.batch():
+            if new:
+                self.database.add(self.best_table, new)
+            if changed:
+                self.database.update_many(self.best_table, changed)
+        for row in new + changed:
+            stored[row["exercise_id"]] = {**stored.get(row["exercise_id"], {}), **row}
+        return [row["exercise_id"] for row in new + changed]
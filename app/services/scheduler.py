@@ -0,0 +1,199 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+from app.services.notion.retry import notion_retrier
+
+logger = logging.getLogger(__name__)
+
+MAX_REPORTED_ERRORS = 20
+
+
+class _ErrorCollector(logging.Handler):
+    """Collects the ERROR records logged by one thread during a sync run."""
+
+    def __init__(self, thread_id: int):
+        super().__init__(level=logging.ERROR)
+        self.thread_id = thread_id
+        self.messages: List[str] = []
+
+    def emit(self, record: logging.LogRecord):
+        if record.thread == self.thread_id and len(self.messages) < MAX_REPORTED_ERRORS:
+            self.messages.append(f"{record.name}: {record.getMessage()}")
+
+
+class SyncScheduler:
+    """
+    Runs `SyncService.sync_all` on a background thread, every `interval`
+    seconds and whenever `trigger` is called, so no request ever waits on
+    Notion.
+
+    Only one sync runs at a time. Triggers that arrive while a sync is
+    running are coalesced into a single follow-up run. Across processes, an
+    exclusive `flock` on `<db_path>.sync.lock` makes a worker skip its run
+    while another worker is syncing. The skipping worker leaves a
+    `<lock_path>.pending` marker so the worker holding the lock runs once
+    more before letting go.
+    """
+
+    def __init__(self, sync_service, interval: Optional[float] = 900.0, lock_path: Optional[str] = None):
+        self.sync_service = sync_service
+        self.interval = interval
+        self.lock_path = lock_path or sync_service.database.db_path + ".sync.lock"
+        self.pending_path = self.lock_path + ".pending"
+        self._cond = threading.Condition()
+        self._pending = False
+        self._running = False
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._status = {
+            "state": "idle",
+            "runs": 0,
+            "coalesced_triggers": 0,
+            "last_started": None,
+            "last_finished": None,
+            "last_duration": None,
+            "last_result": None,
+            "last_errors": [],
+        }
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._loop, name="sync-scheduler", daemon=True)
+            self._thread.start()
+        logger.info(f"Sync scheduler started (interval: {self.interval}s)")
+
+    def stop(self, timeout: Optional[float] = None):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def trigger(self) -> dict:
+        """Requests a sync as soon as the current one, if any, has finished."""
+        with self._cond:
+            coalesced = self._pending or self._running
+            if self._pending:
+                self._status["coalesced_triggers"] += 1
+            self._pending = True
+            self._cond.notify_all()
+            return {"queued": True, "coalesced": coalesced}
+
+    def status(self) -> dict:
+        with self._cond:
+            status = {**self._status, "last_errors": list(self._status["last_errors"]), "pending": self._pending}
+        status["notion"] = {**notion_retrier.metrics.snapshot(), "circuit": notion_retrier.breaker.state}
+        return status
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.interval if self.interval else None
+                while not self._pending and not self._stopped:
+                    timeout = deadline - time.monotonic() if deadline is not None else None
+                    if timeout is not None and timeout <= 0:
+                        break
+                    self._cond.wait(timeout)
+                if self._stopped:
+                    return
+                self._pending = False
+                self._running = True
+            try:
+                self.run_once()
+            finally:
+                with self._cond:
+                    self._running = False
+                    self._cond.notify_all()
+
+    def run_once(self) -> dict:
+        """Runs one sync on the calling thread and records its outcome."""
+        collector = _ErrorCollector(threading.get_ident())
+        app_logger = logging.getLogger("app")
+        app_logger.addHandler(collector)
+        started = time.monotonic()
+        with self._cond:
+            self._status["state"] = "running"
+            self._status["last_started"] = datetime.now().isoformat()
+
+        result = None
+        try:
+            result = self._sync_across_processes()
+        except Exception as e:
+            logger.exception(f"Sync run failed: {type(e).__name__}: {e}")
+        finally:
+            app_logger.removeHandler(collector)
+
+        with self._cond:
+            self._status.update({
+                "state": "idle",
+                "runs": self._status["runs"] + 1,
+                "last_finished": datetime.now().isoformat(),
+                "last_duration": round(time.monotonic() - started, 3),
+                "last_result": result,
+                "last_errors": collector.messages,
+            })
+            return dict(self._status)
+
+    def _sync_across_processes(self) -> Optional[dict]:
+        """
+        Runs `sync_all` under the process lock, again for as long as other
+        processes left a pending marker. If another process holds the lock,
+        leaves the marker for it and tries the lock once more, in case it let
+        go before seeing the marker.
+        """
+        result = None
+        queued = False
+        while True:
+            with self._process_lock() as acquired:
+                if acquired:
+                    while True:
+                        self._clear_pending()
+                        result = self.sync_service.sync_all()
+                        if not os.path.exists(self.pending_path):
+                            break
+                elif result is not None:
+                    # The process holding the lock now will see the marker.
+                    return result
+                elif queued:
+                    return {"skipped": "another process is syncing; queued a follow-up run"}
+                else:
+                    open(self.pending_path, "a").close()
+                    queued = True
+                    continue
+            if not os.path.exists(self.pending_path):
+                return result
+
+    def _clear_pending(self):
+        try:
+            os.remove(self.pending_path)
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def _process_lock(self):
+        if fcntl is None:
+            yield True
+            return
+        with open(self.lock_path, "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
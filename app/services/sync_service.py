@@ -1,22 +1,29 @@
 import os
-import shutil
+import asyncio
 import traceback
 import logging
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, Union, List, Tuple
+from itertools import islice
 from json import loads, JSONDecodeError
 
 from dotenv import load_dotenv
 from notion_client.errors import APIResponseError
 
 from app.services.notion.fetcher import Fetcher
+from app.services.notion.async_fetcher import AsyncFetcher
 from app.services.notion.setter import Setter
-from app.services.notion.parser import parse_data
+from app.services.notion.archive import PageArchive
+from app.services.notion.hashing import HASH_FIELD, PROPERTY_HASHES_FIELD, changed_properties, hash_fields
+from app.services.notion.parser import EditWatermark, parse_data
+from app.services.one_rep_max import OneRepMaxEngine
 from app.db.manager import DatabaseManager
+from app.db.sqlite_manager import SQLiteManager
+from app.db.snapshot import snapshot_path, source_signature, write_snapshot
 from app.models.sets import KeyedModel, Exercise, CompletedSet
 from app.core.errors import (
     TableNotFoundError, CompositeKeyError, DatabaseError,
-    SyncError, MetadataNotFoundError, log_error
+    SyncError, APIError, MetadataNotFoundError, log_error
 )
 
 logger = logging.getLogger(__name__)
@@ -24,19 +31,38 @@ DEFAULT_SYNC_TIME = datetime.fromisoformat("2000-01-01T00:00:00")
 
 
 class SyncService:
-    def __init__(self, database: DatabaseManager, fetcher: Fetcher = Fetcher(), setter: Setter = Setter()):
+    def __init__(self, database: Union[DatabaseManager, SQLiteManager], fetcher: Optional[Fetcher] = None, setter: Optional[Setter] = None,
+                 async_fetcher: Optional[AsyncFetcher] = None, trusted_parsing: Optional[bool] = None,
+                 pull_commit_size: Optional[int] = None):
         self.database = database
-        self.fetcher = fetcher
-        self.setter = setter
+        self.fetcher = fetcher or Fetcher()
+        self.setter = setter or Setter()
+        self.async_fetcher = async_fetcher or AsyncFetcher()
+        self._one_rep_max = None
         self.model_registry = {
             "exercise": Exercise,
             "workout_log": CompletedSet,
         }
         load_dotenv()
+        # Trusted parsing skips pydantic validation of pulled pages.
+        if trusted_parsing is None:
+            trusted_parsing = os.environ.get("TRUSTED_PARSING", "").lower() in ("1", "true", "yes")
+        self.trusted_parsing = trusted_parsing
+        # Pulled pages are committed in groups of at least this many pages;
+        # the default of 1 commits and checkpoints every cursor page. Groups
+        # large enough for the parallel parsing threshold are parsed in
+        # parallel, at the cost of a coarser resume point and more memory.
+        self.pull_commit_size = pull_commit_size or int(os.environ.get("PULL_COMMIT_SIZE", 1))
 
-    def sync_all(self):
+    def sync_all(self, concurrent: bool = True, reconcile: bool = False) -> Optional[dict]:
         """
-        Syncs all registered databases in both directions.
+        Syncs all registered databases in both directions. With `concurrent`,
+        the Notion → Local fetches of all databases run at the same time, so
+        the whole pull takes about as long as the slowest database. See
+        `sync_local_to_remote` for `reconcile`.
+
+        Returns the records pulled and pushed per database (None where that
+        step failed) and the number of 1RM references updated.
         """
         try:
             exercise_db = loads(os.environ["EXERCISE"])
@@ -48,11 +74,246 @@ class SyncService:
             logger.error(f"Failed to decode JSON: {e}")
             return
 
-        for db_info in [exercise_db, workout_db]:
-            self.sync_remote_to_local(db_info)
-            self.sync_local_to_remote(db_info)
+        db_infos = [exercise_db, workout_db]
+        summary = {"pulled": {}, "pushed": {}}
+        if not concurrent:
+            for db_info in db_infos:
+                summary["pulled"][db_info["name"]] = self.sync_remote_to_local(db_info)
+                summary["pushed"][db_info["name"]] = self.sync_local_to_remote(db_info, reconcile=reconcile)
+        else:
+            pulled = asyncio.run(self._pull_remote_concurrently(db_infos))
+            for db_info, count in zip(db_infos, pulled):
+                summary["pulled"][db_info["name"]] = count
+                summary["pushed"][db_info["name"]] = self.sync_local_to_remote(db_info, reconcile=reconcile)
+
+        summary["one_rep_max"] = self.push_one_rep_maxes()
+        return summary
+
+    @property
+    def one_rep_max(self) -> OneRepMaxEngine:
+        if self._one_rep_max is None:
+            self._one_rep_max = OneRepMaxEngine(self.database, formula=os.environ.get("ONE_RM_FORMULA", "epley"))
+        return self._one_rep_max
+
+    def push_one_rep_maxes(self) -> Optional[int]:
+        """Updates "Max 1RM Instance" for the exercises whose best set changed."""
+        try:
+            return self.one_rep_max.push(self.setter)
+        except (APIResponseError, SyncError) as e:
+            log_error(logger, e)
+            return None
+
+    async def _pull_remote_concurrently(self, db_infos: List[Dict[str, str]]) -> List[Optional[int]]:
+        """
+        Async counterpart of `sync_remote_to_local` for several databases at
+        once. Each database is committed and checkpointed like a threaded
+        pull; the commits run on the event loop while the next cursor page
+        is already being fetched.
+        """
+        async with self.async_fetcher as fetcher:
+            async def pull(db_info):
+                prepared = self._prepare_remote_sync(db_info)
+                if not prepared:
+                    return None
+                model, last_sync = prepared
+                db_name = db_info["name"]
+                for attempt in range(2):
+                    checkpoint = self._resume_point(db_name, self._since(last_sync))
+                    try:
+                        return await self._pull_pages_async(fetcher, db_info, model, last_sync, checkpoint)
+                    except APIError as e:
+                        if attempt == 0 and self._restart_on_rejected_cursor(db_name, checkpoint, e):
+                            continue
+                        log_error(logger, e)
+                        return None
+                    except (APIResponseError, SyncError) as e:
+                        log_error(logger, e)
+                        return None
+
+            return await asyncio.gather(*(pull(db_info) for db_info in db_infos))
+
+    def sync_remote_to_local(self, db_info: Dict[str, str]) -> Optional[int]:
+        """Pulls pages edited since the watermark; returns how many were stored."""
+        prepared = self._prepare_remote_sync(db_info)
+        if not prepared:
+            return None
+        model, last_sync = prepared
+        db_name = db_info["name"]
+
+        for attempt in range(2):
+            checkpoint = self._resume_point(db_name, self._since(last_sync))
+            try:
+                return self._pull_pages(db_info, model, last_sync, checkpoint)
+            except APIError as e:
+                if attempt == 0 and self._restart_on_rejected_cursor(db_name, checkpoint, e):
+                    continue
+                log_error(logger, e)
+                return None
+            except (APIResponseError, SyncError) as e:
+                log_error(logger, e)
+                return None
+
+    @staticmethod
+    def _since(last_sync: Union[str, datetime]) -> str:
+        return last_sync.isoformat() if isinstance(last_sync, datetime) else last_sync
+
+    def _restart_on_rejected_cursor(self, db_name: str, checkpoint: dict, error: APIError) -> bool:
+        """
+        Notion rejects cursors it no longer recognizes; drops the checkpoint
+        so the sync starts over. Returns whether it did.
+        """
+        if not checkpoint["cursor"] or (error.context or {}).get("status") != 400:
+            return False
+        logger.warning(f"Saved cursor for '{db_name}' was rejected; restarting the sync.")
+        self.database.set_checkpoint(db_name, None)
+        return True
+
+    def _resume_point(self, db_name: str, since: str) -> dict:
+        """
+        The saved checkpoint of an interrupted sync from the same watermark,
+        or a fresh one.
+        """
+        checkpoint = self.database.get_checkpoint(db_name)
+        if checkpoint and checkpoint.get("since") == since:
+            return checkpoint
+        return {"since": since, "cursor": None, "committed": 0, "watermark": None}
+
+    def _pull_pages(self, db_info: Dict[str, str], model: KeyedModel, last_sync: Union[str, datetime],
+                    checkpoint: dict) -> int:
+        """
+        Upserts the pulled pages in groups of `pull_commit_size`, rounded up
+        to whole cursor pages. Each group is committed together with a
+        checkpoint holding the cursor that follows it, so an interrupted sync
+        resumes after the last committed group. The last group clears the
+        checkpoint and moves the watermark. Pages that fail to parse are
+        logged and skipped.
+        """
+        watermark, committed = self._start_pull(db_info["name"], checkpoint)
+        # Fetched again on every run; the pages of this run use the same schema.
+        schema = self.fetcher.database_info(db_info["id"], refresh=True)
+        batches = self.fetcher.iter_batches_by_last_edited_time(
+            db_info["id"], last_sync, start_cursor=checkpoint["cursor"], model=model
+        )
+        pending = []
+        for results, next_cursor in batches:
+            pending.extend(watermark.track(results))
+            if next_cursor and len(pending) < self.pull_commit_size:
+                continue
+            committed = self._commit_pulled(db_info["name"], model, schema, pending, checkpoint, watermark,
+                                            next_cursor, committed)
+            pending = []
+        return self._finish_pull(db_info["name"], checkpoint, committed)
+
+    async def _pull_pages_async(self, fetcher: AsyncFetcher, db_info: Dict[str, str], model: KeyedModel,
+                                last_sync: Union[str, datetime], checkpoint: dict) -> int:
+        """Async counterpart of `_pull_pages`, fed by `fetcher`'s cursor pages."""
+        watermark, committed = self._start_pull(db_info["name"], checkpoint)
+        schema = await fetcher.database_info(db_info["id"], refresh=True)
+        batches = fetcher.iter_batches_by_last_edited_time(
+            db_info["id"], last_sync, start_cursor=checkpoint["cursor"], model=model
+        )
+        pending = []
+        async for results, next_cursor in batches:
+            pending.extend(watermark.track(results))
+            if next_cursor and len(pending) < self.pull_commit_size:
+                continue
+            committed = self._commit_pulled(db_info["name"], model, schema, pending, checkpoint, watermark,
+                                            next_cursor, committed)
+            pending = []
+        return self._finish_pull(db_info["name"], checkpoint, committed)
+
+    @staticmethod
+    def _start_pull(db_name: str, checkpoint: dict) -> Tuple[EditWatermark, int]:
+        watermark = EditWatermark()
+        watermark.value = checkpoint["watermark"]
+        if checkpoint["cursor"]:
+            logger.info(f"⏩ Resuming '{db_name}' after {checkpoint['committed']} committed records")
+        return watermark, checkpoint["committed"]
+
+    @staticmethod
+    def _finish_pull(db_name: str, checkpoint: dict, committed: int) -> int:
+        logger.info(f"✅ Sync complete for '{db_name}' ({committed} records)")
+        return committed - checkpoint["committed"]
+
+    def _commit_pulled(self, db_name: str, model: KeyedModel, schema: Optional[dict], pages: List[dict],
+                       checkpoint: dict, watermark: EditWatermark, next_cursor: Optional[str], committed: int) -> int:
+        """
+        Parses and upserts one group of pulled pages in a single batch,
+        together with a checkpoint holding `next_cursor`, or, for the last
+        group, with the new sync time and watermark. Returns the running
+        count of committed records.
+        """
+        entries = self._parse_pulled(db_name, model, schema, pages)
+        with self.database.batch():
+            committed += self._upsert_pulled(db_name, model, entries)
+            if next_cursor:
+                self.database.set_checkpoint(db_name, {
+                    **checkpoint, "cursor": next_cursor, "committed": committed, "watermark": watermark.value
+                })
+            else:
+                self.database.set_checkpoint(db_name, None)
+                self.database.update_last_sync_time(db_name, watermark=watermark.value)
+        logger.debug(f"Committed {committed} records into '{db_name}'")
+        return committed
+
+    def _upsert_pulled(self, db_name: str, model: KeyedModel, entries: List[dict]) -> int:
+        """
+        Stores pulled entries as clean rows, except over rows with unpushed
+        local edits. A page whose hash is the row's stored `_hash` is our own
+        push coming back and is skipped. A page that changed in Notion as
+        well is a conflict: the local edit is kept, and only the remote page
+        id and hashes are stored, so the next push sends the local version
+        over it. Returns how many rows were written.
+        """
+        if not entries:
+            return 0
+        remote_id_field = self._remote_id_field(model)
+        key_fields = self.database.get_composite_key_fields(db_name)
+        with self.database.batch():
+            rows = []
+            for entry in entries:
+                key = {field: entry[field] for field in key_fields}
+                current = self.database.get(db_name, key)
+                local = current[0] if current else None
+                if local is None or not (local.get("_dirty") or local.get(remote_id_field, "") is None):
+                    rows.append({**entry, "_dirty": False})
+                elif entry[HASH_FIELD] != local.get(HASH_FIELD):
+                    logger.warning(f"Kept the local edit of {key} in '{db_name}' over a newer Notion version")
+                    rows.append({
+                        **key,
+                        remote_id_field: entry[remote_id_field],
+                        HASH_FIELD: entry[HASH_FIELD],
+                        PROPERTY_HASHES_FIELD: entry[PROPERTY_HASHES_FIELD],
+                        "_dirty": True,
+                    })
+            if not rows:
+                return 0
+            result = self.database.upsert(db_name, rows)
+        return len(result["inserted"]) + len(result["updated"])
+
+    def _parse_pulled(self, db_name: str, model: KeyedModel, schema: Optional[dict], pages: List[dict]) -> List[dict]:
+        """Parses pulled pages, in parallel for large groups, logging the ones that fail."""
+        errors = []
+        entries = parse_data(pages, model, schema, self.trusted_parsing, errors=errors)
+        for index, error in errors:
+            logger.error(f"Skipped Notion page {pages[index].get('id')} in '{db_name}': {type(error).__name__}: {error}")
+        return self._with_hashes(model, entries)
+
+    @staticmethod
+    def _with_hashes(model: KeyedModel, entries: List[dict]) -> List[dict]:
+        """
+        Stores the content hashes of the pulled version on each entry, so the
+        next push only sends what was edited locally since.
+        """
+        for entry in entries:
+            entry.update(hash_fields(model.model_construct(**entry).to_notion_format()))
+        return entries
 
-    def sync_remote_to_local(self, db_info: Dict[str, str]):
+    def _prepare_remote_sync(self, db_info: Dict[str, str]) -> Optional[Tuple[KeyedModel, Union[str, datetime]]]:
+        """
+        Resolves the model, creates the local table if needed and returns the
+        model with the time to fetch changes from.
+        """
         db_id = db_info["id"]
         db_name = db_info["name"]
         logger.info(f"📥 Syncing from Notion → Local for '{db_name}'")
@@ -60,37 +321,54 @@ class SyncService:
         model = self.model_registry.get(db_name)
         if not model:
             logger.error(f"No model registered for '{db_name}'")
-            return
+            return None
 
-        if db_name not in self.database.db.tables():
+        if not self.database.has_table(db_name):
             logger.info(f"Creating local table for '{db_name}'")
             self.database.create_table(db_name, model, remote_id=db_id)
 
+        # Tables synced before watermarks existed fall back to their sync time.
         try:
-            last_sync = self.database.get_last_sync_time(db_name) or DEFAULT_SYNC_TIME
+            last_sync = (
+                self.database.get_watermark(db_name)
+                or self.database.get_last_sync_time(db_name)
+                or DEFAULT_SYNC_TIME
+            )
             logger.info(f"Last sync: {last_sync}")
         except (DatabaseError, MetadataNotFoundError) as e:
             log_error(logger, e)
             last_sync = DEFAULT_SYNC_TIME
 
-        try:
-            new_pages = self.fetcher.query_pages_by_last_edited_time(db_id, last_sync)
-            parsed_data = parse_data(new_pages, model)
-        except (APIResponseError, SyncError) as e:
-            log_error(logger, e)
-            return
+        return model, last_sync
 
-        if not parsed_data:
-            logger.info("No new data to sync from Notion.")
-            return
+    def replay_archive(self, db_info: Dict[str, str], archive: PageArchive, chunk_size: int = 2_000) -> Optional[int]:
+        """
+        Rebuilds a table from the latest archived version of each page, with
+        the current parser and model and no Notion calls. Pages are parsed
+        and upserted in chunks like pulled pages; the sync time, watermark
+        and checkpoint are left alone. Returns how many rows were written.
+        """
+        db_name = db_info["name"]
+        model = self.model_registry.get(db_name)
+        if not model:
+            logger.error(f"No model registered for '{db_name}'")
+            return None
+        if not self.database.has_table(db_name):
+            self.database.create_table(db_name, model, remote_id=db_info["id"])
 
-        logger.info(f"Inserting {len(parsed_data)} records into '{db_name}'")
-        result = self.database.add(db_name, parsed_data)
-        logger.debug(f"Add result: {result}")
-        self.database.update_last_sync_time(db_name)
-        logger.info(f"✅ Sync complete for '{db_name}'")
+        written = 0
+        pages = archive.latest(db_info["id"])
+        while chunk := list(islice(pages, chunk_size)):
+            written += self._upsert_pulled(db_name, model, self._parse_pulled(db_name, model, None, chunk))
+        logger.info(f"✅ Replayed {written} records into '{db_name}' from the archive")
+        return written
 
-    def sync_local_to_remote(self, db_info: Dict[str, str]):
+    def sync_local_to_remote(self, db_info: Dict[str, str], reconcile: bool = False) -> Optional[int]:
+        """
+        Pushes local rows that are unsynced or changed since the last push.
+        Only the local table is read; `reconcile` additionally scans the whole
+        Notion database and re-uploads rows that are missing there.
+        """
         db_id = db_info["id"]
         db_name = db_info["name"]
         logger.info(f"📤 Syncing from Local → Notion for '{db_name}'")
@@ -98,33 +376,124 @@ class SyncService:
         model = self.model_registry.get(db_name)
         if not model:
             logger.error(f"No model registered for '{db_name}'")
-            return
+            return None
 
+        remote_id_field = self._remote_id_field(model)
         try:
-            remote_pages = self.fetcher.fetch_all_pages(db_id)
-            parsed_remote = parse_data(remote_pages, model)
-            new_entries = self.database.get_new_entries(parsed_remote, db_name)
+            pending = self.database.get_dirty(db_name)
+            if reconcile:
+                pending = self._merge_missing_remotely(db_id, db_name, model, pending)
         except (APIResponseError, SyncError) as e:
             log_error(logger, e)
-            return
+            return None
         except Exception as e:
             logger.error(traceback.format_exc())
-            return
+            return None
 
-        if not new_entries:
+        if not pending:
             logger.info("No new entries to upload.")
-            return
+            return 0
 
-        for entry in new_entries:
+        # New rows are created with all their properties; rows already in
+        # Notion are patched with the properties whose hash differs from the
+        # last pushed or pulled version, and unchanged rows are only marked
+        # clean.
+        to_create, new_pages, to_update, changes, unchanged = [], [], [], [], []
+        for entry in pending:
             try:
-                notion_page = model(**entry).to_notion_format()
-                new_id = self.setter.add_page(notion_page, db_id)
-                entry["page_id"] = new_id
-                self.database.update(db_name, entry)
-                logger.info(f"✅ Uploaded new page for '{db_name}' with ID {new_id}")
-            except Exception as e:
+                properties = model(**entry).to_notion_format()
+            except Exception:
                 logger.error(f"Failed to upload entry: {entry}")
                 logger.error(traceback.format_exc())
+                continue
+            if not entry.get(remote_id_field):
+                to_create.append(entry)
+                new_pages.append(properties)
+            else:
+                changed = changed_properties(properties, entry)
+                if changed is None:
+                    unchanged.append(entry)
+                else:
+                    to_update.append(entry)
+                    changes.append((entry[remote_id_field], changed))
+            entry.update(hash_fields(properties))
+        created = self.setter.add_pages(new_pages, db_id)
+        updated = self.setter.update_pages(changes)
+
+        synced = list(unchanged)
+        for entry, result in zip(to_create + to_update, created + updated):
+            if result.error is not None:
+                logger.error(f"Failed to upload entry: {entry}. Error: {result.error}")
+                continue
+            entry[remote_id_field] = result.page_id
+            synced.append(entry)
+
+        if synced:
+            self._record_push(db_name, model, synced)
+        logger.info(
+            f"✅ Pushed {len(synced) - len(unchanged)} of {len(pending)} entries for '{db_name}' "
+            f"({len(to_create)} new, {len(to_update)} changed, {len(unchanged)} unchanged)"
+        )
+        return len(synced)
+
+    def _record_push(self, db_name: str, model: KeyedModel, synced: List[dict]):
+        """
+        Stores the page id and hashes of the pushed versions. Rows are only
+        marked clean if they still hold what was pushed; a row edited while
+        the push was running stays dirty, and its next push sends the
+        difference.
+        """
+        remote_id_field = self._remote_id_field(model)
+        key_fields = self.database.get_composite_key_fields(db_name)
+        with self.database.batch():
+            written = []
+            for entry in synced:
+                key = {field: entry[field] for field in key_fields}
+                current = self.database.get(db_name, key)
+                if not current:
+                    continue
+                written.append({
+                    **key,
+                    remote_id_field: entry[remote_id_field],
+                    HASH_FIELD: entry[HASH_FIELD],
+                    PROPERTY_HASHES_FIELD: entry[PROPERTY_HASHES_FIELD],
+                    "_dirty": self._content_hash(model, current[0]) != entry[HASH_FIELD],
+                })
+            if written:
+                self.database.update_many(db_name, written)
+
+    @staticmethod
+    def _content_hash(model: KeyedModel, row: dict) -> Optional[str]:
+        try:
+            return hash_fields(model(**row).to_notion_format())[HASH_FIELD]
+        except Exception:
+            return None
+
+    def _merge_missing_remotely(self, db_id: str, db_name: str, model: KeyedModel, pending: List[dict]) -> List[dict]:
+        """
+        Adds the local rows whose keys are absent from the Notion database to
+        `pending`, cleared of their stale remote id so they are created anew.
+        """
+        logger.info(f"🔁 Reconciling '{db_name}' against the full Notion database")
+        key_fields = self.database.get_composite_key_fields(db_name)
+        remote_keys = {
+            tuple(entry[k] for k in key_fields)
+            for entry in parse_data(
+                self.fetcher.iter_all_pages(db_id, model=model), model, self.fetcher.database_info(db_id), self.trusted_parsing
+            )
+        }
+        missing = [e for e in self.database.all(db_name) if tuple(e[k] for k in key_fields) not in remote_keys]
+        missing_keys = {tuple(entry[k] for k in key_fields) for entry in missing}
+        remote_id_field = self._remote_id_field(model)
+        if remote_id_field not in key_fields:
+            for entry in missing:
+                entry[remote_id_field] = None
+        return missing + [e for e in pending if tuple(e[k] for k in key_fields) not in missing_keys]
+
+    @staticmethod
+    def _remote_id_field(model: KeyedModel) -> str:
+        """Field holding a row's Notion page id: `page_id`, or `id` for models keyed by it."""
+        return "page_id" if "page_id" in model.model_fields else "id"
 
     def get_model(self, db_name: str) -> KeyedModel:
         model = self.model_registry.get(db_name)
@@ -134,13 +503,30 @@ class SyncService:
 
     def backup_database(self, backup_folder="backups"):
         """
-        Creates a timestamped backup of the local TinyDB file.
+        Creates a timestamped backup of the local database file and refreshes
+        the binary snapshots of the completed-set tables next to it.
         """
         os.makedirs(backup_folder, exist_ok=True)
-        db_path = self.database.db.storage._handle.name
+        extension = os.path.splitext(self.database.db_path)[1]
         backup_path = os.path.join(
             backup_folder,
-            f"database_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            f"database_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extension}"
         )
-        shutil.copy(db_path, backup_path)
+        self.database.backup(backup_path)
         logger.info(f"📦 Database backed up to: {backup_path}")
+        self.write_snapshots()
+
+    def write_snapshots(self):
+        """
+        Writes a memory-mappable snapshot of every completed-set table to
+        `<db dir>/<table>.snapshot`, for cold workers to read without loading
+        the database.
+        """
+        for db_name, model in self.model_registry.items():
+            if model is not CompletedSet or not self.database.has_table(db_name):
+                continue
+            path = snapshot_path(self.database.db_path, db_name)
+            # Signed before reading, so a write in between leaves the snapshot stale, not wrong.
+            source = source_signature(self.database.db_path)
+            write_snapshot(path, self.database.all(db_name), source)
+            logger.info(f"📦 Snapshot of '{db_name}' written to: {path}")
@@ -0,0 +1,46 @@
+import gc
+import json
+import argparse
+import tracemalloc
+
+from app.models.records import intern_strings
+
+
+def make_json(count: int) -> str:
+    """A stored workout log as TinyDB writes it: 50 exercises, one set per page."""
+    return json.dumps({
+        str(i): {
+            "workout_name": ("Push", "Pull", "Legs")[i % 3],
+            "exercise_id": f"1c2f9b4e-0000-4000-8000-{i % 50:012d}",
+            "set_number": i % 5 + 1,
+            "weight": 60.0 + i % 40,
+            "reps": 3 + i % 10,
+            "date": f"20{10 + i // 20000 % 15}-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            "page_id": f"2d3e8a1f-0000-4000-8000-{i:012d}",
+            "exercise_notes": "",
+        }
+        for i in range(count)
+    })
+
+
+def measure(label: str, count: int, build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{count:>9,} {label:<22} {size / 2 ** 20:9.1f} MiB  {size / count:7.0f} B/set")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory held by completed sets in each representation.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for count in args.sizes:
+        content = make_json(count)
+        measure("dicts (json.loads)", count, lambda: list(json.loads(content).values()))
+        measure("dicts, interned", count, lambda: [intern_strings(doc) for doc in json.loads(content).values()])
+        del content
@@ -0,0 +1,58 @@
+import argparse
+import time
+
+from app.models.sets import CompletedSet
+from app.services.notion.parser import SET_FIELDS, compile_parser, parse_parallel, parse_set_data, shutdown_parse_pool
+
+
+def make_pages(count: int) -> list[dict]:
+    """Synthetic workout-log pages shaped like a Notion query response."""
+    return [
+        {
+            "id": f"page-{i}",
+            "last_edited_time": "2025-01-01T00:00:00.000Z",
+            "properties": {
+                "Workout Title": {"id": "t", "type": "select", "select": {"name": "Push"}},
+                "Weight": {"id": "w", "type": "number", "number": 60 + i % 40},
+                "Reps": {"id": "r", "type": "number", "number": 3 + i % 10},
+                "Exercise Reference": {"id": "e", "type": "relation", "relation": [{"id": f"ex-{i % 50}"}]},
+                "Set #": {"id": "s", "type": "number", "number": i % 5 + 1},
+                "Date": {"id": "d", "type": "date", "date": {"start": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}"}},
+                "Notes": {"id": "n", "type": "rich_text", "rich_text": [{"text": {"content": "note"}}]},
+            },
+        }
+        for i in range(count)
+    ]
+
+
+def bench(label: str, fn, pages: list[dict], repeat: int):
+    best = min(_timed(fn, pages) for _ in range(repeat))
+    print(f"{label:<24} {best:8.3f}s  {len(pages) / best:>10,.0f} pages/s")
+
+
+def _timed(fn, pages) -> float:
+    started = time.perf_counter()
+    fn(pages)
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Notion page parsing for a backfill.")
+    parser.add_argument("--pages", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = make_pages(args.pages)
+    schema = {
+        "id": "bench", "last_edited_time": None,
+        "properties": {name: {"id": name, "type": prop_type} for name, prop_type, _ in SET_FIELDS.values() if name},
+    }
+    validated = compile_parser(CompletedSet, schema)
+    trusted = compile_parser(CompletedSet, schema, trusted=True)
+
+    bench("per-page (before)", lambda batch: [parse_set_data(page) for page in batch], pages, args.repeat)
+    bench("compiled, validated", validated.parse_many, pages, args.repeat)
+    bench("compiled, trusted", trusted.parse_many, pages, args.repeat)
+    parse_parallel(pages[:1], CompletedSet, schema)  # start the workers outside the timings
+    bench("compiled, parallel", lambda batch: parse_parallel(batch, CompletedSet, schema), pages, args.repeat)
+    shutdown_parse_pool()
@@ -2,9 +2,8 @@ import os
 import json
 import logging
 from dotenv import load_dotenv
-from tinydb import Query
 
-from app.db.manager import DatabaseManager
+from app.db.engine import get_database
 from app.services.sync_service import SyncService
 from app.models.sets import PlannedWorkout
 from scripts.init_workouts import all_days
@@ -16,17 +15,18 @@ logger = logging.getLogger(__name__)
 def initialize_db():
     load_dotenv()
 
-    db = DatabaseManager()
+    db = get_database()
     sync = SyncService(db)
 
     workout_log_info = json.loads(os.environ["WORKOUT_LOG"])
     exercise_info = json.loads(os.environ["EXERCISE"])
     
-    if not db.metadata_table.get(Query().table_name == "premade_workout"):
+    if not db.has_table("premade_workout"):
         logger.info("📋 Creating 'premade_workout' table and metadata...")
-        db.create_table("premade_workout", PlannedWorkout, remote_id=None)
         data = [day.model_dump() for day in all_days]
-        db.add("premade_workout", data)
+        with db.batch():
+            db.create_table("premade_workout", PlannedWorkout, remote_id=None)
+            db.add("premade_workout", data)
     else:
         logger.info("✅ 'premade_workout' already exists with metadata — skipping init.")
 
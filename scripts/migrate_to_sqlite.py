@@ -0,0 +1,43 @@
+import argparse
+import logging
+
+from app.db.manager import DatabaseManager
+from app.db.sqlite_manager import SQLiteManager
+
+logger = logging.getLogger(__name__)
+
+
+def migrate(source: DatabaseManager, target: SQLiteManager):
+    """
+    Copies every table registered in the TinyDB metadata into SQLite, using the
+    schema, composite key and sync time stored with it.
+    """
+    for metadata in source.metadata_table.all():
+        table_name = metadata["table_name"]
+        if target.has_table(table_name):
+            logger.warning(f"'{table_name}' already exists in SQLite — skipping.")
+            continue
+
+        entries = source.all(table_name)
+        with target.batch():
+            target._create_from_schema(
+                table_name,
+                metadata["table_model"],
+                metadata["composite_key"],
+                metadata.get("remote_id"),
+                metadata.get("synced_at"),
+                metadata.get("watermark"),
+            )
+            if entries:
+                target.add(table_name, entries)
+        logger.info(f"Migrated {len(entries)} entries into '{table_name}'.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate the TinyDB database to SQLite.")
+    parser.add_argument("--source", default="data/database/tinydb.json")
+    parser.add_argument("--target", default="data/database/sqlite.db")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    migrate(DatabaseManager(args.source), SQLiteManager(args.target))
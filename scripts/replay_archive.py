@@ -0,0 +1,40 @@
+import os
+import json
+import argparse
+import logging
+from dotenv import load_dotenv
+
+from app.db.engine import get_database
+from app.services.notion.archive import PageArchive
+from app.services.sync_service import SyncService
+
+logger = logging.getLogger(__name__)
+
+
+def replay(archive_dir: str, compression: str = "gzip", names=None):
+    """
+    Re-parses the archived Notion pages of the configured databases into the
+    local database, without any network access.
+    """
+    load_dotenv()
+    archive = PageArchive(archive_dir, compression=compression)
+    sync = SyncService(get_database())
+    try:
+        for variable in ("EXERCISE", "WORKOUT_LOG"):
+            db_info = json.loads(os.environ[variable])
+            if names and db_info["name"] not in names:
+                continue
+            sync.replay_archive(db_info, archive)
+    finally:
+        archive.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild local tables from the raw Notion page archive.")
+    parser.add_argument("--archive", default=os.environ.get("NOTION_ARCHIVE_DIR", "data/archive"))
+    parser.add_argument("--compression", default=os.environ.get("NOTION_ARCHIVE_COMPRESSION", "gzip"))
+    parser.add_argument("--table", action="append", dest="tables", help="Only replay this table (repeatable).")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    replay(args.archive, args.compression, args.tables)
@@ -0,0 +1,26 @@
+import pytest
+
+from app.db.manager import DatabaseManager
+from app.models.sets import CompletedSet
+
+
+def make_set(set_number=1, date="2025-05-07", exercise_id="bench001", **overrides):
+    entry = {
+        "workout_name": "Push Day",
+        "exercise_id": exercise_id,
+        "set_number": set_number,
+        "weight": 135.0,
+        "reps": 8,
+        "date": date,
+        "page_id": None,
+        "exercise_notes": "",
+    }
+    entry.update(overrides)
+    return entry
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "db" / "tinydb.json"))
+    manager.create_table("workout_log", CompletedSet)
+    return manager
@@ -1,5 +1,6 @@
 import pytest
 from app import create_app
+from app.models.sets import CompletedSet
 
 @pytest.fixture
 def client():
@@ -30,3 +31,29 @@ def test_get_set(client):
     data = res.get_json()
     assert isinstance(data, list)
     assert data[0]["set_number"] == 1
+
+def test_update_workout_marks_the_set_dirty(tmp_path):
+    app = create_app({"TESTING": True, "DB_PATH": str(tmp_path / "tinydb.json")})
+    client = app.test_client()
+    payload = {
+        "workout_name": "Push Day",
+        "exercise_id": "bench001",
+        "set_number": 1,
+        "weight": 135.0,
+        "reps": 8,
+        "date": "2025-05-07",
+        "page_id": "page-1",
+        "exercise_notes": "",
+    }
+    with app.app_context():
+        from app.routes.routes import get_db
+        get_db().create_table("workout_log", CompletedSet)
+        get_db().add("workout_log", payload)
+
+    del payload["page_id"]
+    res = client.put("/workouts/page-1", json={**payload, "reps": 10})
+
+    assert res.status_code == 200
+    with app.app_context():
+        assert [(e["reps"], e["page_id"]) for e in get_db().get_dirty("workout_log")] == [(10, "page-1")]
+    assert client.put("/workouts/missing", json={**payload, "set_number": 9}).status_code == 404
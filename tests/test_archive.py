@@ -0,0 +1,75 @@
+from app.models.sets import CompletedSet
+from app.services.notion.archive import PageArchive
+from app.services.notion.fetcher import Fetcher
+from app.services.sync_service import SyncService
+
+WORKOUT_DB = {"id": "remote-db", "name": "workout_log"}
+
+
+def set_page(set_number, reps=5, edited="2025-05-08T10:00:00.000Z"):
+    return {
+        "id": f"page-{set_number}",
+        "last_edited_time": edited,
+        "properties": {
+            "Workout Title": {"select": {"name": "Push"}},
+            "Weight": {"number": 100},
+            "Reps": {"number": reps},
+            "Exercise Reference": {"relation": [{"id": "ex-1"}]},
+            "Set #": {"number": set_number},
+            "Date": {"date": {"start": "2025-05-08"}},
+        },
+    }
+
+
+class FakeDatabases:
+    def __init__(self):
+        self.queries = []
+
+    def query(self, database_id, **kwargs):
+        self.queries.append(kwargs)
+        return {"results": [set_page(1)], "next_cursor": None}
+
+
+class FakeClient:
+    def __init__(self):
+        self.databases = FakeDatabases()
+
+
+def test_archive_rotates_and_keeps_every_version(tmp_path):
+    archive = PageArchive(str(tmp_path), max_bytes=1)
+
+    assert archive.append("db", [set_page(1), set_page(2)]) == 2
+    assert archive.append("db", [set_page(1)]) == 0
+    archive.append("db", [set_page(1, reps=8, edited="2025-05-09T10:00:00.000Z")])
+    archive.append("other", [set_page(3)])
+
+    assert len(archive._segments()) == 3
+    assert archive.versions("page-1") == ["2025-05-08T10:00:00.000Z", "2025-05-09T10:00:00.000Z"]
+    assert archive.get("page-1")["properties"]["Reps"]["number"] == 8
+    assert archive.get("page-1", "2025-05-08T10:00:00.000Z")["properties"]["Reps"]["number"] == 5
+    assert sorted((p["id"], p["properties"]["Reps"]["number"]) for p in archive.latest("db")) == [
+        ("page-1", 8), ("page-2", 5)
+    ]
+
+
+def test_edit_within_the_same_minute_replaces_the_version(tmp_path):
+    archive = PageArchive(str(tmp_path))
+    archive.append("db", [set_page(1, reps=None)])
+    assert archive.append("db", [set_page(1, reps=7)]) == 1
+    assert archive.append("db", [set_page(1, reps=7)]) == 0
+
+    assert archive.versions("page-1") == ["2025-05-08T10:00:00.000Z"]
+    assert archive.get("page-1")["properties"]["Reps"]["number"] == 7
+    assert [p["properties"]["Reps"]["number"] for p in archive.latest("db")] == [7]
+
+
+def test_fetched_pages_are_archived_unprojected_and_replayed(tmp_path, db):
+    archive = PageArchive(str(tmp_path / "archive"))
+    client = FakeClient()
+    Fetcher(client, archive=archive).query_pages_by_last_edited_time("remote-db", "2025-01-01", model=CompletedSet)
+    assert "filter_properties" not in client.databases.queries[0]
+
+    service = SyncService(db, fetcher=Fetcher(client, archive=archive))
+    assert service.replay_archive(WORKOUT_DB, archive) == 1
+    assert len(client.databases.queries) == 1
+    assert [(e["page_id"], e["reps"]) for e in db.all("workout_log")] == [("page-1", 5)]
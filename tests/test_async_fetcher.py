@@ -0,0 +1,55 @@
+import asyncio
+
+from app.services.notion.async_fetcher import AsyncFetcher
+
+
+class FakeDatabases:
+    def __init__(self, pages_per_db: int):
+        self.pages_per_db = pages_per_db
+        self.in_flight = 0
+        self.peak = 0
+
+    async def query(self, database_id, start_cursor=None, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        page = int(start_cursor or 0)
+        next_page = page + 1
+        return {
+            "results": [f"{database_id}-{page}"],
+            "next_cursor": str(next_page) if next_page < self.pages_per_db else None,
+        }
+
+
+class FakeAsyncClient:
+    def __init__(self, pages_per_db: int):
+        self.databases = FakeDatabases(pages_per_db)
+
+
+def test_paginates_databases_concurrently_within_limit():
+    client = FakeAsyncClient(pages_per_db=3)
+
+    async def run():
+        async with AsyncFetcher(client, max_concurrency=2) as fetcher:
+            async def collect(db_id):
+                return [r async for batch in fetcher.iter_pages_by_last_edited_time(db_id, "2025-01-01") for r in batch]
+            return await asyncio.gather(collect("a"), collect("b"), collect("c"))
+
+    assert asyncio.run(run()) == [[f"{db}-{i}" for i in range(3)] for db in "abc"]
+    assert client.databases.peak == 2
+
+
+def test_clients_share_one_log_handler(tmp_path, monkeypatch):
+    import logging
+    from app.services.notion.client import create_async_notion_client
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("NOTION_API_KEY", "secret")
+
+    async def open_clients():
+        for _ in range(3):
+            await create_async_notion_client().aclose()
+
+    asyncio.run(open_clients())
+    assert len(logging.getLogger("notion-client").handlers) == 1
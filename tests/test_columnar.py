@@ -0,0 +1,50 @@
+import pytest
+from app.db.columnar import ColumnarSetStore
+from tests.conftest import make_set
+
+
+def test_aggregations_follow_table_changes(db):
+    db.add("workout_log", [
+        make_set(1, date="2025-05-05", weight=100.0, reps=5),
+        make_set(2, date="2025-05-07", weight=110.0, reps=3),
+        make_set(1, date="2025-05-12", exercise_id="squat001", weight=200.0, reps=1),
+    ])
+    store = ColumnarSetStore(db, "workout_log")
+
+    assert store.tonnage_by_exercise() == {"bench001": 830.0, "squat001": 200.0}
+    assert store.weekly_volume() == {"2025-05-05": 830.0, "2025-05-12": 200.0}
+    assert store.weekly_volume("squat001") == {"2025-05-12": 200.0}
+
+    db.add("workout_log", make_set(1, date="2025-05-14", weight=None, reps=10))
+    db.update("workout_log", make_set(2, date="2025-05-07", weight=120.0, reps=3))
+    db.delete("workout_log", {"date": "2025-05-12", "set_number": 1, "exercise_id": "squat001"})
+
+    assert len(store) == 3
+    assert store.tonnage_by_exercise() == {"bench001": 860.0}
+
+    best = store.best_estimated_1rm()["bench001"]
+    assert best["estimated_1rm"] == pytest.approx(120.0 * (1 + 3 / 30))
+    assert best["key"] == ("2025-05-07", 2, "bench001")
+
+
+def test_partial_updates_reach_the_store_as_whole_rows(db):
+    db.add("workout_log", [make_set(1, weight=100.0, reps=5), make_set(2, weight=100.0, reps=5)])
+    store = ColumnarSetStore(db, "workout_log")
+    assert store.tonnage_by_exercise() == {"bench001": 1000.0}
+
+    key = {"date": "2025-05-07", "exercise_id": "bench001"}
+    db.update("workout_log", {**key, "set_number": 1, "page_id": "p1"}, dirty=False)
+    db.update_many("workout_log", [{**key, "set_number": 2, "weight": 110.0}])
+
+    assert store.tonnage_by_exercise() == {"bench001": 1050.0}
+
+
+def test_store_follows_writes_from_other_workers(db):
+    from app.db.manager import DatabaseManager
+
+    db.add("workout_log", make_set(1, weight=100.0, reps=5))
+    store = ColumnarSetStore(db, "workout_log")
+    assert store.tonnage_by_exercise() == {"bench001": 500.0}
+
+    DatabaseManager(db.db_path).add("workout_log", make_set(2, weight=100.0, reps=5))
+    assert store.tonnage_by_exercise() == {"bench001": 1000.0}
@@ -0,0 +1,63 @@
+from app.models.sets import CompletedSet
+from app.services.notion.fetcher import Fetcher
+from app.services.notion.parser import SET_PROPERTIES, compile_parser, parse_data
+
+
+class FakeDatabases:
+    def __init__(self):
+        self.retrieves = 0
+        self.queries = []
+        self.last_edited_time = "2025-01-01T00:00:00.000Z"
+
+    def retrieve(self, database_id):
+        self.retrieves += 1
+        properties = {name: {"id": f"id-{i}", "name": name} for i, name in enumerate(SET_PROPERTIES)}
+        properties["Estimated 1RM"] = {"id": "formula", "name": "Estimated 1RM"}
+        return {
+            "id": database_id, "title": [{"text": {"content": "Workout Log"}}],
+            "last_edited_time": self.last_edited_time, "properties": properties,
+        }
+
+    def query(self, database_id, **kwargs):
+        self.queries.append(kwargs)
+        return {"results": [{
+            "id": "page-1",
+            "properties": {
+                "Workout Title": {"select": {"name": "Push"}},
+                "Weight": {"number": 100},
+                "Reps": {"number": 5},
+                "Exercise Reference": {"relation": [{"id": "ex-1"}]},
+                "Set #": {"number": 1},
+                "Date": {"date": {"start": "2025-01-01"}},
+            },
+        }], "next_cursor": None}
+
+
+class FakeClient:
+    def __init__(self):
+        self.databases = FakeDatabases()
+
+
+def test_queries_request_only_parsed_properties():
+    client = FakeClient()
+    fetcher = Fetcher(client)
+
+    for _ in range(2):
+        pages = fetcher.query_pages_by_last_edited_time("db", "2025-01-01", model=CompletedSet)
+
+    assert client.databases.retrieves == 1
+    assert client.databases.queries[0]["filter_properties"] == [f"id-{i}" for i in range(len(SET_PROPERTIES))]
+    assert parse_data(pages, CompletedSet)[0]["page_id"] == "page-1"
+    Fetcher(client).fetch_all_pages("db")
+    assert "filter_properties" not in client.databases.queries[-1]
+
+
+def test_refreshed_schema_compiles_a_new_parser():
+    client = FakeClient()
+    fetcher = Fetcher(client)
+    parser = compile_parser(CompletedSet, fetcher.database_info("db"))
+
+    client.databases.last_edited_time = "2025-02-01T00:00:00.000Z"
+    assert compile_parser(CompletedSet, fetcher.database_info("db")) is parser
+    assert compile_parser(CompletedSet, fetcher.database_info("db", refresh=True)) is not parser
+    assert client.databases.retrieves == 2
@@ -0,0 +1,200 @@
+import os
+import json
+import pytest
+from app.core.errors import DatabaseError
+from app.db.manager import DatabaseManager
+from app.db.storage import AtomicJSONStorage, JournalStorage
+from app.models.sets import CompletedSet
+from tests.conftest import make_set
+
+
+def test_add_skips_existing_keys(db):
+    db.add("workout_log", [make_set(1), make_set(2)])
+    result = db.add("workout_log", [make_set(2), make_set(3), make_set(3)])
+    assert [e["set_number"] for e in result["inserted"]] == [3]
+    assert len(result["duplicates"]) == 2
+    assert len(db.get_table("workout_log")) == 3
+
+
+def test_keyed_get_update_delete(db):
+    db.add("workout_log", [make_set(1), make_set(2)])
+    key = {"date": "2025-05-07", "set_number": 2, "exercise_id": "bench001"}
+
+    assert db.get("workout_log", key)[0]["set_number"] == 2
+    assert db.update("workout_log", make_set(2, reps=10))["reps"] == 10
+    assert db.get("workout_log", key)[0]["reps"] == 10
+
+    assert db.delete("workout_log", key)
+    assert db.get("workout_log", key) == []
+    assert not db.delete("workout_log", key)
+    assert db.update("workout_log", make_set(2)) is None
+
+
+def test_index_is_built_from_existing_file(db, tmp_path):
+    db.add("workout_log", [make_set(1), make_set(2)])
+    reopened = DatabaseManager(str(tmp_path / "db" / "tinydb.json"))
+    key = {"date": "2025-05-07", "set_number": 1, "exercise_id": "bench001"}
+    assert reopened.get("workout_log", key)[0]["reps"] == 8
+    assert reopened.add("workout_log", make_set(1))["inserted"] == []
+
+
+def test_batch_writes_file_once(db, monkeypatch):
+    writes = []
+    storage = db.db.storage.storage
+    original_write = storage.write
+    monkeypatch.setattr(storage, "write", lambda data: writes.append(1) or original_write(data))
+
+    with db.batch():
+        for n in range(5):
+            db.add("workout_log", make_set(n))
+        db.update_last_sync_time("workout_log")
+        assert writes == []
+
+    assert len(writes) == 1
+    reopened = DatabaseManager(db.db_path)
+    assert len(reopened.get_table("workout_log")) == 5
+
+
+def test_journal_storage_appends_and_compacts(tmp_path):
+    path = str(tmp_path / "journal.json")
+    db = DatabaseManager(path, storage_cls=JournalStorage, compact_after=1000)
+    db.create_table("workout_log", CompletedSet)
+    db.add("workout_log", [make_set(n) for n in range(50)])
+
+    size_before = os.path.getsize(path + ".journal")
+    db.update("workout_log", make_set(7, reps=12))
+    appended = os.path.getsize(path + ".journal") - size_before
+    assert appended < 2 * len(json.dumps(make_set(7)))
+
+    with pytest.raises(DatabaseError, match="another process"):
+        JournalStorage(path)
+
+    db.db.storage.storage.compact(wait=True)
+    assert os.path.getsize(path + ".journal") == 0
+    assert not os.path.exists(path + ".journal.frozen")
+    db.db.close()
+    reopened = DatabaseManager(path, storage_cls=JournalStorage)
+    key = {"date": "2025-05-07", "set_number": 7, "exercise_id": "bench001"}
+    assert reopened.get("workout_log", key)[0]["reps"] == 12
+    assert len(reopened.all("workout_log")) == 50
+    assert reopened.get("workout_log", key)[0]["reps"] == 12
+
+
+def test_managers_sharing_a_file_see_each_others_writes(db):
+    other = DatabaseManager(db.db_path)
+    key = {"date": "2025-05-07", "set_number": 1, "exercise_id": "bench001"}
+
+    db.add("workout_log", make_set(1))
+    assert other.get("workout_log", key)[0]["reps"] == 8
+
+    other.add("workout_log", make_set(2))
+    db.add("workout_log", make_set(3))
+    other.update("workout_log", make_set(1, reps=5))
+
+    assert sorted(e["set_number"] for e in db.all("workout_log")) == [1, 2, 3]
+    assert db.get("workout_log", key)[0]["reps"] == 5
+    assert db.add("workout_log", make_set(2))["inserted"] == []
+
+
+def test_get_range_uses_sorted_date_index(db):
+    db.add("workout_log", [make_set(1, date="2025-05-14"), make_set(1, date="2025-05-05")])
+    assert [e["date"] for e in db.get_range("workout_log", "2025-05-01", "2025-05-31")] == ["2025-05-05", "2025-05-14"]
+
+    db.add("workout_log", [make_set(2, date="2025-05-07T18:30:00.000-05:00"), make_set(1, date="2025-06-01")])
+    db.delete("workout_log", {"date": "2025-05-14", "set_number": 1, "exercise_id": "bench001"})
+
+    dates = [e["date"] for e in db.get_range("workout_log", "2025-05-05", "2025-05-14")]
+    assert dates == ["2025-05-05", "2025-05-07T18:30:00.000-05:00"]
+
+
+def test_metadata_is_read_once(db, monkeypatch):
+    db.add("workout_log", make_set(1))
+    reads = []
+    metadata_table = db.metadata_table
+    original_all = type(metadata_table).all
+    monkeypatch.setattr(type(metadata_table), "all", lambda self: reads.append(self.name) or original_all(self))
+
+    db._metadata = None
+    for n in range(2, 6):
+        db.add("workout_log", make_set(n))
+        db.update("workout_log", make_set(n, reps=3))
+    db.update_last_sync_time("workout_log")
+
+    assert reads.count("metadata") == 1
+    assert db.get_last_sync_time("workout_log") is not None
+    assert DatabaseManager(db.db_path).get_last_sync_time("workout_log") == db.get_last_sync_time("workout_log")
+
+
+def test_add_chunked_consumes_a_stream(db, monkeypatch):
+    db.add("workout_log", make_set(2))
+    chunks = []
+    original_add = db.add
+    monkeypatch.setattr(db, "add", lambda table, entries: chunks.append(len(entries)) or original_add(table, entries))
+
+    counts = db.add_chunked("workout_log", (make_set(i) for i in range(1, 6)), chunk_size=2)
+
+    assert chunks == [2, 2, 1]
+    assert counts == {"inserted": 4, "duplicates": 1, "failed": 0}
+    assert len(db.get_table("workout_log")) == 5
+
+
+def test_update_many_writes_once(db, monkeypatch):
+    db.add("workout_log", [make_set(1), make_set(2), make_set(3)])
+    events = []
+    db.subscribe("workout_log", lambda event, entries: events.append((event, len(entries))))
+    writes = []
+    storage = db.db.storage
+    original_write = storage.storage.write
+    monkeypatch.setattr(storage.storage, "write", lambda data: writes.append(1) or original_write(data))
+
+    applied = db.update_many("workout_log", [make_set(1, page_id="a"), make_set(3, page_id="c"), make_set(9)], dirty=False)
+
+    assert [e["set_number"] for e in applied] == [1, 3]
+    assert len(writes) == 1 and events == [("update", 2)]
+    assert [e["set_number"] for e in db.get_dirty("workout_log")] == [2]
+
+
+def test_upsert_applies_remote_edits(db):
+    db.add("workout_log", [make_set(1, page_id="p1"), make_set(2, page_id="p2")])
+    db.get_range("workout_log", "2025-05-01", "2025-05-31")
+
+    result = db.upsert("workout_log", [
+        make_set(1, page_id="p1", reps=12),
+        make_set(2, date="2025-05-09", page_id="p2"),
+        make_set(3, page_id="p3"),
+    ], dirty=False)
+
+    assert len(result["inserted"]) == 2 and len(result["updated"]) == 1
+    assert db.get("workout_log", {"date": "2025-05-07", "set_number": 1, "exercise_id": "bench001"})[0]["reps"] == 12
+    assert db.get("workout_log", {"date": "2025-05-07", "set_number": 2, "exercise_id": "bench001"}) == []
+    assert [e["page_id"] for e in db.get_range("workout_log", "2025-05-09", "2025-05-09")] == ["p2"]
+    assert len(db.all("workout_log")) == 3
+
+
+def test_loaded_documents_share_repeated_strings(tmp_path):
+    path = str(tmp_path / "db" / "tinydb.json")
+    writer = DatabaseManager(path)
+    writer.create_table("workout_log", CompletedSet)
+    writer.add("workout_log", [make_set(i, exercise_id="".join(["bench", "001"])) for i in range(1, 4)])
+
+    entries = DatabaseManager(path).all("workout_log")
+    assert len({id(entry["exercise_id"]) for entry in entries}) == 1
+
+
+@pytest.mark.parametrize("storage_cls", [AtomicJSONStorage, JournalStorage])
+def test_failed_batch_is_discarded(tmp_path, storage_cls):
+    path = str(tmp_path / "tinydb.json")
+    db = DatabaseManager(path, storage_cls=storage_cls)
+    db.create_table("workout_log", CompletedSet)
+    db.add("workout_log", make_set(1))
+
+    with pytest.raises(RuntimeError):
+        with db.batch():
+            db.add("workout_log", make_set(2))
+            db.update("workout_log", make_set(1, reps=12))
+            raise RuntimeError("interrupted")
+
+    assert [(e["set_number"], e["reps"]) for e in db.all("workout_log")] == [(1, 8)]
+    assert db.add("workout_log", make_set(2))["inserted"]
+    db.db.close()
+    assert len(DatabaseManager(path, storage_cls=storage_cls).all("workout_log")) == 2
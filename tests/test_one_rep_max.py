@@ -0,0 +1,69 @@
+import pytest
+
+from app.services.notion.setter import PageResult
+from app.services.one_rep_max import OneRepMaxEngine
+from tests.conftest import make_set
+
+
+class FakeSetter:
+    def __init__(self):
+        self.pushed = []
+
+    def set_max_1rms(self, references):
+        self.pushed.append(sorted(references))
+        return [PageResult(exercise_id) for exercise_id, _ in references]
+
+
+def test_only_changed_bests_are_pushed(db):
+    db.add("workout_log", [
+        make_set(1, weight=100.0, reps=5, page_id="bench-a"),
+        make_set(2, weight=90.0, reps=5, page_id="bench-b"),
+        make_set(1, exercise_id="squat001", weight=150.0, reps=5),
+    ])
+    engine = OneRepMaxEngine(db)
+    setter = FakeSetter()
+
+    assert engine.push(setter) == 1
+    assert setter.pushed == [[("bench001", "bench-a")]]
+
+    db.add("workout_log", make_set(3, weight=95.0, reps=5, page_id="bench-c"))
+    assert engine.push(setter) == 0
+
+    db.add("workout_log", make_set(4, weight=110.0, reps=5, page_id="bench-d"))
+    db.update_many("workout_log", [make_set(1, exercise_id="squat001", weight=150.0, reps=5, page_id="squat-a")])
+    assert engine.push(setter) == 2
+    assert setter.pushed[-1] == [("bench001", "bench-d"), ("squat001", "squat-a")]
+
+    assert engine.best()["bench001"]["estimated_1rm"] == pytest.approx(110.0 * (1 + 5 / 30))
+    assert OneRepMaxEngine(db).push(setter) == 0
+
+
+def test_better_set_recorded_during_a_push_stays_dirty(db):
+    db.add("workout_log", make_set(1, weight=100.0, reps=5, page_id="bench-a"))
+    engine = OneRepMaxEngine(db)
+    setter = FakeSetter()
+    set_max_1rms = setter.set_max_1rms
+
+    def record_better_set(references):
+        db.add("workout_log", make_set(2, weight=120.0, reps=5, page_id="bench-b"))
+        return set_max_1rms(references)
+
+    setter.set_max_1rms = record_better_set
+    assert engine.push(setter) == 1
+
+    best = db.get("best_set", {"exercise_id": "bench001"})[0]
+    assert (best["set_page_id"], best["_dirty"]) == ("bench-b", True)
+    setter.set_max_1rms = set_max_1rms
+    assert engine.push(setter) == 1
+    assert setter.pushed[-1] == [("bench001", "bench-b")]
+
+
+def test_formula_is_configurable(db):
+    db.add("workout_log", [make_set(1, weight=100.0, reps=12), make_set(2, weight=125.0, reps=4)])
+    assert OneRepMaxEngine(db).best()["bench001"]["set_number"] == 2
+
+    engine = OneRepMaxEngine(db, formula="brzycki", best_table="best_set_brzycki")
+    best = engine.best()["bench001"]
+    assert best["set_number"] == 1
+    assert best["estimated_1rm"] == pytest.approx(100.0 * 36 / 25)
+    assert engine.analytics.best_estimated_1rm("brzycki")["bench001"]["estimated_1rm"] == pytest.approx(best["estimated_1rm"])
@@ -0,0 +1,83 @@
+import pytest
+
+from app.core.errors import ModelError
+from app.models.sets import CompletedSet, Exercise
+from app.services.notion import parser
+from app.services.notion.parser import (
+    RecordError, compile_parser, parse_data, parse_exercise_data, parse_parallel, parse_set_data, shutdown_parse_pool
+)
+
+
+def set_page(set_number=1, weight=100, **overrides):
+    properties = {
+        "Workout Title": {"type": "select", "select": {"name": "Push"}},
+        "Weight": {"type": "number", "number": weight},
+        "Reps": {"type": "number", "number": 5},
+        "Exercise Reference": {"type": "relation", "relation": [{"id": "ex-1"}]},
+        "Set #": {"type": "number", "number": set_number},
+        "Date": {"type": "date", "date": {"start": "2025-01-01"}},
+        "Notes": {"type": "rich_text", "rich_text": [{"text": {"content": "felt\nheavy"}}]},
+        "Estimated 1RM": {"type": "formula", "formula": {"type": "number", "number": 116.7}},
+    }
+    properties.update(overrides)
+    return {"id": f"page-{set_number}", "properties": properties}
+
+
+def test_compiled_parser_matches_the_page_parsers():
+    exercise = {"id": "ex-1", "properties": {
+        "Name": {"title": [{"text": {"content": "Bench Press"}}]},
+        "Category": {"select": {"name": "strength"}},
+        "Level": {"select": None},
+        "Primary Muscles": {"multi_select": [{"name": "chest"}]},
+    }}
+    pages = [set_page(1), set_page(2, weight=None)]
+
+    assert parse_data(pages, CompletedSet) == [parse_set_data(page) for page in pages]
+    assert parse_data([exercise], Exercise) == [parse_exercise_data(exercise)]
+
+
+def test_parser_follows_the_schema_and_validates_batches():
+    schema = {"id": "db", "last_edited_time": "t1", "properties": {"Reps": {"id": "r", "type": "formula"}}}
+    page = set_page(Reps={"type": "formula", "formula": {"type": "number", "number": 8}})
+
+    assert compile_parser(CompletedSet, schema) is compile_parser(CompletedSet, schema)
+    assert parse_data([page], CompletedSet, schema)[0]["reps"] == 8
+    with pytest.raises(ModelError):
+        parse_data([set_page(1), set_page(2, Reps={"number": None})], CompletedSet)
+
+    trusted = parse_data([set_page(Reps={"number": None})], CompletedSet, trusted=True)
+    assert trusted[0]["reps"] is None and trusted[0]["weight"] == 100
+
+
+def test_failed_pages_are_reported_per_record():
+    pages = [set_page(1), set_page(2, Reps={"number": None}), set_page(3), set_page(4, Date={"date": "bad"})]
+    errors = []
+
+    parsed = parse_data(pages, CompletedSet, errors=errors, parallel=False)
+
+    assert [entry["set_number"] for entry in parsed] == [1, 3]
+    assert [(error.index, type(error.error).__name__) for error in errors] == [(1, "ModelError"), (3, "ParsingError")]
+
+
+def test_parallel_parse_keeps_input_order():
+    pages = [set_page(i) for i in range(1, 8)]
+    pages[4] = set_page(5, Reps={"number": None})
+    errors = []
+    try:
+        parsed = parse_parallel(pages, CompletedSet, errors=errors, chunk_size=2)
+    finally:
+        shutdown_parse_pool()
+
+    assert [entry["set_number"] for entry in parsed] == [1, 2, 3, 4, 6, 7]
+    assert len(errors) == 1 and isinstance(errors[0], RecordError) and errors[0].index == 4
+    assert errors[0].error.context[0]["loc"] == ("reps",)
+
+
+def test_large_lists_switch_to_parallel(monkeypatch):
+    calls = []
+    monkeypatch.setattr(parser, "parse_parallel", lambda pages, *args: calls.append(len(pages)) or [])
+    monkeypatch.setenv("PARALLEL_PARSE_THRESHOLD", "3")
+
+    assert len(parse_data([set_page(1), set_page(2)], CompletedSet)) == 2
+    parse_data([set_page(i) for i in range(1, 4)], CompletedSet)
+    assert calls == [3]
@@ -0,0 +1,102 @@
+import httpx
+import pytest
+from notion_client.errors import APIErrorCode, APIResponseError
+
+from app.core.errors import APIError
+from app.services.notion.fetcher import Fetcher
+from app.services.notion.retry import CircuitBreaker, Retrier
+
+
+def api_error(status, headers=None):
+    response = httpx.Response(status, headers=headers or {})
+    return APIResponseError(response, "error", APIErrorCode.RateLimited)
+
+
+class FlakyDatabases:
+    def __init__(self, failures):
+        self.failures = failures
+        self.cursors = []
+
+    def query(self, database_id, start_cursor=None, **kwargs):
+        self.cursors.append(start_cursor)
+        if self.failures.get(start_cursor):
+            self.failures[start_cursor] -= 1
+            raise api_error(429, {"Retry-After": "2"})
+        page = int(start_cursor or 0)
+        return {"results": [page], "next_cursor": str(page + 1) if page < 2 else None}
+
+
+class FakeClient:
+    def __init__(self, databases):
+        self.databases = databases
+
+
+def test_pagination_resumes_from_failed_cursor():
+    sleeps = []
+    retrier = Retrier(sleep=sleeps.append)
+    databases = FlakyDatabases({"1": 1})
+
+    pages = Fetcher(FakeClient(databases), retrier=retrier).fetch_all_pages("db")
+
+    assert pages == [0, 1, 2]
+    assert databases.cursors == [None, "1", "1", "2"]
+    assert len(sleeps) == 1 and sleeps[0] >= 2
+    assert retrier.metrics.snapshot()["retries"] == 1
+
+
+def test_circuit_breaker_rejects_calls_while_open():
+    now = [0.0]
+    retrier = Retrier(max_attempts=2, sleep=lambda s: None,
+                      breaker=CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0]))
+    calls = []
+
+    def unavailable():
+        calls.append(1)
+        raise api_error(503)
+
+    with pytest.raises(APIError):
+        retrier.call(unavailable)
+    assert retrier.breaker.state == "open"
+
+    with pytest.raises(APIError, match="circuit is open"):
+        retrier.call(unavailable)
+    assert len(calls) == 2
+
+    now[0] = 11
+    assert retrier.call(lambda: "ok") == "ok"
+    assert retrier.breaker.state == "closed"
+    assert retrier.metrics.snapshot()["rejected"] == 1
+
+
+def test_trial_call_that_raises_does_not_wedge_the_circuit():
+    now = [0.0]
+    retrier = Retrier(max_attempts=1, sleep=lambda s: None,
+                      breaker=CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0]))
+    with pytest.raises(APIError):
+        retrier.call(lambda: (_ for _ in ()).throw(api_error(503)))
+
+    now[0] = 11
+    with pytest.raises(ValueError):
+        retrier.call(lambda: (_ for _ in ()).throw(ValueError("bad payload")))
+    assert retrier.call(lambda: "ok") == "ok"
+    assert retrier.breaker.state == "closed"
+
+
+def test_client_errors_are_not_retried():
+    retrier = Retrier(sleep=lambda s: pytest.fail("should not sleep"))
+    with pytest.raises(APIError) as excinfo:
+        retrier.call(lambda: (_ for _ in ()).throw(api_error(400)))
+    assert excinfo.value.context == {"status": 400, "attempts": 1}
+
+
+def test_non_idempotent_calls_are_only_retried_when_rejected():
+    retrier = Retrier(sleep=lambda s: None)
+    failures = [api_error(429), api_error(502)]
+
+    def create():
+        raise failures.pop(0)
+
+    with pytest.raises(APIError) as excinfo:
+        retrier.call(create, idempotent=False)
+    assert excinfo.value.context == {"status": 502, "attempts": 2}
+    assert failures == []
@@ -0,0 +1,73 @@
+import logging
+import threading
+import time
+
+from app.services.scheduler import SyncScheduler
+
+
+class SlowSyncService:
+    def __init__(self, db_path):
+        self.database = type("Database", (), {"db_path": db_path})()
+        self.release = threading.Event()
+        self.started = threading.Semaphore(0)
+        self.runs = 0
+
+    def sync_all(self):
+        self.runs += 1
+        self.started.release()
+        self.release.wait(5)
+        logging.getLogger("app.services.sync_service").error("Failed to upload entry")
+        return {"pulled": {"workout_log": 2}}
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_triggers_during_a_run_are_coalesced(tmp_path):
+    service = SlowSyncService(str(tmp_path / "tinydb.json"))
+    scheduler = SyncScheduler(service, interval=None)
+    scheduler.start()
+    try:
+        assert scheduler.trigger() == {"queued": True, "coalesced": False}
+        assert service.started.acquire(timeout=5)
+        assert scheduler.status()["state"] == "running"
+
+        for _ in range(3):
+            assert scheduler.trigger()["coalesced"]
+        service.release.set()
+
+        wait_for(lambda: scheduler.status()["runs"] == 2)
+        time.sleep(0.05)
+        status = scheduler.status()
+        assert service.runs == 2 and status["runs"] == 2
+        assert status["coalesced_triggers"] == 2
+        assert status["last_result"] == {"pulled": {"workout_log": 2}}
+        assert status["last_errors"] == ["app.services.sync_service: Failed to upload entry"]
+        assert status["last_duration"] is not None
+    finally:
+        scheduler.stop(timeout=5)
+
+
+def test_trigger_skipped_by_another_process_runs_after_it(tmp_path):
+    holder_service = SlowSyncService(str(tmp_path / "tinydb.json"))
+    holder = SyncScheduler(holder_service, interval=None)
+    skipper_service = SlowSyncService(str(tmp_path / "tinydb.json"))
+    skipper = SyncScheduler(skipper_service, interval=None)
+
+    thread = threading.Thread(target=holder.run_once)
+    thread.start()
+    try:
+        assert holder_service.started.acquire(timeout=5)
+        result = skipper.run_once()["last_result"]
+        assert result == {"skipped": "another process is syncing; queued a follow-up run"}
+        assert skipper_service.runs == 0
+    finally:
+        holder_service.release.set()
+        thread.join(5)
+
+    assert holder_service.runs == 2
+    assert holder.status()["last_result"] == {"pulled": {"workout_log": 2}}
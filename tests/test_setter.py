@@ -0,0 +1,53 @@
+import threading
+import time
+
+import pytest
+
+from app.services.notion.rate_limit import TokenBucket
+from app.services.notion.setter import Setter
+
+
+class FakePages:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = []
+
+    def create(self, parent, properties):
+        time.sleep(0.01)
+        with self.lock:
+            self.calls.append(properties["n"])
+        if properties["n"] == 2:
+            raise ValueError("boom")
+        return {"id": f"page-{properties['n']}"}
+
+
+class FakeClient:
+    def __init__(self):
+        self.pages = FakePages()
+
+
+def test_token_bucket_paces_after_burst():
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=3.0, capacity=3.0, clock=lambda: now[0], sleep=sleep)
+    for _ in range(6):
+        bucket.acquire()
+
+    assert len(sleeps) == 3
+    assert now[0] == pytest.approx(1.0)
+
+
+def test_add_pages_collects_results_in_order():
+    client = FakeClient()
+    setter = Setter(client, rate_limiter=TokenBucket(rate=1000.0, capacity=10.0), max_workers=4)
+
+    results = setter.add_pages([{"n": i} for i in range(5)], "db")
+
+    assert [r.page_id for r in results] == ["page-0", "page-1", None, "page-3", "page-4"]
+    assert isinstance(results[2].error, RuntimeError)
+    assert sorted(client.pages.calls) == [0, 1, 2, 3, 4]
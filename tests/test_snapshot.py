@@ -0,0 +1,62 @@
+from app.db.manager import DatabaseManager
+from app.db.snapshot import SetSnapshot, open_fresh_snapshot, write_snapshot
+from app.models.sets import CompletedSet
+from app.services.sync_service import SyncService
+from tests.conftest import make_set
+
+
+def test_snapshot_round_trip_and_lookups(tmp_path):
+    entries = [
+        make_set(1, date="2025-05-14", page_id="p1", exercise_notes="heavy"),
+        make_set(2, date="2025-05-05", weight=None),
+        make_set(1, date="2025-05-05", exercise_id="squat001"),
+    ]
+    path = str(tmp_path / "workout_log.snapshot")
+    write_snapshot(path, entries)
+
+    with SetSnapshot(path) as snapshot:
+        assert len(snapshot) == 3
+        assert list(snapshot) == [entries[2], entries[1], entries[0]]
+        assert [e["date"] for e in snapshot.get_range("2025-05-01", "2025-05-06")] == ["2025-05-05", "2025-05-05"]
+        assert snapshot.get({"date": "2025-05-14", "set_number": 1, "exercise_id": "bench001"}) == entries[0]
+        assert snapshot.get({"date": "2025-05-14", "set_number": 9, "exercise_id": "bench001"}) is None
+        columns = snapshot.columns()
+        assert columns["reps"].tolist() == [8, 8, 8]
+        del columns
+
+
+def test_backup_writes_snapshot(db, tmp_path):
+    db.add("workout_log", [make_set(1), make_set(2)])
+    sync = SyncService(db)
+    sync.backup_database(str(tmp_path / "backups"))
+
+    with SetSnapshot(str(tmp_path / "db" / "workout_log.snapshot")) as snapshot:
+        assert len(snapshot) == 2
+
+
+def test_cold_worker_reads_ranges_from_a_fresh_snapshot(tmp_path):
+    from app import create_app
+    from app.routes.routes import get_db
+
+    db_path = str(tmp_path / "db" / "tinydb.json")
+    db = DatabaseManager(db_path)
+    db.create_table("workout_log", CompletedSet)
+    db.add("workout_log", [make_set(2), make_set(1, exercise_id="squat001"), make_set(1), make_set(1, date="2025-06-01")])
+    db.update("workout_log", make_set(2, reps=10), dirty=True)
+    SyncService(db).write_snapshots()
+
+    cold_app = create_app({"TESTING": True, "DB_PATH": db_path})
+    cold = cold_app.test_client().get("/workouts/range?start=2025-05-01&end=2025-05-31").get_json()
+    assert "db" not in cold_app.extensions
+    assert [(e["set_number"], e["exercise_id"]) for e in cold] == [(1, "bench001"), (1, "squat001"), (2, "bench001")]
+
+    warm_app = create_app({"TESTING": True, "DB_PATH": db_path})
+    with warm_app.app_context():
+        get_db()
+    assert warm_app.test_client().get("/workouts/range?start=2025-05-01&end=2025-05-31").get_json() == cold
+    assert not any(field.startswith("_") for entry in cold for field in entry)
+
+    db.add("workout_log", make_set(3))
+    assert open_fresh_snapshot(db_path, "workout_log") is None
+    res = cold_app.test_client().get("/workouts/range?start=2025-05-01&end=2025-05-31")
+    assert [e["set_number"] for e in res.get_json()] == [1, 1, 2, 3]
@@ -0,0 +1,97 @@
+import pytest
+from app.db.manager import DatabaseManager
+from app.db.sqlite_manager import SQLiteManager
+from app.models.sets import CompletedSet, Exercise
+from scripts.migrate_to_sqlite import migrate
+from tests.conftest import make_set
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = SQLiteManager(str(tmp_path / "db" / "sqlite.db"))
+    manager.create_table("workout_log", CompletedSet, remote_id="remote")
+    return manager
+
+
+def test_add_get_update_delete(db):
+    result = db.add("workout_log", [make_set(1), make_set(2), make_set(2)])
+    assert len(result["inserted"]) == 2
+    assert len(result["duplicates"]) == 1
+    assert db.add("workout_log", make_set(1))["inserted"] == []
+
+    key = {"date": "2025-05-07", "set_number": 2, "exercise_id": "bench001"}
+    assert db.get("workout_log", key) == [make_set(2)]
+    assert db.update("workout_log", make_set(2, reps=10, page_id="p2"))
+    assert db.get("workout_log", key)[0]["page_id"] == "p2"
+    assert db.delete("workout_log", key)
+    assert db.get("workout_log", key) == []
+
+
+def test_json_columns_and_extra_fields_round_trip(db):
+    db.create_table("exercise", Exercise)
+    exercise = {
+        "name": "Bench", "id": "ex1", "category": "strength", "equipment": "barbell",
+        "force": "push", "level": "beginner", "mechanic": "compound",
+        "primary_muscles": ["chest"], "secondary_muscles": ["triceps", "shoulders"],
+        "_note": "kept",
+    }
+    db.add("exercise", exercise)
+    assert db.get("exercise", {"id": "ex1"}) == [exercise]
+
+
+def test_get_new_entries_and_sync_time(db):
+    db.add("workout_log", make_set(1))
+    assert db.get_new_entries([make_set(1), make_set(2)], "workout_log") == [make_set(2)]
+    assert db.get_last_sync_time("workout_log") is None
+    db.update_last_sync_time("workout_log")
+    assert db.get_last_sync_time("workout_log") is not None
+
+
+def test_migrate_from_tinydb(tmp_path):
+    source = DatabaseManager(str(tmp_path / "tinydb.json"))
+    source.create_table("workout_log", CompletedSet, remote_id="remote")
+    source.add("workout_log", [make_set(1), make_set(2)])
+    source.update_last_sync_time("workout_log")
+
+    target = SQLiteManager(str(tmp_path / "sqlite.db"))
+    migrate(source, target)
+
+    assert sorted(e["set_number"] for e in target.all("workout_log")) == [1, 2]
+    assert target.get_composite_key_fields("workout_log") == ["date", "set_number", "exercise_id"]
+    assert target.get_last_sync_time("workout_log") == source.get_last_sync_time("workout_log")
+
+
+def test_get_range(db):
+    db.add("workout_log", [make_set(1, date="2025-05-14"), make_set(1, date="2025-05-05"), make_set(1, date="2025-06-01")])
+    assert [e["date"] for e in db.get_range("workout_log", "2025-05-01", "2025-05-14")] == ["2025-05-05", "2025-05-14"]
+
+
+def test_get_dirty(db):
+    db.add("workout_log", [make_set(1, page_id="synced"), make_set(2)])
+    assert [e["set_number"] for e in db.get_dirty("workout_log")] == [2]
+    db.update("workout_log", make_set(1, page_id="synced", reps=3), dirty=True)
+    db.update("workout_log", make_set(2, page_id="new"), dirty=False)
+    assert [e["set_number"] for e in db.get_dirty("workout_log")] == [1]
+
+
+def test_upsert_and_watermark(db):
+    db.add("workout_log", [make_set(1, page_id="p1"), make_set(2, page_id="p2")])
+    result = db.upsert("workout_log", [make_set(1, page_id="p1", reps=12), make_set(2, date="2025-05-09", page_id="p2")])
+
+    assert len(result["inserted"]) == 1 and len(result["updated"]) == 1
+    assert sorted((e["date"], e["reps"]) for e in db.all("workout_log")) == [("2025-05-07", 12), ("2025-05-09", 8)]
+
+    db.update_last_sync_time("workout_log", watermark="2025-05-09T10:00:00.000Z")
+    db.update_last_sync_time("workout_log")
+    assert db.get_watermark("workout_log") == "2025-05-09T10:00:00.000Z"
+    db.set_checkpoint("workout_log", {"since": "2000-01-01T00:00:00", "cursor": "abc", "committed": 100})
+    assert db.get_checkpoint("workout_log")["cursor"] == "abc"
+    db.set_checkpoint("workout_log", None)
+    assert db.get_checkpoint("workout_log") is None
+
+
+def test_upsert_keeps_the_last_of_duplicate_keys(db):
+    result = db.upsert("workout_log", [make_set(1, reps=5), make_set(2), make_set(1, reps=6)])
+
+    assert len(result["inserted"]) == 2
+    assert sorted((e["set_number"], e["reps"]) for e in db.all("workout_log")) == [(1, 6), (2, 8)]
@@ -0,0 +1,38 @@
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_BUDGET_US = 1_500_000
+LAZY_MODULES = {"notion_client", "structlog", "httpx", "numpy", "tinydb"}
+
+
+def import_times(module, cwd):
+    env = {k: v for k, v in os.environ.items() if k != "NOTION_API_KEY"}
+    env["PYTHONPATH"] = ROOT
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, env=env, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)", line)
+        if match:
+            times[match.group(3)] = int(match.group(1))
+    return times
+
+
+def test_app_import_is_lazy_and_within_budget(tmp_path):
+    times = import_times("app.app", tmp_path)
+
+    assert not LAZY_MODULES & {name.split(".")[0] for name in times}
+    assert times["app"] < IMPORT_BUDGET_US
+    # No database file, log file or lock was created by importing the app.
+    assert os.listdir(tmp_path) == []
+
+
+def test_sync_service_imports_without_notion_credentials(tmp_path):
+    times = import_times("app.services.sync_service", tmp_path)
+    assert "structlog" not in times
+    assert os.listdir(tmp_path) == []
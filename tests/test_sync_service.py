@@ -0,0 +1,220 @@
+import asyncio
+
+from app.core.errors import APIError
+from app.services.notion.setter import PageResult
+from app.services.sync_service import SyncService
+from tests.conftest import make_set
+
+WORKOUT_DB = {"id": "remote-db", "name": "workout_log"}
+
+
+class FakeSetter:
+    def __init__(self):
+        self.created, self.updated = [], []
+        self.patches = {}
+
+    def add_page(self, page_data, database_id):
+        self.created.append(page_data)
+        return f"page-{len(self.created)}"
+
+    def update_page(self, page_id, page_data):
+        self.updated.append(page_id)
+        self.patches[page_id] = page_data
+
+    def add_pages(self, pages, database_id):
+        return [PageResult(self.add_page(page, database_id)) for page in pages]
+
+    def update_pages(self, updates):
+        return [self.update_page(page_id, page) or PageResult(page_id) for page_id, page in updates]
+
+
+class FakeFetcher:
+    def __init__(self, pages=()):
+        self.pages = list(pages)
+        self.scans = 0
+        self.since = []
+
+        self.cursors = []
+        self.fail_at = None
+
+    def iter_batches_by_last_edited_time(self, database_id, last_edited_time, start_cursor=None, model=None):
+        """One page per cursor page; the cursor is the index of the next page."""
+        self.since.append(last_edited_time)
+        self.cursors.append(start_cursor)
+        position = int(start_cursor or 0)
+        if not self.pages:
+            yield [], None
+        while position < len(self.pages):
+            if position == self.fail_at:
+                raise APIError("Notion call failed", context={"status": 502})
+            position += 1
+            yield self.pages[position - 1:position], str(position) if position < len(self.pages) else None
+
+    def database_info(self, database_id, refresh=False):
+        return None
+
+    def iter_all_pages(self, database_id, model=None):
+        self.scans += 1
+        return iter(self.pages)
+
+
+class FakeAsyncFetcher:
+    """Serves a FakeFetcher's cursor pages through the AsyncFetcher interface."""
+
+    def __init__(self, fetcher):
+        self.fetcher = fetcher
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def database_info(self, database_id, refresh=False):
+        return None
+
+    async def iter_batches_by_last_edited_time(self, database_id, last_edited_time, start_cursor=None, model=None):
+        for batch in self.fetcher.iter_batches_by_last_edited_time(database_id, last_edited_time, start_cursor, model):
+            yield batch
+
+
+def test_push_uploads_only_unsynced_and_dirty_rows(db):
+    db.add("workout_log", [make_set(1, page_id="synced"), make_set(2, page_id="edited"), make_set(3)])
+    db.update("workout_log", make_set(2, page_id="edited", reps=10), dirty=True)
+    fetcher, setter = FakeFetcher(), FakeSetter()
+    service = SyncService(db, fetcher=fetcher, setter=setter)
+
+    service.sync_local_to_remote(WORKOUT_DB)
+
+    assert fetcher.scans == 0
+    assert len(setter.created) == 1 and setter.updated == ["edited"]
+    assert db.get_dirty("workout_log") == []
+    assert db.get("workout_log", {"date": "2025-05-07", "set_number": 3, "exercise_id": "bench001"})[0]["page_id"] == "page-1"
+
+    service.sync_local_to_remote(WORKOUT_DB)
+    assert len(setter.created) == 1 and setter.updated == ["edited"]
+
+
+def test_edits_made_during_a_push_stay_dirty(db):
+    db.add("workout_log", [make_set(1), make_set(2, reps="many")])
+    setter = FakeSetter()
+    add_pages = setter.add_pages
+
+    def add_pages_while_editing(pages, database_id):
+        db.update("workout_log", make_set(1, reps=12), dirty=True)
+        return add_pages(pages, database_id)
+
+    setter.add_pages = add_pages_while_editing
+    assert SyncService(db, fetcher=FakeFetcher(), setter=setter).sync_local_to_remote(WORKOUT_DB) == 1
+
+    row = db.get("workout_log", {"date": "2025-05-07", "set_number": 1, "exercise_id": "bench001"})[0]
+    assert (row["reps"], row["page_id"], row["_dirty"]) == (12, "page-1", True)
+    assert len(setter.created) == 1
+
+
+def test_push_sends_only_changed_properties(db):
+    db.add("workout_log", [make_set(n) for n in range(1, 5)])
+    setter = FakeSetter()
+    service = SyncService(db, fetcher=FakeFetcher(), setter=setter)
+    service.sync_local_to_remote(WORKOUT_DB)
+
+    for n in (1, 2, 3):
+        db.update("workout_log", make_set(n, page_id=f"page-{n}", reps=12), dirty=True)
+    db.update("workout_log", make_set(4, page_id="page-4"), dirty=True)
+    assert service.sync_local_to_remote(WORKOUT_DB) == 4
+
+    assert sorted(setter.updated) == ["page-1", "page-2", "page-3"]
+    assert all(patch == {"Reps": {"number": 12}} for patch in setter.patches.values())
+    assert db.get_dirty("workout_log") == []
+
+
+def test_reconcile_recreates_rows_missing_remotely(db, monkeypatch):
+    db.add("workout_log", [make_set(1, page_id="kept"), make_set(2, page_id="deleted-remotely")])
+    monkeypatch.setattr("app.services.sync_service.parse_data", lambda pages, model, *args, **kwargs: pages)
+    fetcher, setter = FakeFetcher([make_set(1, page_id="kept")]), FakeSetter()
+
+    SyncService(db, fetcher=fetcher, setter=setter).sync_local_to_remote(WORKOUT_DB, reconcile=True)
+
+    assert fetcher.scans == 1
+    assert [page["Set #"]["number"] for page in setter.created] == [2]
+    assert setter.updated == []
+
+
+def test_pull_upserts_edits_and_advances_watermark(db, monkeypatch):
+    db.add("workout_log", make_set(1, page_id="p1"))
+    monkeypatch.setattr("app.services.sync_service.parse_data", lambda pages, model, *args, **kwargs: [page["set"] for page in pages])
+    fetcher = FakeFetcher([
+        {"last_edited_time": "2025-05-08T09:00:00.000Z", "set": make_set(1, page_id="p1", reps=3)},
+        {"last_edited_time": "2025-05-08T11:00:00.000Z", "set": make_set(2, page_id="p2")},
+    ])
+    service = SyncService(db, fetcher=fetcher, setter=FakeSetter())
+
+    service.sync_remote_to_local(WORKOUT_DB)
+    fetcher.pages = []
+    service.sync_remote_to_local(WORKOUT_DB)
+
+    assert sorted((e["set_number"], e["reps"]) for e in db.all("workout_log")) == [(1, 3), (2, 8)]
+    assert db.get_dirty("workout_log") == []
+    assert fetcher.since[-1] == "2025-05-08T11:00:00.000Z"
+
+
+def test_interrupted_pull_resumes_from_checkpoint(db, monkeypatch):
+    monkeypatch.setattr("app.services.sync_service.parse_data", lambda pages, model, *args, **kwargs: [page["set"] for page in pages])
+    fetcher = FakeFetcher([
+        {"last_edited_time": f"2025-05-08T0{i}:00:00.000Z", "set": make_set(i, page_id=f"p{i}")} for i in range(1, 5)
+    ])
+    fetcher.fail_at = 2
+    service = SyncService(db, fetcher=fetcher, setter=FakeSetter())
+
+    service.sync_remote_to_local(WORKOUT_DB)
+    assert len(db.all("workout_log")) == 2
+    assert db.get_checkpoint("workout_log")["cursor"] == "2"
+    assert db.get_watermark("workout_log") is None
+
+    fetcher.fail_at = None
+    service.sync_remote_to_local(WORKOUT_DB)
+    assert fetcher.cursors == [None, "2"]
+    assert len(db.all("workout_log")) == 4
+    assert db.get_checkpoint("workout_log") is None
+    assert db.get_watermark("workout_log") == "2025-05-08T04:00:00.000Z"
+
+
+def test_concurrent_pull_commits_each_cursor_page(db, monkeypatch):
+    monkeypatch.setattr("app.services.sync_service.parse_data", lambda pages, model, *args, **kwargs: [page["set"] for page in pages])
+    fetcher = FakeFetcher([
+        {"last_edited_time": f"2025-05-08T0{i}:00:00.000Z", "set": make_set(i, page_id=f"p{i}")} for i in range(1, 5)
+    ])
+    fetcher.fail_at = 2
+    service = SyncService(db, fetcher=fetcher, setter=FakeSetter(), async_fetcher=FakeAsyncFetcher(fetcher))
+
+    assert asyncio.run(service._pull_remote_concurrently([WORKOUT_DB])) == [None]
+    assert len(db.all("workout_log")) == 2
+    assert db.get_checkpoint("workout_log")["cursor"] == "2"
+
+    fetcher.fail_at = None
+    assert asyncio.run(service._pull_remote_concurrently([WORKOUT_DB])) == [2]
+    assert fetcher.cursors == [None, "2"]
+    assert db.get_checkpoint("workout_log") is None
+    assert db.get_watermark("workout_log") == "2025-05-08T04:00:00.000Z"
+
+
+def test_pull_keeps_unpushed_local_edits(db, monkeypatch):
+    monkeypatch.setattr("app.services.sync_service.parse_data", lambda pages, model, *args, **kwargs: [dict(page["set"]) for page in pages])
+    db.add("workout_log", make_set(1))
+    setter = FakeSetter()
+    service = SyncService(db, fetcher=FakeFetcher(), setter=setter)
+    service.sync_local_to_remote(WORKOUT_DB)
+    db.update("workout_log", make_set(1, page_id="page-1", reps=10), dirty=True)
+    key = {"date": "2025-05-07", "set_number": 1, "exercise_id": "bench001"}
+
+    echo = {"last_edited_time": "2025-05-08T01:00:00.000Z", "set": make_set(1, page_id="page-1")}
+    service.fetcher = FakeFetcher([echo])
+    service.sync_remote_to_local(WORKOUT_DB)
+    assert (db.get("workout_log", key)[0]["reps"], len(db.get_dirty("workout_log"))) == (10, 1)
+
+    remote_edit = {"last_edited_time": "2025-05-08T02:00:00.000Z", "set": make_set(1, page_id="page-1", weight=140.0)}
+    service.fetcher = FakeFetcher([remote_edit])
+    service.sync_remote_to_local(WORKOUT_DB)
+    assert db.get("workout_log", key)[0]["reps"] == 10
+    assert service.sync_local_to_remote(WORKOUT_DB) == 1
+    assert setter.patches["page-1"] == {"Reps": {"number": 10}, "Weight": {"number": 135.0}}
@@ -1,32 +1,63 @@
+import os
+import json
+import logging
 from datetime import datetime, timedelta
-from Notion.fetcher import Fetcher
+from typing import Optional
+
+from app.models.sets import CompletedSet
+from app.services.notion.fetcher import Fetcher
+from app.services.notion.parser import parse_data
+
+logger = logging.getLogger(__name__)
+
 
 class Week:
 
-    def __init__(self, week_number):
+    def __init__(self, week_number, database, fetcher: Optional[Fetcher] = None,
+                 table_name: str = "workout_log", max_age: timedelta = timedelta(hours=1)):
         self.week_start = self.get_week_start()
         self.week_number = week_number
         self.week_end = self.week_start + timedelta(days=6)
-        self.api_manager = API_Manager()
+        self.database = database
+        self.fetcher = fetcher or Fetcher()
+        self.table_name = table_name
+        self.max_age = max_age
 
     def get_week_start(self):
         # Return date of most recent Monday
         today = datetime.now()
         today = today - timedelta(days=today.weekday())
         return today.date()
-    
+
+    def local_is_current(self) -> bool:
+        """
+        The local table can answer for the week if it exists and has been
+        synced from Notion within `max_age`.
+        """
+        if not self.database.has_table(self.table_name):
+            return False
+        synced_at = self.database.get_last_sync_time(self.table_name)
+        if not synced_at:
+            return False
+        return datetime.now() - datetime.fromisoformat(synced_at) <= self.max_age
+
     def fetch_week_sets(self):
 
         """
-        Fetches exercises for the week from the Notion database.
-        
+        Fetches the sets logged this week, from the local database when it is
+        current and from the Notion database otherwise.
+
         Returns:
-            list: A list of exercises for the week.
+            list: A list of sets for the week.
         """
         try:
-            exercises = self.api_manager.query_sets_in_date_range(self.week_start, self.week_end)
-            return exercises
+            if self.local_is_current():
+                return self.database.get_range(self.table_name, self.week_start, self.week_end)
+
+            logger.info("Local workout log is stale; querying Notion for the week.")
+            db_id = json.loads(os.environ["WORKOUT_LOG"])["id"]
+            pages = self.fetcher.query_pages_in_date_range(db_id, self.week_start, self.week_end)
+            return parse_data(pages, CompletedSet)
         except Exception as e:
             print(f"Error fetching exercises: {e}")
             return []
-